@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import time
+import random
+import argparse
+
+from OpenGL import GL
+
+from Source.Graphics.Cone import Cone
+from Source.Graphics.Cylinder import Cylinder
+from Source.Graphics.Icosahedron import Icosahedron
+from Source.Graphics.BufferArena import BufferArena
+from Source.Graphics.VertexLayout import VertexLayout
+
+
+def primitive(cls, **attributes):
+    """Returns (vertices, indices) counts of a primitive actor, without creating GPU buffers"""
+    actor = cls.__new__(cls)
+    actor.__dict__.update(attributes)
+    actor.generateGeometry()
+    indices = actor.__dict__.get("_indices")
+    return len(actor._vertices.reshape(-1, 3)), 0 if indices is None else indices.size
+
+
+def parts():
+    """Returns the (name, vertices, indices) of the small parts placed in the scene"""
+    result = []
+    for resolution in (8, 16, 32):
+        result.append(("cone {}".format(resolution),) + primitive(Cone, _radius=1.0, _height=2.0, _resolution=resolution))
+        result.append(("cylinder {}".format(resolution),) + primitive(Cylinder, _radius=1.0, _height=2.0, _resolution=resolution))
+    for level in (1, 2):
+        result.append(("icosahedron {}".format(level),) + primitive(Icosahedron, _radius=1.0, _level=level,
+            _optimize=False, _rgb_colors=False))
+    return result
+
+
+##  Pool bookkeeping of the arena without the GL buffers.
+class Simulation:
+
+    def __init__(self, stride):
+        self.stride = stride
+        self.vertices = BufferArena.Allocator(BufferArena.InitialVertices)
+        self.indices = BufferArena.Allocator(BufferArena.InitialIndices)
+        self.vertexRanges = []
+        self.indexRanges = []
+        self.compactions = 0
+        self.growths = 0
+
+
+    def reserve(self, allocator, ranges, count):
+        """Same policy as BufferArena.Pool.reserve"""
+        first = allocator.allocate(count)
+        if first is not None:
+            return first
+        if allocator.freeCount() >= count:
+            self.compactBuffer(allocator, ranges)
+        else:
+            capacity = allocator.capacity()
+            while capacity - allocator.used() < count:
+                capacity *= 2
+            allocator.grow(capacity)
+            self.growths += 1
+        return allocator.allocate(count)
+
+
+    def compactBuffer(self, allocator, ranges):
+        """Same moves as BufferArena.Pool.compactBuffer"""
+        first = 0
+        for each in sorted(ranges, key=lambda each: each.first):
+            each.first = first
+            first += each.count
+        allocator.reset(first)
+        self.compactions += 1
+
+
+    def allocate(self, vertices, indices):
+        vertexRange = BufferArena.Range(self, self.reserve(self.vertices, self.vertexRanges, vertices), vertices)
+        self.vertexRanges.append(vertexRange)
+        indexRange = None
+        if indices:
+            indexRange = BufferArena.Range(self, self.reserve(self.indices, self.indexRanges, indices), indices)
+            self.indexRanges.append(indexRange)
+        return vertexRange, indexRange
+
+
+    def free(self, vertexRange, indexRange):
+        self.vertices.free(vertexRange.first, vertexRange.count)
+        self.vertexRanges.remove(vertexRange)
+        if indexRange is not None:
+            self.indices.free(indexRange.first, indexRange.count)
+            self.indexRanges.remove(indexRange)
+
+
+    def report(self, label, actors):
+        used = self.vertices.used() * self.stride + self.indices.used() * 4
+        allocated = self.vertices.capacity() * self.stride + self.indices.capacity() * 4
+        print("{:<22} {:>7} {:>11.1f} {:>11.1f} {:>8.1f}% {:>10.1f}% {:>12}".format(label, actors, used / 1024.0,
+            allocated / 1024.0, 100.0 * used / allocated, 100.0 * max(self.vertices.fragmentation(),
+            self.indices.fragmentation()), self.compactions))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Fragmentation and bytes in use of the buffer arena under actor churn")
+    parser.add_argument("--actors", type=int, default=500, help="small actors in the scene")
+    parser.add_argument("--churn", type=int, default=5000, help="removals followed by additions")
+    parser.add_argument("--seed", type=int, default=420, help="random seed")
+    args = parser.parse_args()
+
+    ## position and normal float32, interleaved
+    layout = VertexLayout(mode=VertexLayout.Mode.Interleaved)
+    layout.add('position', GL.GL_FLOAT, 3)
+    layout.add('normal', GL.GL_FLOAT, 3)
+
+    random.seed(args.seed)
+    choices = parts()
+    arena = Simulation(layout.vertexSize())
+    print("{:<22} {:>7} {:>11} {:>11} {:>9} {:>11} {:>12}".format("", "actors", "in use KiB", "alloc KiB",
+        "used", "fragmented", "compactions"))
+
+    start = time.perf_counter()
+    live = [arena.allocate(*random.choice(choices)[1:]) for i in range(args.actors)]
+    arena.report("initial", len(live))
+
+    for i in range(args.churn):
+        arena.free(*live.pop(random.randrange(len(live))))
+        live.append(arena.allocate(*random.choice(choices)[1:]))
+    elapsed = time.perf_counter() - start
+    arena.report("after churn", len(live))
+
+    arena.compactBuffer(arena.vertices, arena.vertexRanges)
+    arena.compactBuffer(arena.indices, arena.indexRanges)
+    arena.report("after compaction", len(live))
+
+    operations = args.actors + 2 * args.churn
+    print("\n{} allocations and frees, {:.2f} us each, {} growths".format(operations,
+        elapsed / operations * 1e6, arena.growths))
+    print("GL objects: {} without the arena, 3 with it (one VAO, VBO and IBO per vertex layout)".format(3 * len(live)))
+
+
+if __name__ == '__main__':
+
+    main()
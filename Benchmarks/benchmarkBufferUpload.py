@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+import os
+import glob
+import time
+import ctypes
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+import numpy as np
+
+from PyQt5 import sip
+
+from Source.Graphics.Actor import Actor
+from Source.Graphics.MeshCache import MeshCache
+
+
+def streams(mesh, scale):
+    """Returns the attribute and index arrays Obj uploads for a mesh, tiled scale times"""
+    arrays = [mesh.vertices, mesh.normals, mesh.texcoords, mesh.colors, mesh.indices, mesh.lodIndices]
+    arrays = [each for each in arrays if each is not None]
+    if scale > 1:
+        arrays = [np.tile(each, (scale,) + (1,) * (each.ndim - 1)) for each in arrays]
+    return arrays
+
+
+def copied(arrays, sink):
+    """Legacy path: a bytes copy of every array, as .tostring() made, then the upload"""
+    offset = 0
+    for each in arrays:
+        data = each.tobytes()
+        ctypes.memmove(sink + offset, int(sip.voidptr(data)), len(data))
+        offset += len(data)
+
+
+def inPlace(arrays, sink):
+    """Upload reading every array in place through the buffer protocol"""
+    offset = 0
+    for each in arrays:
+        data, size = Actor.bufferData(each)
+        ctypes.memmove(sink + offset, int(sip.voidptr(data)), size)
+        offset += size
+
+
+def measure(function, arrays, repeat):
+    """Returns (best time, tracemalloc peak) of uploading arrays with function"""
+    size = sum(each.nbytes for each in arrays)
+    target = np.empty(size, dtype=np.uint8)
+    sink = target.ctypes.data
+
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(arrays, sink)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(arrays, sink)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare copying and in-place vertex buffer uploads")
+    parser.add_argument("--models", type=int, default=3, help="number of largest models to report")
+    parser.add_argument("--scale", type=int, default=64, help="times each model is tiled to make larger buffers")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per model")
+    args = parser.parse_args()
+
+    ## memory mapped arrays, as the mesh cache hands them to Obj
+    cache = MeshCache()
+    directory = tempfile.mkdtemp()
+    cache.setDirectory(directory)
+
+    filenames = sorted(glob.glob("obj-models/*/*.obj"), key=os.path.getsize, reverse=True)[:args.models]
+    print("{:<45} {:>6} {:>10} {:>10} {:>12} {:>12} {:>14}".format("model", "scale", "MiB", "copy ms",
+        "in place ms", "copy peak", "in place peak"))
+    try:
+        for filename in filenames:
+            base = filename[:-len(".obj")]
+            cache.parse(base)
+            mesh = cache.parse(base)
+            for scale in sorted({1, args.scale}):
+                arrays = streams(mesh, scale)
+                size = sum(each.nbytes for each in arrays)
+                copy_time, copy_peak = measure(copied, arrays, args.repeat)
+                view_time, view_peak = measure(inPlace, arrays, args.repeat)
+                print("{:<45} {:>6} {:>10.2f} {:>10.3f} {:>12.3f} {:>11.1f}K {:>13.1f}K".format(filename, scale,
+                    size / 1048576.0, copy_time * 1000.0, view_time * 1000.0, copy_peak / 1024.0, view_peak / 1024.0))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import sys
+import math
+import time
+import argparse
+
+from PyQt5.QtGui import QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat, QMatrix4x4, QVector3D
+
+from OpenGL import GL
+
+from Source.Graphics.Scene import Scene
+from Source.Graphics.GizmosScale import GizmosScale
+from Source.Graphics.GizmosTranslate import GizmosTranslate
+from Source.Graphics.GizmosRotate import GizmosRotate
+from Source.Graphics.ResourceManager import ResourceManager
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def drag(events):
+    """Returns the transform of the dragged actor after each event, a translation along x"""
+    result = []
+    for i in range(events):
+        xform = QMatrix4x4()
+        xform.translate(math.sin(i * 0.01), 0.0, 0.0)
+        result.append(xform)
+    return result
+
+
+def rebuild(scene, cls, transforms):
+    """Replaces the gizmo group on every event, as gizmosUpdate did before pooling"""
+    gizmos = None
+    for xform in transforms:
+        if gizmos is not None:
+            scene.removeActor(gizmos)
+            ResourceManager().collect()
+        gizmos = cls(scene, transform=xform, center=QVector3D(), size=QVector3D(1.5, 1.5, 1.5), eixo="x")
+        scene.addActor(gizmos)
+    scene.removeActor(gizmos)
+    ResourceManager().collect()
+
+
+def place(scene, cls, transforms):
+    """Moves one pooled gizmo group on every event"""
+    gizmos = cls(scene, size=QVector3D(1.5, 1.5, 1.5), eixo="x")
+    scene.addActor(gizmos)
+    for xform in transforms:
+        gizmos.place(xform, QVector3D(), QVector3D(1.5, 1.5, 1.5), "x")
+    scene.removeActor(gizmos)
+    ResourceManager().collect()
+
+
+def measure(method, scene, cls, transforms):
+    """Returns (microseconds per event, GPU objects created per event)"""
+    created = ResourceManager().statistics()["created"]
+    GL.glFinish()
+    start = time.perf_counter()
+    method(scene, cls, transforms)
+    GL.glFinish()
+    elapsed = time.perf_counter() - start
+    created = ResourceManager().statistics()["created"] - created
+    return elapsed / len(transforms) * 1e6, created / float(len(transforms))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Per-event cost of dragging an actor with a transform gizmo")
+    parser.add_argument("--events", type=int, default=1000, help="mouse events in the drag")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    scene = Scene(None)
+    transforms = drag(args.events)
+    print("{} events per drag\n".format(args.events))
+    print("{:<18} {:>14} {:>14} {:>14} {:>14}".format("gizmo", "rebuild us", "objects/event",
+        "place us", "objects/event"))
+    for cls in [GizmosTranslate, GizmosScale, GizmosRotate]:
+        before, createdBefore = measure(rebuild, scene, cls, transforms)
+        after, createdAfter = measure(place, scene, cls, transforms)
+        print("{:<18} {:>14.1f} {:>14.1f} {:>14.1f} {:>14.3f}".format(cls.__name__, before, createdBefore,
+            after, createdAfter))
+
+    report = ResourceManager().report()
+    if report:
+        print("\n" + report)
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import sys
+import time
+import argparse
+
+from PyQt5.QtGui import (QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat,
+    QOpenGLFramebufferObject, QMatrix4x4, QVector3D, QVector4D, QQuaternion)
+
+from OpenGL import GL
+
+from Source.Graphics.Scene import Scene
+from Source.Graphics.Camera import Camera
+from Source.Graphics.Light import Light
+from Source.Graphics.Material import Material
+from Source.Graphics.Cube import Cube
+from Source.Graphics.InstancedActor import InstancedActor
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def placements(count):
+    """Returns the transforms of count cubes on a square grid"""
+    side = int(count ** 0.5) + 1
+    result = []
+    for i in range(count):
+        xform = QMatrix4x4()
+        xform.translate((i % side - side / 2) * 2.0, (i // side - side / 2) * 2.0, 0.0)
+        xform.scale(0.5)
+        result.append(xform)
+    return result
+
+
+def scene(count, instanced):
+    """Returns a scene of count cubes, one actor each or one instanced actor"""
+    camera = Camera(name="main", position=QVector3D(0.0, 0.0, 2.0 * count ** 0.5 + 10.0), lens=Camera.Lens.Perspective)
+    camera.pointAt(QVector3D(0.0, 0.0, 0.0))
+    light = Light(position=QVector4D(2.0, 2.0, 0.5, 0.0), ambient=QVector3D(0.5, 0.5, 0.5),
+        diffuse=QVector3D(1.0, 1.0, 1.0), specular=QVector3D(1.0, 1.0, 1.0), headlight=True)
+    result = Scene(None, camera=camera, light=light)
+    if instanced:
+        cubes = InstancedActor(result, Cube(result, material=Material.jade()), name="cubes")
+        for xform in placements(count):
+            cubes.addInstance(xform)
+        result.addActor(cubes)
+    else:
+        for i, xform in enumerate(placements(count)):
+            result.addActor(Cube(result, name="cube{}".format(i), transform=xform, material=Material.jade()))
+    return result
+
+
+def frames(world, args, moving):
+    """Returns ms per frame with an orbiting camera, moving one instance per frame if moving is not None"""
+    GL.glFinish()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        world.camera.setRotation(QQuaternion.fromAxisAndAngle(QVector3D(0.0, 1.0, 0.0), frame * 0.5))
+        if moving is not None:
+            instance = moving[frame % len(moving)]
+            instance.transform().translate(0.0, 0.0, 0.01)
+            instance.update(transform=instance.transform())
+        world.render()
+    GL.glFinish()
+    return (time.perf_counter() - start) / args.frames * 1000.0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Frame time of many copies of a mesh drawn as actors and as instances")
+    parser.add_argument("--actors", type=int, default=5000, help="copies of the mesh")
+    parser.add_argument("--frames", type=int, default=200, help="frames rendered per run")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    framebuffer = QOpenGLFramebufferObject(1280, 800, QOpenGLFramebufferObject.Depth)
+    framebuffer.bind()
+    GL.glViewport(0, 0, 1280, 800)
+
+    print("{} cubes, {} frames\n".format(args.actors, args.frames))
+    print("{:<22} {:>10}".format("drawn as", "ms/frame"))
+    print("{:<22} {:>10.2f}".format("actors", frames(scene(args.actors, False), args, None)))
+    world = scene(args.actors, True)
+    print("{:<22} {:>10.2f}".format("instances", frames(world, args, None)))
+    cubes = world.actors()[0]
+    print("{:<22} {:>10.2f}".format("instances, one moving", frames(world, args, cubes.instances())))
+    print("\n{} instance buffer writes".format(cubes.uploadStatistics()))
+
+    framebuffer.release()
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
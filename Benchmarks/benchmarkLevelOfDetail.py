@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import sys
+import glob
+import time
+import argparse
+
+from PyQt5.QtCore import Qt, QTimer, QCoreApplication
+from PyQt5.QtGui import QMatrix4x4, QVector3D, QSurfaceFormat
+from PyQt5.QtWidgets import QApplication
+
+from Source.Graphics.Camera import Camera
+from Source.Graphics.MeshCache import MeshCache
+from Source.Graphics.Obj import Obj
+from Source.Graphics.ObjParser import ObjParser
+from Source.Graphics.MeshSimplifier import LevelRatios
+from Source.Graphics.Renderer import Renderer
+
+
+def city(size, spacing):
+    """Returns (filename, transform) of a size x size grid of buildings"""
+    filenames = sorted(glob.glob("obj-models/buildings/*.obj"))
+    placements = []
+    for i in range(size):
+        for j in range(size):
+            xform = QMatrix4x4()
+            xform.translate((i - (size - 1) / 2.0) * spacing, 0.0, (j - (size - 1) / 2.0) * spacing)
+            placements.append((filenames[(i * size + j) % len(filenames)], xform))
+    return placements
+
+
+def trianglesDrawn(placements, meshes, camera, lod):
+    """Returns the number of triangles drawn for the city seen from camera"""
+    total = 0
+    for filename, xform in placements:
+        mesh = meshes[filename]
+        counts = [len(mesh.indices)] + (mesh.lodCounts.tolist() if mesh.lodCounts is not None else [])
+        level = 0
+        if lod:
+            center = QVector3D(*[float(x) for x in (mesh.pointMin + mesh.pointMax) / 2.0])
+            radius = 0.5 * QVector3D(*[float(x) for x in mesh.pointMax - mesh.pointMin]).length()
+            level = Obj.levelForCoverage(camera.projectedSize(xform * center, radius), 0, len(counts))
+        total += counts[level] // 3
+    return total
+
+
+##  Renders the city for a number of frames and reports the frame times.
+class CityViewer(Renderer):
+
+    def __init__(self, placements, meshes, args, parent=None):
+        super(CityViewer, self).__init__(parent)
+        self._placements = placements
+        self._meshes = meshes
+        self._args = args
+        self._lod = True
+        self._frames = []
+
+
+    def initializeGL(self):
+        super(CityViewer, self).initializeGL()
+        self._loader.cancelAll()
+        self.removePlaceholder()
+        self._world.camera.setPosition(QVector3D(0.0, 0.0, self._args.distance))
+        self._world.camera.setFarDistance(10.0 * self._args.distance)
+        for filename, xform in self._placements:
+            self._world.addActor(Obj(self._world, filename=filename, mesh=self._meshes[filename], transform=xform))
+
+
+    def paintGL(self):
+        super(CityViewer, self).paintGL()
+        self._frames.append(self.renderTimeEstimates())
+        if len(self._frames) == self._args.frames:
+            triangles = sum(each.numberOfTriangles() for each in self._world.actors() if isinstance(each, Obj))
+            frame = sum(each[0] for each in self._frames[1:]) / float(len(self._frames) - 1)
+            gpu = sum(each[1] for each in self._frames[1:]) / float(len(self._frames) - 1)
+            print("{:<6} {:>10} {:>10.2f} {:>10.2f}".format("on" if self._lod else "off", triangles, frame, gpu))
+            if not self._lod:
+                QCoreApplication.quit()
+                return
+            self._lod = False
+            self._frames = []
+            for each in self._world.actors():
+                if isinstance(each, Obj):
+                    each.setLevelOfDetailEnabled(False)
+
+
+def render(placements, meshes, args):
+    """Measures frame times of the city with and without levels of detail"""
+    QCoreApplication.setAttribute(Qt.AA_UseDesktopOpenGL)
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    glformat = QSurfaceFormat()
+    glformat.setDepthBufferSize(24)
+    glformat.setSwapInterval(0)
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    QSurfaceFormat.setDefaultFormat(glformat)
+
+    app = QApplication(sys.argv)
+    viewer = CityViewer(placements, meshes, args)
+    viewer.resize(1280, 720)
+    viewer.show()
+    print("{:<6} {:>10} {:>10} {:>10}".format("lod", "triangles", "frame ms", "gpu ms"))
+    app.exec_()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Triangle count and frame time of a city scene with levels of detail")
+    parser.add_argument("--size", type=int, default=20, help="buildings per side of the city grid")
+    parser.add_argument("--spacing", type=float, default=12.0, help="distance between buildings")
+    parser.add_argument("--distance", type=float, default=150.0, help="camera distance for --render")
+    parser.add_argument("--frames", type=int, default=200, help="frames measured per setting with --render")
+    parser.add_argument("--render", action="store_true", help="also render the city and report frame times")
+    args = parser.parse_args()
+
+    placements = city(args.size, args.spacing)
+    meshes = {}
+    for filename, xform in placements:
+        if filename not in meshes:
+            meshes[filename] = MeshCache().parse(filename[:-len(".obj")], lods=LevelRatios)
+
+    ## cost of building the levels, paid by cold parses only
+    start = time.perf_counter()
+    for filename in meshes:
+        ObjParser(filename[:-len(".obj")]).parse()
+    plain = time.perf_counter() - start
+    start = time.perf_counter()
+    for filename in meshes:
+        ObjParser(filename[:-len(".obj")], lods=LevelRatios).parse()
+    simplified = time.perf_counter() - start
+    print("{} buildings, {} models, cold parse {:.1f} ms, {:.1f} ms with levels of detail\n".format(len(placements),
+        len(meshes), plain * 1000.0, simplified * 1000.0))
+
+    print("{:>10} {:>12} {:>12} {:>8}".format("distance", "full", "with LOD", "drawn"))
+    for distance in (25.0, 50.0, 100.0, 200.0, 400.0):
+        camera = Camera(position=QVector3D(0.0, 0.0, distance), far=10.0 * distance)
+        camera.setAspectRatio(16.0 / 9.0)
+        full = trianglesDrawn(placements, meshes, camera, False)
+        reduced = trianglesDrawn(placements, meshes, camera, True)
+        print("{:>10.0f} {:>12} {:>12} {:>7.1f}%".format(distance, full, reduced, 100.0 * reduced / full))
+
+    if args.render:
+        print()
+        render(placements, meshes, args)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import glob
+import argparse
+
+from Source.Graphics.ObjParser import ObjParser
+
+
+def nbytes(*arrays):
+    """Returns the total size of the arrays that are not None"""
+    return sum(each.nbytes for each in arrays if each is not None)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare per-vertex colors against per-material draw ranges")
+    parser.parse_args()
+
+    print("{:<45} {:>9} {:>9} {:>10} {:>10} {:>7} {:>9} {:>6}".format("model", "vertices", "ranges",
+        "before KiB", "after KiB", "saved", "materials", "draws"))
+    before_total = after_total = 0
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        base = filename[:-len(".obj")]
+        colored = ObjParser(base, materials=False, lods=()).parse()
+        ranged = ObjParser(base, lods=()).parse()
+
+        before = nbytes(colored.vertices, colored.normals, colored.texcoords, colored.colors)
+        after = nbytes(ranged.vertices, ranged.normals, ranged.texcoords, ranged.materialTable)
+        before_total += before
+        after_total += after
+        draws = int((ranged.materialCounts[0] > 0).sum())
+        print("{:<45} {:>9} {:>9} {:>10.1f} {:>10.1f} {:>6.1f}% {:>9} {:>6}".format(filename,
+            len(colored.vertices), len(ranged.vertices), before / 1024.0, after / 1024.0,
+            100.0 * (1.0 - after / float(before)), len(ranged.materialTable), draws))
+    print("\nvertex memory {:.1f} KiB -> {:.1f} KiB, {:.1f}% saved".format(before_total / 1024.0,
+        after_total / 1024.0, 100.0 * (1.0 - after_total / float(before_total))))
+
+
+if __name__ == '__main__':
+
+    main()
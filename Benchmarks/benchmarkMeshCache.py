@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import glob
+import time
+import shutil
+import tempfile
+import argparse
+
+from Source.Graphics.ObjParser import ObjParser
+from Source.Graphics.MeshCache import MeshCache
+
+
+def timeIt(function, repeat):
+    """Returns the best wall time of repeat calls"""
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare cold OBJ parsing against warm mesh cache loads")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per model")
+    args = parser.parse_args()
+
+    ## work on a private cache directory
+    cache = MeshCache()
+    directory = tempfile.mkdtemp()
+    cache.setDirectory(directory)
+
+    print("{:<45} {:>10} {:>10} {:>10} {:>8} {:>10}".format("model", "parse ms", "store ms", "warm ms", "speedup", "file KiB"))
+    try:
+        for filename in sorted(glob.glob("obj-models/*/*.obj")):
+            base = filename[:-len(".obj")]
+            cold = timeIt(lambda: ObjParser(base).parse(), args.repeat)
+
+            cache.clear()
+            start = time.perf_counter()
+            cache.parse(base)
+            store = time.perf_counter() - start
+
+            warm = timeIt(lambda: cache.parse(base).vertices, args.repeat)
+            print("{:<45} {:>10.2f} {:>10.2f} {:>10.2f} {:>7.1f}x {:>10.1f}".format(filename,
+                cold * 1000.0, store * 1000.0, warm * 1000.0, cold / warm, cache.size() / 1024.0))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import glob
+import time
+import argparse
+import numpy as np
+
+from PyQt5.QtGui import QVector3D
+from Source.Graphics.ObjParser import ObjParser
+
+
+def legacyGetMaterial(filename, mat):
+    """Material lookup formerly used by Obj, rescanning the .mtl on every call"""
+    arq = open(filename + ".mtl", "r")
+    kd = [0.5,0.5,0]
+    mat_ = ""
+    for line in arq:
+        if line.startswith('#'):
+            continue
+        values = line.split()
+        if not values:
+            continue
+        if values[0] == 'newmtl':
+            mat_ = values[1]
+        if values[0] == 'Kd' and mat_ == mat:
+            kd = []
+            for v in values[1:]:
+                kd.append(float(v))
+            return kd
+    return kd
+
+
+def legacyParse(filename):
+    """Two-pass parser formerly used by Obj.generateGeometry, kept as reference"""
+    v_ = []
+    arq = open(filename + ".obj", "r")
+    for line in arq:
+        if line.startswith('#'):
+            continue
+        values = line.split()
+        if not values:
+            continue
+        if values[0] == 'v':
+            v_.append([float(values[1]), float(values[2]), float(values[3])])
+    arq.close()
+
+    vertices = []
+    n = []
+    t = []
+    normals = []
+    texture = []
+    colors = []
+    arq = open(filename + ".obj", "r")
+    for line in arq:
+        if line.startswith('#'):
+            continue
+        values = line.split()
+        if not values:
+            continue
+        if values[0] == 'vn':
+            n.append([float(values[1]), float(values[2]), float(values[3])])
+        elif values[0] == 'vt':
+            t.append([float(values[1]), float(values[2])])
+        elif values[0] in ('usemtl', 'usemat'):
+            color = legacyGetMaterial(filename, values[1])
+        elif values[0] == 'f':
+            face = []
+            text = []
+            norm = []
+            if len(values[1:]) == 4:
+                for v in values[1:]:
+                    w = v.split('/')
+                    face.append(int(w[0])-1)
+                    colors.append(color)
+                    if len(w) >= 2 and len(w[1]) > 0:
+                        text.append(t[int(w[1]) -1])
+                    if len(w) >= 3 and len(w[2]) > 0:
+                        norm.append(n[int(w[2])-1])
+                for i in (0, 1, 2, 2, 3, 0):
+                    vertices.append(v_[face[i]])
+                    texture.append(text[i])
+                    normals.append(norm[i])
+                colors.append(color)
+                colors.append(color)
+            else:
+                for v in values[1:]:
+                    w = v.split('/')
+                    vertices.append(v_[int(w[0])-1])
+                    colors.append(color)
+                    if len(w) >= 2 and len(w[1]) > 0:
+                        texture.append(t[int(w[1]) -1])
+                    if len(w) >= 3 and len(w[2]) > 0:
+                        norm = QVector3D(n[int(w[2])-1][0], n[int(w[2])-1][1], n[int(w[2])-1][2]).normalized()
+                    else:
+                        norm = QVector3D(v_[int(w[0])-1][0], v_[int(w[0])-1][1], v_[int(w[0])-1][2]).normalized()
+                    normals.append([norm[0], norm[1], norm[2]])
+    arq.close()
+
+    return (np.array(vertices, dtype=np.float32), np.array(normals, dtype=np.float32),
+        np.array(texture, dtype=np.float32), np.array(colors, dtype=np.float32))
+
+
+def timeIt(function, repeat):
+    """Returns the best wall time of repeat calls"""
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare the OBJ parser against the legacy two-pass loader")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per model")
+    args = parser.parse_args()
+
+    print("{:<45} {:>7} {:>12} {:>12} {:>8} {:>9}".format("model", "faces", "legacy f/s", "parser f/s", "speedup", "identical"))
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        base = filename[:-len(".obj")]
+        mesh = ObjParser(base, optimize=False, materials=False).parse()
+        reference = legacyParse(base)
+        identical = all(a is not None and a.shape == b.shape and a.tobytes() == b.tobytes()
+            for a, b in zip(mesh.expanded(), reference))
+
+        legacy = timeIt(lambda: legacyParse(base), args.repeat)
+        current = timeIt(lambda: ObjParser(base, weld=False, materials=False).parse(), args.repeat)
+        print("{:<45} {:>7} {:>12.0f} {:>12.0f} {:>7.1f}x {:>9}".format(filename, mesh.numberOfFaces,
+            mesh.numberOfFaces / legacy, mesh.numberOfFaces / current, legacy / current, str(identical)))
+
+
+if __name__ == '__main__':
+
+    main()
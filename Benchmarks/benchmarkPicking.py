@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import argparse
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import (QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat,
+    QMatrix4x4, QVector3D, QVector4D, QQuaternion)
+
+from Source.Graphics.Scene import Scene
+from Source.Graphics.Camera import Camera
+from Source.Graphics.Light import Light
+from Source.Graphics.Material import Material
+from Source.Graphics.Cube import Cube
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def placement(generator, spread):
+    """Returns a random transform inside a cube of side spread"""
+    xform = QMatrix4x4()
+    xform.translate(*[generator.uniform(-spread / 2, spread / 2) for i in range(3)])
+    xform.rotate(QQuaternion.fromEulerAngles(*[generator.uniform(0.0, 360.0) for i in range(3)]))
+    xform.scale(*[generator.uniform(0.2, 1.0) for i in range(3)])
+    return xform
+
+
+def scene(count, generator):
+    """Returns a scene of count randomly placed cubes"""
+    spread = 2.0 * count ** (1.0 / 3.0)
+    camera = Camera(name="main", position=QVector3D(0.0, 0.0, 2.0 * spread), lens=Camera.Lens.Perspective)
+    camera.pointAt(QVector3D(0.0, 0.0, 0.0))
+    light = Light(position=QVector4D(2.0, 2.0, 0.5, 0.0), ambient=QVector3D(0.5, 0.5, 0.5),
+        diffuse=QVector3D(1.0, 1.0, 1.0), specular=QVector3D(1.0, 1.0, 1.0), headlight=True)
+    result = Scene(None, camera=camera, light=light)
+    for i in range(count):
+        result.addActor(Cube(result, name="cube{}".format(i), transform=placement(generator, spread), material=Material.jade()))
+    return result, spread
+
+
+def linear(world, point):
+    """Returns the closest actor hit by the ray through point, testing every actor"""
+    ray = world.ray(point)
+    result, distance = None, float("inf")
+    for each in world.actors():
+        if each.isPickable():
+            hit = each.intersect(ray)
+            if hit[0] and hit[1] < distance:
+                result, distance = each, hit[1]
+    return result
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Time per pick of random rays through a scene of many actors")
+    parser.add_argument("--actors", type=int, default=5000, help="actors in the scene")
+    parser.add_argument("--rays", type=int, default=10000, help="rays picked through the hierarchy")
+    parser.add_argument("--linear-rays", type=int, default=200, help="rays also picked by testing every actor")
+    parser.add_argument("--moved", type=int, default=200, help="actors moved before the refit")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    generator = random.Random(args.seed)
+    world, spread = scene(args.actors, generator)
+    points = [QPointF(generator.uniform(-1.0, 1.0), generator.uniform(-1.0, 1.0)) for i in range(args.rays)]
+
+    start = time.perf_counter()
+    world.buildPicking()
+    build = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    picked = [world.pick(point)[0] for point in points]
+    tree = (time.perf_counter() - start) / args.rays * 1000.0
+
+    sample = points[:args.linear_rays]
+    start = time.perf_counter()
+    expected = [linear(world, point) for point in sample]
+    brute = (time.perf_counter() - start) / max(len(sample), 1) * 1000.0
+    mismatches = sum(1 for a, b in zip(picked, expected) if a is not b)
+
+    ## moved actors are refit on the next pick
+    actors = world.actors()
+    for each in generator.sample(actors, min(args.moved, len(actors))):
+        xform = each.transform()
+        xform.translate(generator.uniform(-1.0, 1.0), generator.uniform(-1.0, 1.0), generator.uniform(-1.0, 1.0))
+        each.update(transform=xform)
+    start = time.perf_counter()
+    world.pick(points[0])
+    refit = (time.perf_counter() - start) * 1000.0
+
+    statistics = world.pickingStatistics()
+    print("{} actors, {} nodes, {} rays\n".format(statistics["items"], statistics["nodes"], args.rays))
+    print("{:<30} {:>10.2f}".format("build ms", build))
+    print("{:<30} {:>10.3f}".format("hierarchy ms/ray", tree))
+    print("{:<30} {:>10.3f}".format("every actor ms/ray", brute))
+    print("{:<30} {:>10.1f}".format("speedup", brute / tree if tree > 0.0 else float("inf")))
+    print("{:<30} {:>10.2f}".format("refit of {} moved, ms".format(args.moved), refit))
+    print("\n{} of {} rays picked differently".format(mismatches, len(sample)))
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
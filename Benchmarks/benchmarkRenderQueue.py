@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import argparse
+
+from PyQt5.QtGui import (QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat,
+    QOpenGLFramebufferObject, QMatrix4x4, QVector3D, QVector4D, QQuaternion)
+
+from OpenGL import GL
+
+from Source.Graphics.Scene import Scene
+from Source.Graphics.Camera import Camera
+from Source.Graphics.Light import Light
+from Source.Graphics.Material import Material
+from Source.Graphics.Cube import Cube
+from Source.Graphics.Cone import Cone
+from Source.Graphics.Sphere import Sphere
+from Source.Graphics.Icosahedron import Icosahedron
+from Source.Graphics.GLState import GLState
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def scene(actors):
+    """Returns a scene of mixed actors in random order, using per-vertex and uniform material shaders"""
+    camera = Camera(name="main", position=QVector3D(0.0, 0.0, 40.0), lens=Camera.Lens.Perspective)
+    camera.pointAt(QVector3D(0.0, 0.0, 0.0))
+    light = Light(position=QVector4D(2.0, 2.0, 0.5, 0.0), ambient=QVector3D(0.5, 0.5, 0.5),
+        diffuse=QVector3D(1.0, 1.0, 1.0), specular=QVector3D(1.0, 1.0, 1.0), headlight=True)
+    result = Scene(None, camera=camera, light=light)
+    result.setDrawStyle(Scene.DrawStyle.SolidWithEdges)
+    materials = [Material.gold(), Material.ruby(), Material.jade(), Material.chrome(), Material.obsidian()]
+    kinds = [lambda **kwargs: Cube(result, **kwargs),
+        lambda **kwargs: Cone(result, **kwargs),
+        lambda **kwargs: Sphere(result, colors=True, **kwargs),
+        lambda **kwargs: Sphere(result, **kwargs),
+        lambda **kwargs: Icosahedron(result, colors=True, **kwargs),
+        lambda **kwargs: Icosahedron(result, **kwargs)]
+    side = int(actors ** 0.5) + 1
+    for i in range(actors):
+        xform = QMatrix4x4()
+        xform.translate((i % side - side / 2) * 2.0, (i // side - side / 2) * 2.0, 0.0)
+        xform.scale(0.5)
+        result.addActor(random.choice(kinds)(name="actor{}".format(i), transform=xform, material=random.choice(materials)))
+    return result
+
+
+def frames(world, args):
+    """Returns (program switches, texture binds, state changes issued, ms) per frame with an orbiting camera"""
+    state = GLState()
+    state.beginFrame()
+    switches = binds = issued = 0
+    GL.glFinish()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        world.camera.setRotation(QQuaternion.fromAxisAndAngle(QVector3D(0.0, 1.0, 0.0), frame * 0.5))
+        world.render()
+
+        ## close the frame and read its counters
+        state.beginFrame()
+        statistics = state.statistics()
+        switches += statistics["frameProgramSwitches"]
+        binds += statistics["frameTextureBinds"]
+        issued += statistics["frameIssued"]
+    GL.glFinish()
+    elapsed = time.perf_counter() - start
+    return switches / args.frames, binds / args.frames, issued / args.frames, elapsed / args.frames * 1000.0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Program switches per frame with and without the state-sorted render queue")
+    parser.add_argument("--actors", type=int, default=500, help="actors in the scene")
+    parser.add_argument("--frames", type=int, default=200, help="frames rendered per run")
+    parser.add_argument("--seed", type=int, default=420, help="random seed")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    random.seed(args.seed)
+    framebuffer = QOpenGLFramebufferObject(1280, 800, QOpenGLFramebufferObject.Depth)
+    framebuffer.bind()
+    GL.glViewport(0, 0, 1280, 800)
+    world = scene(args.actors)
+
+    ## before sorting every draw bound its program
+    print("{} actors, {} draws per frame, {} frames\n".format(args.actors, 2 * args.actors, args.frames))
+    print("{:<10} {:>16} {:>14} {:>14} {:>10}".format("queue", "program switches", "texture binds",
+        "state changes", "ms/frame"))
+    for enabled in [False, True]:
+        world.setRenderQueueEnabled(enabled)
+        switches, binds, issued, frame = frames(world, args)
+        print("{:<10} {:>16.0f} {:>14.0f} {:>14.0f} {:>10.2f}".format("sorted" if enabled else "insertion",
+            switches, binds, issued, frame))
+
+    framebuffer.release()
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
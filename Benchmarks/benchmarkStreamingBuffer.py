@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import sys
+import time
+import argparse
+import numpy as np
+
+from PyQt5.QtGui import (QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat,
+    QOpenGLBuffer, QOpenGLVertexArrayObject)
+
+from OpenGL import GL
+
+from Source.Graphics.Shaders import Shaders
+from Source.Graphics.StreamingBuffer import StreamingBuffer
+from Source.Graphics.VertexLayout import VertexLayout
+
+
+## synchronous QOpenGLBuffer.write into a single buffer, the behaviour of a static actor
+Synchronous = -1
+
+Names = {Synchronous: "synchronous", StreamingBuffer.Mode.Orphan: "orphan",
+    StreamingBuffer.Mode.Ring: "ring", StreamingBuffer.Mode.Persistent: "persistent"}
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def frames(vertices, count):
+    """Returns count deformed copies of the vertex positions, a wave travelling along x"""
+    result = []
+    for i in range(count):
+        moved = vertices.copy()
+        moved[:, 1] += 0.1 * np.sin(vertices[:, 0] * 4.0 + i * 0.5)
+        result.append(moved)
+    return result
+
+
+def stream(mode, positions, normals, args):
+    """Returns (MB/s, ms per frame, statistics) of updating and drawing the points every frame"""
+    layout = VertexLayout()
+    layout.add('position', GL.GL_FLOAT, 3)
+    layout.add('normal', GL.GL_FLOAT, 3)
+    layout.setVertexCount(len(normals))
+    shader = Shaders().uniformMaterialShader()
+
+    vao = QOpenGLVertexArrayObject()
+    vao.create()
+    vao.bind()
+    vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+    vbo.create()
+    vbo.bind()
+    if mode == Synchronous:
+        buffer = None
+        vbo.setUsagePattern(QOpenGLBuffer.DynamicDraw)
+        vbo.allocate(layout.bufferSize())
+    else:
+        buffer = StreamingBuffer(vbo, layout.bufferSize(), mode=mode)
+        buffer.allocate()
+    layout.configure([shader], 0)
+
+    shader.bind()
+    GL.glFinish()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        arrays = {'position': positions[frame % len(positions)], 'normal': normals}
+        vbo.bind()
+        if buffer is None:
+            for offset, data in layout.pack(arrays):
+                vbo.write(offset, data, data.nbytes)
+        else:
+            base = buffer.offset()
+            buffer.write(layout, arrays)
+            if buffer.offset() != base:
+                layout.configure([shader], buffer.offset())
+        GL.glDrawArrays(GL.GL_POINTS, 0, len(normals))
+        if buffer is not None:
+            buffer.fence()
+        GL.glFlush()
+    GL.glFinish()
+    elapsed = time.perf_counter() - start
+    shader.release()
+
+    statistics = buffer.statistics() if buffer is not None else {"stalls": 0, "stallTime": 0.0}
+    if buffer is not None:
+        buffer.destroy()
+    vao.release()
+    vbo.release()
+    vbo.destroy()
+    vao.destroy()
+    uploaded = layout.bufferSize() * args.frames
+    return uploaded / elapsed / 1e6, elapsed / args.frames * 1000.0, statistics
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Sustained upload rate of per-frame vertex buffer updates")
+    parser.add_argument("--vertices", type=int, default=1000000, help="vertices updated every frame")
+    parser.add_argument("--frames", type=int, default=300, help="frames measured per mode")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    rng = np.random.default_rng(420)
+    vertices = rng.uniform(-1.0, 1.0, (args.vertices, 3)).astype(np.float32)
+    normals = np.tile(np.array([0.0, 1.0, 0.0], dtype=np.float32), (args.vertices, 1))
+    positions = frames(vertices, 4)
+    print("{} vertices, {:.1f} MB per frame, persistent mapping {}\n".format(args.vertices,
+        (positions[0].nbytes + normals.nbytes) / 1e6,
+        "available" if StreamingBuffer.hasPersistentMapping() else "unavailable"))
+
+    print("{:<12} {:>10} {:>10} {:>8} {:>10}".format("mode", "MB/s", "ms/frame", "stalls", "stall ms"))
+    for mode in [Synchronous] + StreamingBuffer.Mode.Modes:
+        rate, frame, statistics = stream(mode, positions, normals, args)
+        print("{:<12} {:>10.0f} {:>10.2f} {:>8} {:>10.2f}".format(Names[mode], rate, frame,
+            statistics["stalls"], statistics["stallTime"] * 1000.0))
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import sys
+import time
+import random
+import argparse
+
+from PyQt5.QtGui import (QGuiApplication, QOpenGLContext, QOffscreenSurface, QSurfaceFormat,
+    QOpenGLFramebufferObject, QMatrix4x4, QVector3D, QVector4D, QQuaternion)
+
+from OpenGL import GL
+
+from Source.Graphics.Scene import Scene
+from Source.Graphics.Camera import Camera
+from Source.Graphics.Light import Light
+from Source.Graphics.Material import Material
+from Source.Graphics.Cube import Cube
+from Source.Graphics.UniformCache import UniformCache
+
+
+def context():
+    """Returns a current headless OpenGL context and its surface, None if none can be created"""
+    glformat = QSurfaceFormat()
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    glcontext = QOpenGLContext()
+    glcontext.setFormat(glformat)
+    if not glcontext.create():
+        return None
+    surface = QOffscreenSurface()
+    surface.setFormat(glcontext.format())
+    surface.create()
+    if not glcontext.makeCurrent(surface):
+        return None
+    return glcontext, surface
+
+
+def scene(actors):
+    """Returns a scene of cubes on a grid, sharing a few materials"""
+    camera = Camera(name="main", position=QVector3D(0.0, 0.0, 40.0), lens=Camera.Lens.Perspective)
+    camera.pointAt(QVector3D(0.0, 0.0, 0.0))
+    light = Light(position=QVector4D(2.0, 2.0, 0.5, 0.0), ambient=QVector3D(0.5, 0.5, 0.5),
+        diffuse=QVector3D(1.0, 1.0, 1.0), specular=QVector3D(1.0, 1.0, 1.0), headlight=True)
+    result = Scene(None, camera=camera, light=light)
+    materials = [Material.gold(), Material.ruby(), Material.jade(), Material.chrome(), Material.obsidian()]
+    side = int(actors ** 0.5) + 1
+    for i in range(actors):
+        xform = QMatrix4x4()
+        xform.translate((i % side - side / 2) * 2.0, (i // side - side / 2) * 2.0, 0.0)
+        result.addActor(Cube(result, name="cube{}".format(i), transform=xform, material=random.choice(materials)))
+    return result
+
+
+def frames(world, args):
+    """Returns (uniforms requested per frame, uploaded per frame, ms per frame) rendering with an orbiting camera"""
+    cache = UniformCache()
+    cache.beginFrame()
+    requested = issued = 0
+    GL.glFinish()
+    start = time.perf_counter()
+    for frame in range(args.frames):
+        world.camera.setRotation(QQuaternion.fromAxisAndAngle(QVector3D(0.0, 1.0, 0.0), frame * 0.5))
+        world.render()
+
+        ## close the frame and read its counters
+        cache.beginFrame()
+        statistics = cache.statistics()
+        requested += statistics["frameRequested"]
+        issued += statistics["frameIssued"]
+    GL.glFinish()
+    elapsed = time.perf_counter() - start
+    return requested / args.frames, issued / args.frames, elapsed / args.frames * 1000.0
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Uniform uploads per frame with and without the uniform cache")
+    parser.add_argument("--actors", type=int, default=500, help="actors in the scene")
+    parser.add_argument("--frames", type=int, default=200, help="frames rendered per run")
+    parser.add_argument("--seed", type=int, default=420, help="random seed")
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    current = context()
+    if current is None:
+        print("no OpenGL 4.0 context available, the benchmark needs a GPU driver")
+        return 1
+
+    random.seed(args.seed)
+    framebuffer = QOpenGLFramebufferObject(1280, 800, QOpenGLFramebufferObject.Depth)
+    framebuffer.bind()
+    GL.glViewport(0, 0, 1280, 800)
+    GL.glEnable(GL.GL_DEPTH_TEST)
+    world = scene(args.actors)
+
+    print("{} actors, {} frames\n".format(args.actors, args.frames))
+    print("{:<10} {:>14} {:>14} {:>10}".format("cache", "requested", "uploaded", "ms/frame"))
+    for enabled in [False, True]:
+        UniformCache().setEnabled(enabled)
+        requested, issued, frame = frames(world, args)
+        print("{:<10} {:>14.0f} {:>14.0f} {:>10.2f}".format("on" if enabled else "off", requested, issued, frame))
+
+    framebuffer.release()
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import math
+import glob
+import time
+import argparse
+
+from Source.Graphics.ObjParser import ObjParser
+from Source.Graphics.Sphere import Sphere
+from Source.Graphics.Icosahedron import Icosahedron
+from Source.Graphics.VertexCacheOptimizer import CacheSize, acmr, optimize
+
+
+def primitive(cls, **attributes):
+    """Returns the generated geometry of a primitive actor, without creating GPU buffers"""
+    actor = cls.__new__(cls)
+    actor.__dict__.update(attributes)
+    actor.generateGeometry()
+    return actor._indices, actor._vertices, actor._normals
+
+
+def timeIt(function, repeat):
+    """Returns the best time of repeat calls of function, in seconds"""
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def meshes():
+    """Yields (name, indices, vertices, normals) of every model to report"""
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        mesh = ObjParser(filename[:-len(".obj")], lods=()).parse()
+        yield (filename, mesh.indices, mesh.vertices, mesh.normals)
+    for steps in (10, 40):
+        yield ("sphere {}x{}".format(steps, steps),) + primitive(Sphere, _radius=1.0, _v=steps, _h=steps,
+            _rgb_colors=False, _optimize=False, _hStep=2 * math.pi / steps, _vStep=math.pi / steps)
+    for level in (2, 4):
+        yield ("icosahedron level {}".format(level),) + primitive(Icosahedron, _radius=1.0, _level=level, _optimize=False,
+            _rgb_colors=False)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Report ACMR before and after vertex cache optimization")
+    parser.add_argument("--cache", type=int, default=CacheSize, help="modelled FIFO cache size")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per model")
+    args = parser.parse_args()
+
+    print("{:<45} {:>9} {:>8} {:>8} {:>9} {:>12}".format("model", "triangles", "ACMR", "ACMR opt",
+        "optim ms", "triangles/s"))
+    for name, indices, vertices, normals in meshes():
+        best = float("inf")
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            result = optimize(indices, vertices, normals, cacheSize=args.cache)
+            best = min(best, time.perf_counter() - start)
+
+        triangles = len(indices.reshape(-1)) // 3
+        print("{:<45} {:>9} {:>8.3f} {:>8.3f} {:>9.2f} {:>12.0f}".format(name, triangles,
+            acmr(indices, args.cache), acmr(result[-1], args.cache), best * 1000.0, triangles / best))
+
+    ## what ObjParser(optimize=True) adds to a cold parse
+    print("\n{:<45} {:>9} {:>12}".format("model", "parse ms", "optimize ms"))
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        plain = timeIt(lambda: ObjParser(filename[:-len(".obj")], lods=()).parse(), args.repeat)
+        optimized = timeIt(lambda: ObjParser(filename[:-len(".obj")], lods=(), optimize=True).parse(), args.repeat)
+        print("{:<45} {:>9.2f} {:>12.2f}".format(filename, plain * 1000.0, (optimized - plain) * 1000.0))
+
+
+if __name__ == '__main__':
+
+    main()
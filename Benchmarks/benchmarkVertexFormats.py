@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import glob
+import argparse
+import numpy as np
+
+from Source.Graphics.MeshCache import MeshCache
+from Source.Graphics.VertexFormat import VertexFormat
+
+
+## formats compared against plain float32
+Formats = [
+    ("float32", VertexFormat()),
+    ("half", VertexFormat(position=VertexFormat.Encoding.Half, normal=VertexFormat.Encoding.Half,
+        color=VertexFormat.Encoding.Half, texcoord=VertexFormat.Encoding.Half)),
+    ("2_10_10_10", VertexFormat(position=VertexFormat.Encoding.Snorm16, normal=VertexFormat.Encoding.Int2101010,
+        color=VertexFormat.Encoding.Unorm8, texcoord=VertexFormat.Encoding.Half, compactIndices=True)),
+    ("compact", VertexFormat.compact()),
+]
+
+
+def encode(mesh, format):
+    """Returns (vertex bytes, index bytes, max position error) of a mesh in format"""
+    vertices, position_type, position_size, scale, offset = format.encodePositions(mesh.vertices)
+    total = vertices.nbytes
+    if mesh.normals is not None:
+        total += format.encodeNormals(mesh.normals)[0].nbytes
+    if mesh.colors is not None:
+        total += format.encodeColors(mesh.colors)[0].nbytes
+    if mesh.texcoords is not None:
+        total += format.encodeTexcoords(mesh.texcoords)[0].nbytes
+    indices = format.encodeIndices(mesh.indices) if mesh.indices is not None else np.zeros(0)
+
+    ## positions as the vertex shader rebuilds them
+    if vertices.dtype == np.float32:
+        decoded = vertices
+    elif vertices.dtype == np.int16:
+        decoded = np.maximum(vertices[:, :3] / 32767.0, -1.0) * scale + offset
+    else:
+        decoded = vertices[:, :3].astype(np.float64) * scale + offset
+    error = float(np.abs(decoded - mesh.vertices).max()) if len(decoded) else 0.0
+    return total, indices.nbytes, error
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Report vertex buffer sizes of the compact vertex formats")
+    parser.parse_args()
+
+    print("{:<45} {:<11} {:>10} {:>9} {:>8} {:>11}".format("model", "format", "VBO KiB", "IBO KiB", "saved", "max error"))
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        mesh = MeshCache().parse(filename[:-len(".obj")])
+        baseline = None
+        for name, format in Formats:
+            vertex_bytes, index_bytes, error = encode(mesh, format)
+            if baseline is None:
+                baseline = vertex_bytes
+            print("{:<45} {:<11} {:>10.1f} {:>9.1f} {:>7.1f}% {:>11.2e}".format(filename, name, vertex_bytes / 1024.0,
+                index_bytes / 1024.0, 100.0 * (1.0 - vertex_bytes / float(baseline)), error))
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+import os
+import sys
+import glob
+import time
+import argparse
+import collections
+import numpy as np
+
+from PyQt5.QtCore import Qt, QCoreApplication
+from PyQt5.QtGui import QMatrix4x4, QVector3D, QSurfaceFormat
+from PyQt5.QtWidgets import QApplication
+
+from Source.Graphics.MeshCache import MeshCache
+from Source.Graphics.Obj import Obj
+from Source.Graphics.Renderer import Renderer
+from Source.Graphics.VertexFormat import VertexFormat
+from Source.Graphics.VertexLayout import VertexLayout
+
+
+def layoutOf(mesh, mode):
+    """Returns the vertex layout Actor.create builds for mesh, with the packed buffer"""
+    format = VertexFormat()
+    arrays = {'position': mesh.vertices, 'normal': mesh.normals, 'color': mesh.colors, 'texcoord': mesh.texcoords}
+    layout = VertexLayout(mode=mode)
+    layout.add('position', *format.encodePositions(mesh.vertices)[1:3])
+    layout.add('normal', *format.encodeNormals(mesh.normals)[1:3])
+    if mesh.colors is not None:
+        layout.add('color', *format.encodeColors(mesh.colors)[1:3])
+    if mesh.texcoords is not None:
+        layout.add('texcoord', *format.encodeTexcoords(mesh.texcoords)[1:3])
+    layout.setVertexCount(len(mesh.vertices))
+
+    buffer = np.zeros(layout.bufferSize(), dtype=np.uint8)
+    for offset, data in layout.pack(arrays):
+        data = data.view(np.uint8).reshape(-1)
+        buffer[offset:offset + len(data)] = data
+    return layout, buffer
+
+
+def cacheMisses(layout, indices, lines, lineSize):
+    """Returns the cache line misses of fetching every indexed vertex through an LRU cache of lines"""
+    cache = collections.OrderedDict()
+    misses = 0
+    spans = [(each.offset, each.stride, each.bytes()) for each in layout.attributes()]
+    for index in indices.tolist():
+        for offset, stride, size in spans:
+            start = offset + index * stride
+            for line in range(start // lineSize, (start + size - 1) // lineSize + 1):
+                if line in cache:
+                    cache.move_to_end(line)
+                else:
+                    misses += 1
+                    cache[line] = True
+                    if len(cache) > lines:
+                        cache.popitem(last=False)
+    return misses
+
+
+def gather(layout, buffer, indices, repeat):
+    """Returns the best time of gathering the attributes of every indexed vertex"""
+    if layout.isInterleaved():
+        records = buffer.reshape(layout.vertexCount(), layout.vertexSize())
+        streams = [records]
+    else:
+        streams = [layout.columns(buffer, each.name) for each in layout.attributes()]
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        for each in streams:
+            each.take(indices, axis=0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+##  Renders copies of a mesh with one layout, then the other, and reports the frame times.
+class LayoutViewer(Renderer):
+
+    def __init__(self, filename, args, parent=None):
+        super(LayoutViewer, self).__init__(parent)
+        self._filename = filename
+        self._args = args
+        self._modes = list(VertexLayout.Mode.Modes)
+        self._frames = []
+
+
+    def populate(self):
+        """Fills the world with copies of the mesh in the current layout"""
+        self._world.clear()
+        for i in range(self._args.copies):
+            xform = QMatrix4x4()
+            xform.translate((i % 10 - 4.5) * 10.0, 0.0, (i // 10) * -10.0)
+            self._world.addActor(Obj(self._world, filename=self._filename, transform=xform, lod=False,
+                layout=self._modes[0]))
+
+
+    def initializeGL(self):
+        super(LayoutViewer, self).initializeGL()
+        self._loader.cancelAll()
+        self.removePlaceholder()
+        self._world.camera.setPosition(QVector3D(0.0, 20.0, 60.0))
+        self.populate()
+
+
+    def paintGL(self):
+        super(LayoutViewer, self).paintGL()
+        self._frames.append(self.renderTimeEstimates())
+        if len(self._frames) == self._args.frames:
+            frame = sum(each[0] for each in self._frames[1:]) / float(len(self._frames) - 1)
+            gpu = sum(each[1] for each in self._frames[1:]) / float(len(self._frames) - 1)
+            print("{:<12} {:>10.2f} {:>10.2f}".format("interleaved" if self._modes[0] else "planar", frame, gpu))
+            self._modes.pop(0)
+            self._frames = []
+            if not self._modes:
+                QCoreApplication.quit()
+                return
+            self.populate()
+
+
+def render(filename, args):
+    """Measures frame times of many copies of a mesh with both layouts"""
+    QCoreApplication.setAttribute(Qt.AA_UseDesktopOpenGL)
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    glformat = QSurfaceFormat()
+    glformat.setDepthBufferSize(24)
+    glformat.setSwapInterval(0)
+    glformat.setVersion(4, 0)
+    glformat.setProfile(QSurfaceFormat.CoreProfile)
+    QSurfaceFormat.setDefaultFormat(glformat)
+
+    app = QApplication(sys.argv)
+    viewer = LayoutViewer(filename, args)
+    viewer.resize(1280, 720)
+    viewer.show()
+    print("{:<12} {:>10} {:>10}".format("layout", "frame ms", "gpu ms"))
+    app.exec_()
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Compare planar and interleaved vertex buffer layouts")
+    parser.add_argument("--models", type=int, default=3, help="number of largest models to report")
+    parser.add_argument("--lines", type=int, default=64, help="cache lines of the modelled vertex fetch cache")
+    parser.add_argument("--line-size", type=int, default=64, help="bytes per cache line")
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed gathers per model")
+    parser.add_argument("--copies", type=int, default=100, help="copies of the largest model drawn with --render")
+    parser.add_argument("--frames", type=int, default=200, help="frames measured per layout with --render")
+    parser.add_argument("--render", action="store_true", help="also render with both layouts and report frame times")
+    args = parser.parse_args()
+
+    filenames = sorted(glob.glob("obj-models/*/*.obj"), key=os.path.getsize, reverse=True)[:args.models]
+    print("{:<45} {:>8} {:>7} {:>14} {:>14} {:>11} {:>11}".format("model", "vertices", "bytes",
+        "planar misses", "interl misses", "planar ms", "interl ms"))
+    for filename in filenames:
+        mesh = MeshCache().parse(filename[:-len(".obj")])
+        indices = np.asarray(mesh.indices, dtype=np.int64)
+        results = []
+        for mode in VertexLayout.Mode.Modes:
+            layout, buffer = layoutOf(mesh, mode)
+            misses = cacheMisses(layout, indices, args.lines, args.line_size)
+            results.append((misses / float(len(indices)), gather(layout, buffer, indices, args.repeat)))
+        print("{:<45} {:>8} {:>7} {:>14.3f} {:>14.3f} {:>11.3f} {:>11.3f}".format(filename, len(mesh.vertices),
+            layout.vertexSize(), results[0][0], results[1][0], results[0][1] * 1000.0, results[1][1] * 1000.0))
+
+    if args.render:
+        print()
+        render(filenames[0], args)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import glob
+import time
+import argparse
+
+from Source.Graphics.ObjParser import ObjParser
+from Source.Graphics.VertexWelder import weld
+
+
+def nbytes(*arrays):
+    """Returns the total size of the given arrays"""
+    return sum(each.nbytes for each in arrays if each is not None)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Report vertex and memory savings of vertex welding")
+    parser.parse_args()
+
+    print("{:<45} {:>8} {:>8} {:>7} {:>10} {:>10} {:>7} {:>8} {:>8}".format("model", "corners", "unique",
+        "ratio", "before KiB", "after KiB", "saved", "index", "weld ms"))
+    for filename in sorted(glob.glob("obj-models/*/*.obj")):
+        mesh = ObjParser(filename[:-len(".obj")], weld=False, materials=False).parse()
+        arrays = (mesh.vertices, mesh.normals, mesh.texcoords, mesh.colors)
+
+        start = time.perf_counter()
+        welded = weld(*arrays)
+        elapsed = time.perf_counter() - start
+
+        indices = welded[-1]
+        before = nbytes(*arrays)
+        after = nbytes(*welded)
+        print("{:<45} {:>8} {:>8} {:>6.2f}x {:>10.1f} {:>10.1f} {:>6.1f}% {:>8} {:>8.2f}".format(filename,
+            len(mesh.vertices), len(welded[0]), len(mesh.vertices) / float(len(welded[0])),
+            before / 1024.0, after / 1024.0, 100.0 * (1.0 - after / float(before)), indices.dtype.name, elapsed * 1000.0))
+
+
+if __name__ == '__main__':
+
+    main()
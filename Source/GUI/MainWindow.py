@@ -75,6 +75,7 @@ class MainWindow(QMainWindow):
 
         ## create scene 
         self._renderWidget = RenderWidget(self, font=fontSize10)
+        self._renderWidget.actorLoadFailed.connect(self.actorLoadFailed)
 
         ## set the renderer as main widget
         self.setCentralWidget(self._renderWidget)
@@ -112,7 +113,15 @@ class MainWindow(QMainWindow):
 
     def handleTimer(self):
         times = self._renderWidget.renderTimeEstimates()
-        self.statistics.setText("Render time: " + str(round(times[0],2)) + "ms, GPU time: " + str(round(times[1],2)) + "ms")
+        memory = self._renderWidget.gpuBytesAllocated() / (1024.0 * 1024.0)
+        culling = self._renderWidget.cullingStatistics()
+        self.statistics.setText("Render time: " + str(round(times[0],2)) + "ms, GPU time: " + str(round(times[1],2)) + "ms, GPU memory: " + str(round(memory,2)) + "MiB"
+            + ", Drawn: " + str(culling["drawn"]) + ", Culled: " + str(culling["culled"]))
+
+
+    def actorLoadFailed(self, filename, message):
+        """Shows why a model could not be loaded"""
+        self.statusBar().showMessage("Could not load " + filename + ": " + message, 10000)
 
 
     def clearStatistics(self):
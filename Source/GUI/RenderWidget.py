@@ -6,6 +6,9 @@ from Source.Graphics.Renderer import Renderer
 
 class RenderWidget(QWidget):
 
+    ## a model could not be loaded: file name, reason
+    actorLoadFailed = pyqtSignal(str, str)
+
     def __init__(self, parent=None, **kwargs):
         super(RenderWidget, self).__init__(parent)
 
@@ -15,6 +18,7 @@ class RenderWidget(QWidget):
         ## create render window
         self._parent = parent
         self._renderer = Renderer(self, antialiasing=True, **kwargs)
+        self._renderer.actorLoadFailed.connect(self.actorLoadFailed)
 
         self._mainLayout = QVBoxLayout()
         self._mainLayout.setContentsMargins(0, 0, 0, 0)
@@ -232,6 +236,16 @@ class RenderWidget(QWidget):
         return self._renderer.renderTimeEstimates()
 
 
+    def gpuBytesAllocated(self):
+        """Ask viewer for the GPU memory held by its resources"""
+        return self._renderer.gpuBytesAllocated()
+
+
+    def cullingStatistics(self):
+        """Ask viewer for the actors culled and drawn in the last frame"""
+        return self._renderer.cullingStatistics()
+
+
     def sizeHint(self):
         return QSize(1280, 800)
 
@@ -9,6 +9,14 @@ from PyQt5.QtWidgets import QOpenGLWidget
 from OpenGL import GL
 from Source.Graphics.Shaders import Shaders
 from Source.Graphics.Material import Material
+from Source.Graphics.MeshRegistry import MeshRegistry
+from Source.Graphics.VertexFormat import VertexFormat
+from Source.Graphics.VertexLayout import VertexLayout
+from Source.Graphics.StreamingBuffer import StreamingBuffer
+from Source.Graphics.BufferArena import BufferArena
+from Source.Graphics.ResourceManager import ResourceManager
+from Source.Graphics.UniformCache import UniformCache
+from Source.Graphics.GLState import GLState
 
 ##  Abstract base class for different actor implementations.
 class Actor(QObject):
@@ -33,6 +41,18 @@ class Actor(QObject):
         Modes = [Points, Lines, LineLoop, LineStrip, Triangles, TriangleStrip, TriangleFan]
 
 
+    ## whether actors of this class draw from the shared buffers of the BufferArena, unless created with arena=...
+    UsesArena = False
+
+    ## constant uniform values, not rebuilt for every actor
+    HighlightEmission = QVector3D(0.25, 0.25, 0.25)
+
+    ## buffer state shared by actors created from the same mesh
+    SharedState = ['_vao', '_vbo', '_ibo', '_num_vertices', '_num_indices', '_index_type',
+        '_hasNormals', '_hasColors', '_hasTextureCoords', '_hasIndices',
+        '_vertex_layout',
+        '_position_scale', '_position_offset', '_normal_encoding', '_vertex_format', '_vertex_bytes', '_mesh_bounds']
+
     ## initialization
     def __init__(self, scene, **kwargs):
         """Initialize actor."""
@@ -65,6 +85,28 @@ class Actor(QObject):
         self._ibo = QOpenGLBuffer(QOpenGLBuffer.IndexBuffer)
         self._num_vertices = 0
         self._num_indices = 0
+        self._index_type = GL.GL_UNSIGNED_INT
+        self._mesh_key = None
+        self._vertex_bytes = 0
+        self._vertex_layout = None
+
+        ## dynamic geometry, see StreamingBuffer
+        self._stream = None
+        self._stream_arrays = {}
+
+        ## ranges sub-allocated from the shared buffers of the BufferArena
+        self._arena = kwargs.get("arena", self.UsesArena)
+        self._arena_vertices = None
+        self._arena_indices = None
+
+        ## draws repeated per instance, see renderInstanced
+        self._instance_count = 0
+
+        ## dequantization of compact vertex formats, identity for float data
+        self._position_scale = QVector3D(1.0, 1.0, 1.0)
+        self._position_offset = QVector3D(0.0, 0.0, 0.0)
+        self._normal_encoding = VertexFormat.NormalDecoding.Vector
+        self._vertex_format = None
 
         self._hasNormals = False
         self._hasColors = False
@@ -77,6 +119,13 @@ class Actor(QObject):
         self._center = QVector3D(0,0,0)
         self._size = QVector3D(1.0,1.0,1.0)
 
+        ## box around the vertices in model space, and around the actor in world space, see worldBounds
+        self._mesh_bounds = None
+        self._world_bounds = None
+        self._world_bounds_transform = None
+        self._pick_bounds = None
+        self._pick_bounds_transform = None
+
         #self._bbox = None
         self._visible = True
         self._enabled = False
@@ -95,6 +144,7 @@ class Actor(QObject):
     def update(self, **kwargs):
         """Update this node"""
         self._transform = kwargs.get("transform", QMatrix4x4())
+        self.transformChanged()
         self._subdivisionLevel = kwargs.get("subdivisionLevel", 1)
         self._radius = kwargs.get("radius", 1.0)
         self._render_mode = kwargs.get("mode", Actor.RenderMode.Triangles)
@@ -126,14 +176,44 @@ class Actor(QObject):
     def setCenter(self):
         if self._pointMax is not None and self._pointMin is not None:
             self._center = QVector3D(self._pointMax+self._pointMin)/2
+            self._pick_bounds = None
 
     def setSize(self):
         if self._pointMax is not None and self._pointMin is not None:
             self._size = QVector3D(self._pointMax-self._pointMin)
+            self._pick_bounds = None
 
     def center(self):
         return self._center
 
+
+    def setMeshBounds(self, vertices):
+        """Sets the model space box around vertices, an array of positions, None for unknown bounds"""
+        if vertices is None or len(vertices) == 0:
+            self._mesh_bounds = None
+        else:
+            vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+            self._mesh_bounds = (vertices.min(axis=0), vertices.max(axis=0))
+        self._world_bounds = None
+
+
+    def worldBounds(self):
+        """Returns the world space bounding sphere center and radius, box min and max as 10 floats, None if unknown"""
+        if self._mesh_bounds is None:
+            return None
+
+        ## cached until the transform changes, gizmos edit it in place
+        if self._world_bounds is None or self._world_bounds_transform != self._transform:
+            self._world_bounds_transform = QMatrix4x4(self._transform)
+            matrix = np.array(self._transform.data(), dtype=np.float32).reshape(4, 4).T
+            corners = np.array(np.meshgrid(*zip(*self._mesh_bounds), indexing='ij')).reshape(3, 8).T
+            corners = corners @ matrix[:3, :3].T + matrix[:3, 3]
+            low, high = corners.min(axis=0), corners.max(axis=0)
+            center = (low + high) / 2.0
+            radius = np.sqrt(((corners - center) ** 2).sum(axis=1).max())
+            self._world_bounds = np.concatenate([center, [radius], low, high]).astype(np.float32)
+        return self._world_bounds
+
     def size(self):
         return self._size
             
@@ -146,8 +226,20 @@ class Actor(QObject):
         return self._material
 
 
+    def setMaterial(self, material):
+        """Sets the material of this node"""
+        self._material = material
+
+
     def setTransform(self, xform):
         self._transform = xform
+        self.transformChanged()
+
+
+    def transformChanged(self):
+        """Tells the scene that this actor moved, see Scene.actorMoved"""
+        if self._scene is not None:
+            self._scene.actorMoved(self)
 
 
     def transform(self):
@@ -163,6 +255,7 @@ class Actor(QObject):
         #print("pos==",pos)
         self._transform = QMatrix4x4()
         self._transform.translate(pos.x(), pos.y(), pos.z())
+        self.transformChanged()
 
 
     def texture(self):
@@ -171,8 +264,10 @@ class Actor(QObject):
 
 
     def setTexture(self, texture):
-        """Sets the current texture"""
+        """Sets the current texture, owned by this actor unless another owner already tracks it"""
         self._texture = texture
+        if texture is not None and texture.isCreated() and not ResourceManager().isTracked(texture):
+            ResourceManager().track(texture, self, ResourceManager.Kind.Texture, ResourceManager.textureSize(texture))
 
 
     def isPickable(self):
@@ -340,10 +435,40 @@ class Actor(QObject):
         return self._num_indices
 
 
+    @property
+    def indexType(self):
+        """Returns the OpenGL type of the indices of this actor"""
+        return self._index_type
+
+
+    @property
+    def vertexBufferSize(self):
+        """Returns the size in bytes of the vertex buffer of this actor"""
+        if self._stream is not None:
+            return self._stream.capacity()
+        return self._vertex_bytes
+
+
+    def isDynamic(self):
+        """Returns true if the vertex buffer is streamed, see StreamingBuffer"""
+        return self._stream is not None
+
+
+    def streamingStatistics(self):
+        """Returns the upload statistics of a dynamic actor, None for static ones"""
+        return self._stream.statistics() if self._stream is not None else None
+
+
+    def attributeShaders(self):
+        """Returns the shaders whose vertex attributes are set up by this actor"""
+        return [self._solid_shader, self._wireframe_shader, self._nolight_solid_shader,
+            self._nolight_wireframe_shader, self._normal_visualizing_shader]
+
+
     def mapBuffer(self, offset, count, access):
         """Map the given buffer into a numpy array"""
         vbo_ptr = self._vbo.mapRange( offset, count, access )
-        vp_array = ctypes.cast(ctypes.c_void_p(int(vbo_ptr)), ctypes.POINTER(ctypes.c_byte * self._vbo.size())).contents
+        vp_array = ctypes.cast(ctypes.c_void_p(int(vbo_ptr)), ctypes.POINTER(ctypes.c_byte * count)).contents
         # Note: we could have returned the raw ctypes.c_byte array instead... see pyglet github for map/unmap classes
         array = np.frombuffer( vp_array, 'B' )
         return array
@@ -355,133 +480,180 @@ class Actor(QObject):
 
     def setSubdivisionLevel(self, val):
         self._subdivisionLevel = val
-        self._active_shader.bind()
-        self._active_shader.setUniformValue("innerSubdivisionLevel", val)
-        self._active_shader.setUniformValue("outerSubdivisionLevel", val)
-        self._active_shader.release()
+        GLState().useProgram(self._active_shader)
+        self.setUniform("innerSubdivisionLevel", val)
+        self.setUniform("outerSubdivisionLevel", val)
 
     def setRadius(self, val):
         self._radius = val
-        self._active_shader.bind()
-        self._active_shader.setUniformValue("radius", val)
-        self._active_shader.release()
+        GLState().useProgram(self._active_shader)
+        self.setUniform("radius", val)
     
     def getRadius(self):
         return self._radius
 
 
+    @staticmethod
+    def bufferData(array):
+        """Returns (data, size in bytes) of an array, read in place by QOpenGLBuffer.write"""
+        data = np.ascontiguousarray(array)
+        return data, data.nbytes
+
+
+    def encodeArrays(self, arrays):
+        """Returns a dictionary of attribute arrays encoded with the vertex format the buffers were created with"""
+        format = self._vertex_format if self._vertex_format is not None else VertexFormat()
+        result = {}
+        for name, data in arrays.items():
+            if name == 'position':
+                ## new bounds, the dequantization transform follows them
+                data, position_type, position_size, scale, offset = format.encodePositions(data)
+                self._position_scale.setX(scale[0]); self._position_scale.setY(scale[1]); self._position_scale.setZ(scale[2])
+                self._position_offset.setX(offset[0]); self._position_offset.setY(offset[1]); self._position_offset.setZ(offset[2])
+            elif name == 'normal':
+                data = format.encodeNormals(data)[0]
+            elif name == 'color':
+                data = format.encodeColors(data)[0]
+            elif name == 'texcoord':
+                data = format.encodeTexcoords(data)[0]
+            result[name] = data
+        return result
+
+
     def updateBuffer(self, vertices=None, normals=None, colors=None, texcoords=None):
-        """Update buffer with new data"""
-        self._vbo.bind()
+        """Update buffer with new data, encoded like the data given to create()"""
+        arrays = {'position': vertices, 'normal': normals, 'color': colors, 'texcoord': texcoords}
+        arrays = {name: data for name, data in arrays.items() if data is not None}
         if vertices is not None:
-            vertices = vertices.tostring()
-            #vertices = np.fromstring(vertices, dtype="uint8")
-            self._vbo.write(0, vertices, len(vertices))
-            #buffer = self.mapBuffer(0, len(vertices), QOpenGLBuffer.RangeWrite | QOpenGLBuffer.RangeInvalidate)
-            #buffer[:len(vertices)] = vertices
-            #self.unmapBuffer()
-        if normals is not None:
-            normals = normals.tostring()
-            self._vbo.write(self._offsetNormals, normals, len(normals))
-        if colors is not None:
-            colors = colors.tostring()
-            self._vbo.write(self._offsetColors, colors, len(colors))
-        if texcoords is not None:
-            texcoords = texcoords.tostring()
-            self._vbo.write(self._offsetTexCoords, texcoords, len(texcoords))
+            self.setMeshBounds(vertices)
+        arrays = self.encodeArrays(arrays)
+        layout = self._vertex_layout
+        self._vbo.bind()
+        if self._stream is not None:
+            ## every region is written whole, reusing the attributes left out
+            self._stream_arrays.update(arrays)
+            base = self._stream.offset()
+            self._stream.write(layout, self._stream_arrays)
+            if self._stream.offset() != base:
+                self._vao.bind()
+                layout.configure(self.attributeShaders(), self._stream.offset())
+                self._vao.release()
+        elif layout.isInterleaved():
+            ## scatter into the records of the mapped buffer, keeping the other attributes
+            buffer = self.mapBuffer(self.baseVertex() * layout.vertexSize(), layout.bufferSize(), QOpenGLBuffer.RangeWrite)
+            for name, data in arrays.items():
+                layout.write(buffer, name, data)
+            self.unmapBuffer()
+        else:
+            for name, data in arrays.items():
+                data = layout.attribute(name).rows(data)
+                self._vbo.write(layout.attribute(name).offset, data, data.nbytes)
         self._vbo.release()
 
 
-    def create(self, vertices, normals=None, colors=None, texcoords=None, indices=None, usage=QOpenGLBuffer.StaticDraw):
+    def create(self, vertices, normals=None, colors=None, texcoords=None, indices=None, usage=QOpenGLBuffer.StaticDraw, format=None,
+        layout=VertexLayout.Mode.Planar, streaming=None):
         """Create object vertex arrays and buffers"""
         
         ## list of shaders
-        shaders = [self._solid_shader, self._wireframe_shader, self._nolight_solid_shader, 
-            self._nolight_wireframe_shader, self._normal_visualizing_shader]
-
-        ## bind vao
-        self._vao.create()
-        self._vao.bind()
-
-        ## define total sizes
-        vertices = vertices.tostring()
-        total_vertices = len(vertices)
-        total_normals = 0
-        total_colors = 0
-        total_texcoords = 0
-        self._num_vertices = total_vertices // (np.dtype(np.float32).itemsize * 3)
+        shaders = self.attributeShaders()
+
+        ## attribute encodings, float32 unless asked otherwise
+        if format is None:
+            format = VertexFormat()
+        self._vertex_format = format
+
+        ## arena actors share interleaved buffers, static geometry only
+        arena = self._arena and streaming is None
+        if arena:
+            layout = VertexLayout.Mode.Interleaved
+
+        ## culling bounds from the positions before encoding
+        self.setMeshBounds(vertices)
+
+        ## describe the attributes as encoded
+        layout = VertexLayout(mode=layout)
+        vertices, position_type, position_size, scale, offset = format.encodePositions(vertices)
+        self._position_scale = QVector3D(*scale)
+        self._position_offset = QVector3D(*offset)
+        layout.add('position', position_type, position_size, position_type not in VertexLayout.FloatTypes)
+        self._num_vertices = len(layout.attribute('position').rows(vertices))
         #print('total vertices=', self._num_vertices)
 
         if normals is not None:
             self._hasNormals = True
-            normals = normals.tostring()
-            total_normals = len(normals)
+            normals, normal_type, normal_size, self._normal_encoding = format.encodeNormals(normals)
+            layout.add('normal', normal_type, normal_size, normal_type not in VertexLayout.FloatTypes)
 
         if colors is not None:
             self._hasColors = True
-            colors = colors.tostring()
-            total_colors = len(colors)
+            colors, color_type, color_size = format.encodeColors(colors)
+            layout.add('color', color_type, color_size, color_type not in VertexLayout.FloatTypes)
 
         if texcoords is not None:
             self._hasTextureCoords = True
-            texcoords = texcoords.tostring()
-            total_texcoords = len(texcoords)
+            texcoords, texcoord_type, texcoord_size = format.encodeTexcoords(texcoords)
+            layout.add('texcoord', texcoord_type, texcoord_size, texcoord_type not in VertexLayout.FloatTypes)
+        layout.setVertexCount(self._num_vertices)
+        self._vertex_layout = layout
 
         if indices is not None:
             self._hasIndices = True
-            indices = indices.tostring()
-            total_indices = len(indices)
-            self._num_indices = total_indices // np.dtype(np.uint32).itemsize
+            indices = format.encodeIndices(indices)
+            if indices.dtype == np.uint16:
+                self._index_type = GL.GL_UNSIGNED_SHORT
+            else:
+                self._index_type = GL.GL_UNSIGNED_INT
+                indices = indices.astype(np.uint32, copy=False)
+            if arena:
+                indices = indices.astype(np.uint32, copy=False)
+                self._index_type = GL.GL_UNSIGNED_INT
+            index_size = indices.dtype.itemsize
+            indices, total_indices = self.bufferData(indices)
+            self._num_indices = total_indices // index_size
             #print('total indices=', self._num_indices)
-        
+
+        arrays = {'position': vertices, 'normal': normals, 'color': colors, 'texcoord': texcoords}
+        self._vertex_bytes = layout.bufferSize()
+        if arena:
+            ## draw from the pool of this layout with base vertex and first index offsets
+            vertices = layout.pack(arrays)[0][1]
+            self._arena_vertices, self._arena_indices = BufferArena().allocate(layout, vertices,
+                indices if self._hasIndices else None, shaders)
+            pool = self._arena_vertices.pool
+            self._vao, self._vbo, self._ibo = pool.vao, pool.vbo, pool.ibo
+            return
+
+        ## bind vao
+        resources = ResourceManager()
+        self._vao.create()
+        self._vao.bind()
+        resources.track(self._vao, self, ResourceManager.Kind.VertexArray)
+
         ## create vertex buffer object
         self._vbo.setUsagePattern(usage)
         self._vbo.create()
         self._vbo.bind()
 
         ## populate vertex buffer object with data
-        offset = 0
-        self._vbo.allocate(total_vertices + total_normals + total_colors + total_texcoords)
-        self._vbo.write(offset, vertices, total_vertices)
-        for each in shaders:
-            each.setAttributeBuffer('position', GL.GL_FLOAT, offset, 3, 3 * np.dtype(np.float32).itemsize)
-        offset += total_vertices
-        self._offsetNormals = offset
-        
-        if self._hasNormals:
-            self._vbo.write(offset, normals, total_normals)
-            for each in shaders:
-                each.setAttributeBuffer('normal', GL.GL_FLOAT, offset, 3, 3 * np.dtype(np.float32).itemsize)
-            offset += total_normals
-        if self._hasColors:
-            self._offsetColors = offset
-            self._vbo.write(offset, colors, total_colors)
-            for each in shaders:
-                each.setAttributeBuffer('color', GL.GL_FLOAT, offset, 3, 3 * np.dtype(np.float32).itemsize)
-            offset += total_colors
-        if self._hasTextureCoords:
-            self._offsetTexCoords = offset
-            self._vbo.write(offset, texcoords, total_texcoords)
-            for each in shaders:
-                each.setAttributeBuffer('texcoord', GL.GL_FLOAT, offset, 2, 2 * np.dtype(np.float32).itemsize)
-            offset += total_texcoords
+        if streaming is not None:
+            ## geometry rewritten every frame, streamed through several regions
+            self._stream = StreamingBuffer(self._vbo, self._vertex_bytes, mode=streaming)
+            self._stream.allocate()
+            self._stream_arrays = {name: data for name, data in arrays.items() if data is not None}
+            self._stream.write(layout, self._stream_arrays)
+        else:
+            self._vbo.allocate(self._vertex_bytes)
+            for offset, data in layout.pack(arrays):
+                self._vbo.write(offset, data, data.nbytes)
+        resources.track(self._vbo, self, ResourceManager.Kind.Buffer, self.vertexBufferSize)
+
+        ## attribute arrays are part of the vao state
+        layout.configure(shaders, self._stream.offset() if self._stream is not None else 0)
 
         ## release buffer
         self._vbo.release(QOpenGLBuffer.VertexBuffer)
 
-        ## enable arrays as part of the vao state
-        for each in shaders:
-            each.enableAttributeArray('position')
-        if self._hasNormals:
-            for each in shaders:
-                each.enableAttributeArray('normal')
-        if self._hasColors:
-            for each in shaders:
-                each.enableAttributeArray('color')
-        if self._hasTextureCoords:
-            for each in shaders:
-                each.enableAttributeArray('texcoord')
-
         ## create index buffer object if required by the actor
         if self._hasIndices:
             self._ibo.setUsagePattern(usage)
@@ -490,6 +662,7 @@ class Actor(QObject):
 
             self._ibo.allocate(total_indices)
             self._ibo.write(0, indices, total_indices)
+            resources.track(self._ibo, self, ResourceManager.Kind.Buffer, total_indices)
 
         ## release vao
         self._vao.release()
@@ -499,114 +672,178 @@ class Actor(QObject):
             self._ibo.release(QOpenGLBuffer.IndexBuffer)
 
 
+    def createShared(self, key, vertices, **kwargs):
+        """Create object buffers, reusing those of other actors created with the same key"""
+        self.release()
+        registry = MeshRegistry()
+        state = registry.acquire(key)
+        if state is None:
+            self.create(vertices, **kwargs)
+            registry.register(key, {name: getattr(self, name, None) for name in self.SharedState})
+        else:
+            for name, value in state.items():
+                setattr(self, name, value)
+            self._world_bounds = None
+        self._mesh_key = key
+
+
+    def isShared(self):
+        """Returns whether this actor's buffers are owned by the mesh registry"""
+        return self._mesh_key is not None
+
+
+    def release(self):
+        """Drops this actor's reference to shared buffers"""
+        if self._mesh_key is not None:
+            MeshRegistry().release(self._mesh_key)
+            self._mesh_key = None
+        if self._arena_vertices is not None:
+            BufferArena().free(self._arena_vertices, self._arena_indices)
+            self._arena_vertices = None
+            self._arena_indices = None
+            self._vao = QOpenGLVertexArrayObject()
+            self._vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+            self._ibo = QOpenGLBuffer(QOpenGLBuffer.IndexBuffer)
+
+
+    def isInArena(self):
+        """Returns whether this actor's geometry lives in the shared buffers of the BufferArena"""
+        return self._arena_vertices is not None
+
+
+    def baseVertex(self):
+        """Returns the first vertex of this actor in its vertex buffer"""
+        return self._arena_vertices.first if self._arena_vertices is not None else 0
+
+
+    def drawArrays(self, mode, first, count):
+        """Draws count vertices from first, relative to this actor's vertices, once per instance inside renderInstanced"""
+        if self._instance_count:
+            GL.glDrawArraysInstanced(mode, self.baseVertex() + first, count, self._instance_count)
+        else:
+            GL.glDrawArrays(mode, self.baseVertex() + first, count)
+
+
+    def drawElements(self, mode, count, first=0):
+        """Draws count indices from first, relative to this actor's indices, once per instance inside renderInstanced"""
+        if self._arena_indices is None:
+            offset = first * (2 if self._index_type == GL.GL_UNSIGNED_SHORT else 4)
+            pointer = ctypes.c_void_p(offset) if offset else None
+            if self._instance_count:
+                GL.glDrawElementsInstanced(mode, count, self._index_type, pointer, self._instance_count)
+            else:
+                GL.glDrawElements(mode, count, self._index_type, pointer)
+        else:
+            pointer = ctypes.c_void_p((self._arena_indices.first + first) * 4)
+            if self._instance_count:
+                GL.glDrawElementsInstancedBaseVertex(mode, count, GL.GL_UNSIGNED_INT, pointer,
+                    self._instance_count, self.baseVertex())
+            else:
+                GL.glDrawElementsBaseVertex(mode, count, GL.GL_UNSIGNED_INT, pointer, self.baseVertex())
+
+
+    def renderInstanced(self, shader, count):
+        """Issues the draws of render() count times with shader bound and the vertex array of an InstancedActor"""
+        self._active_shader = shader
+        self._instance_count = count
+        try:
+            self.render()
+        finally:
+            self._instance_count = 0
+
+
+    def setUniform(self, name, value):
+        """Sets a uniform of the active shader, skipped when the shader already holds the value"""
+        return UniformCache().set(self._active_shader, name, value)
+
+
+    def writeObjectData(self, out):
+        """Writes the std140 ObjectData block of this actor into out, see FrameUniforms"""
+        out[0:16] = self._transform.data()
+        normal = self._transform.normalMatrix().data()
+        out[16:19] = normal[0:3]
+        out[20:23] = normal[3:6]
+        out[24:27] = normal[6:9]
+        out[28:31] = (self._position_scale.x(), self._position_scale.y(), self._position_scale.z())
+        out[32:35] = (self._position_offset.x(), self._position_offset.y(), self._position_offset.z())
+        out[35:36].view(np.int32)[0] = self._normal_encoding
+
+
     def setUniformBindings(self, wireframe=False):
-        """Sets up uniform shader bindings"""
-        normalMatrix = self._transform.normalMatrix()
-        self._active_shader.setUniformValue("modelMatrix", self._transform)
-        self._active_shader.setUniformValue("viewMatrix", self._scene.camera.viewMatrix)
-        self._active_shader.setUniformValue("projectionMatrix", self._scene.camera.projectionMatrix)
-        self._active_shader.setUniformValue("normalMatrix", normalMatrix)
-        
-        self._active_shader.setUniformValue("innerSubdivisionLevel", self._subdivisionLevel)
-        self._active_shader.setUniformValue("outerSubdivisionLevel", self._subdivisionLevel)
-        self._active_shader.setUniformValue("radius", self._radius)
+        """Sets up uniform shader bindings, the camera, light and transform come from the FrameData and ObjectData blocks"""
+        self.setUniform("innerSubdivisionLevel", self._subdivisionLevel)
+        self.setUniform("outerSubdivisionLevel", self._subdivisionLevel)
+        self.setUniform("radius", self._radius)
 
 
         if self.texture() is not None:
-            self._active_shader.setUniformValue("texObject", 0)
+            self.setUniform("texObject", 0)
         
         ## bind active material
         if self.isSelectable() and self.isSelected():
-            self._active_shader.setUniformValue("selected", 1.0)
+            self.setUniform("selected", 1.0)
         else:
-            self._active_shader.setUniformValue("selected", 0.65)
+            self.setUniform("selected", 0.65)
 
-        ## set highlight color
-        if self.isHighlighted():
-            self._active_shader.setUniformValue("material.emission", QVector3D(0.25, 0.25, 0.25))
+        ## set highlight and enabled color
+        if self.isHighlighted() or self.isEnabled():
+            self.setUniform("material.emission", Actor.HighlightEmission)
         else:
-            self._active_shader.setUniformValue("material.emission", self._active_material.emissionColor)
-        self._active_shader.setUniformValue("material.ambient", self._active_material.ambientColor)
-        
-        ## set the enabled color
-        if self.isEnabled():
-            self._active_shader.setUniformValue("material.emission", QVector3D(0.25, 0.25, 0.25))
-            self._active_shader.setUniformValue("material.diffuse", self._active_material.diffuseColor)
-        else:
-            self._active_shader.setUniformValue("material.diffuse", self._active_material.diffuseColor)
-        self._active_shader.setUniformValue("material.specular", self._active_material.specularColor)
-        self._active_shader.setUniformValue("material.shininess", self._active_material.shininess)
-    
-        ## set the error and warning colors
-        if self._errorHighlight:
-            self._active_shader.setUniformValue("material.ambient", self._errorMaterial.ambientColor)
-            self._active_shader.setUniformValue("material.diffuse", self._errorMaterial.diffuseColor)
-            self._active_shader.setUniformValue("material.specular", self._errorMaterial.specularColor)
-            self._active_shader.setUniformValue("material.shininess", self._errorMaterial.shininess)
+            self.setUniform("material.emission", self._active_material.emissionColor)
+
+        ## the warning colors override the error colors, which override the active material
+        material = self._active_material
         if self._warningHighlight:
-            self._active_shader.setUniformValue("material.ambient", self._warningMaterial.ambientColor)
-            self._active_shader.setUniformValue("material.diffuse", self._warningMaterial.diffuseColor)
-            self._active_shader.setUniformValue("material.specular", self._warningMaterial.specularColor)
-            self._active_shader.setUniformValue("material.shininess", self._warningMaterial.shininess)     
-        
-        ## bind lights
-        camera_position = QVector4D(self._scene.camera.position[0], self._scene.camera.position[1], self._scene.camera.position[2], 1.0)
-        if self._scene.light.headlight:
-            if self._scene.light.directional:
-                self._active_shader.setUniformValue("lightPosition", QVector4D(0.0, 0.0, 1.0, 0.0))
-            else:
-                self._active_shader.setUniformValue("lightPosition", QVector4D(0.0, 0.0, 0.0, 1.0))
-        else:
-            self._active_shader.setUniformValue("lightPosition", self._scene.camera.viewMatrix * self._scene.light.position)
+            material = self._warningMaterial
+        elif self._errorHighlight:
+            material = self._errorMaterial
+        self.setUniform("material.ambient", material.ambientColor)
+        self.setUniform("material.diffuse", material.diffuseColor)
+        self.setUniform("material.specular", material.specularColor)
+        self.setUniform("material.shininess", material.shininess)
 
-        self._active_shader.setUniformValue("light.ambient", self._scene.light.ambientColor)
-        self._active_shader.setUniformValue("light.diffuse", self._scene.light.diffuseColor)
-        self._active_shader.setUniformValue("light.specular", self._scene.light.specularColor)
-        self._active_shader.setUniformValue("lightAttenuation", self._scene.light.attenuation)
+
+    def renderState(self, draw_style, lighting, shading, passNumber):
+        """Returns the (shader, material) this actor draws with in a pass"""
+        if lighting:
+            if draw_style == GL.GL_LINE:
+                return self._wireframe_shader, self._material if passNumber == 0 else self._wireframe
+            if shading == GL.GL_SMOOTH:
+                return self._solid_shader, self._material
+            return self._solid_flat_shader, self._material
+        if draw_style == GL.GL_LINE:
+            return self._nolight_wireframe_shader, self._material if passNumber == 0 else self._wireframe
+        return self._nolight_solid_shader, self._material
 
 
     ## This should set up any required state before any actual rendering happens.
     def beginRendering(self, draw_style, lighting, shading, passNumber):
         ## determine right shader to bind
-        if lighting:
-            if draw_style == GL.GL_LINE:
-                self._active_shader = self._wireframe_shader
-                self._active_material = self._material if passNumber == 0 else self._wireframe
-            else:
-                if shading == GL.GL_SMOOTH:
-                    self._active_shader = self._solid_shader
-                else:
-                    self._active_shader = self._solid_flat_shader
-                self._active_material = self._material
-        else:
-            if draw_style == GL.GL_LINE:
-                self._active_shader = self._nolight_wireframe_shader
-                self._active_material = self._material if passNumber == 0 else self._wireframe
-            else:
-                self._active_shader = self._nolight_solid_shader
-                self._active_material = self._material
+        self._active_shader, self._active_material = self.renderState(draw_style, lighting, shading, passNumber)
 
-        GL.glPolygonMode(GL.GL_FRONT_AND_BACK, draw_style)
+        state = GLState()
+        state.polygonMode(draw_style)
 
         ## determine rendering type to use
         if self._render_type == self.RenderType.Solid:
-            GL.glEnable(GL.GL_DEPTH_TEST)
-            GL.glDepthMask(GL.GL_TRUE)
+            state.enable(GL.GL_DEPTH_TEST)
+            state.depthMask(True)
         elif self._render_type == self.RenderType.Transparent:
-            GL.glEnable(GL.GL_DEPTH_TEST)
-            GL.glDepthMask(GL.GL_FALSE)
+            state.enable(GL.GL_DEPTH_TEST)
+            state.depthMask(False)
         elif self._render_type == self.RenderType.Overlay:
-            GL.glDisable(GL.GL_DEPTH_TEST)
+            state.disable(GL.GL_DEPTH_TEST)
         
-        ## bind shader
-        self._active_shader.bind()
+        ## bind shader, skipped if the previous draw used it
+        state.useProgram(self._active_shader)
 
         ## set up uniform variables
+        self._scene.frameUniforms().bindObject(self)
         self.setUniformBindings()
 
         if self._texture is not None:
             #self.glEnable(GL.GL_BLEND)
-            self._texture.bind()
+            state.bindTexture(self._texture)
 
         ## bind shader
         self._vao.bind()
@@ -620,15 +857,12 @@ class Actor(QObject):
     def endRendering(self):
         """Finished rendering, clean yourself up"""
 
-        ## unbind vao
+        ## unbind vao, the shader and texture stay bound for the next draw, see GLState
         self._vao.release()
 
-        ## unbind texture
-        if self._texture is not None:
-            self._texture.release()
-
-        ## unbind shader
-        self._active_shader.release()
+        ## the streamed region may be rewritten once these draws are done
+        if self._stream is not None:
+            self._stream.fence()
 
 
     def pickFactor(self):
@@ -639,15 +873,49 @@ class Actor(QObject):
     def setPickFactor(self, value):
         """Sets the pick factor for intersection calculations"""
         self._pickFactor = value
+        self._pick_bounds = None
 
 
     def destroy(self):
-        self._vao.destroy()
-        self._vbo.destroy()
-        self._ibo.destroy()
+        """Hands this actor's GPU objects to the ResourceManager, deleted on the next frame"""
+        resources = ResourceManager()
+        if self._texture is not None and resources.owner(self._texture) is self:
+            resources.release(self._texture)
+            self._texture = None
+        if self.isShared() or self.isInArena():
+            self.release()
+            return
+        if self._stream is not None:
+            resources.release(self._stream)
+            self._stream = None
+        resources.release(self._vao)
+        resources.release(self._vbo)
+        resources.release(self._ibo)
         
-    def intersect(self, ray):
-        """Returns intersection if any"""
+    def pickBounds(self, transform=None):
+        """Returns the world space box, min and max as 6 floats, enclosing the box tested by intersect()"""
+        if transform is None:
+            ## cached until the transform changes, gizmos edit it in place
+            if self._pick_bounds is None or self._pick_bounds_transform != self._transform:
+                self._pick_bounds_transform = QMatrix4x4(self._transform)
+                self._pick_bounds = self.pickBounds(self._transform)
+            return self._pick_bounds
+
+        xform = QMatrix4x4()
+        xform.translate(self._center.x(), self._center.y(), self._center.z())
+        xform.scale(self._size.x(), self._size.y(), self._size.z())
+        matrix = np.array((transform * xform).data(), dtype=np.float64).reshape(4, 4).T
+
+        ## intersect() spans the normalized columns by half the row lengths, rays parallel to a face ignore the pick factor
+        linear = matrix[:3, :3]
+        axes = linear / np.maximum(np.linalg.norm(linear, axis=0), 1e-12)
+        halves = np.linalg.norm(linear, axis=1) / 2.0 * max(self._pickFactor, 1.0)
+        extent = np.abs(axes) @ halves
+        return np.concatenate([matrix[:3, 3] - extent, matrix[:3, 3] + extent])
+
+
+    def intersect(self, ray, transform=None):
+        """Returns intersection if any, with the bounding box placed by transform, this actor's transform by default"""
         tMin = -math.inf
         tMax = math.inf
         
@@ -655,7 +923,7 @@ class Actor(QObject):
         xform.translate(self._center.x(), self._center.y(), self._center.z())
         xform.scale(self._size.x(), self._size.y(), self._size.z())
 
-        obb_xform = self._transform
+        obb_xform = self._transform if transform is None else transform
         obb_xform = obb_xform * xform
         obb_center = QVector3D(obb_xform[0,3], obb_xform[1,3], obb_xform[2,3])
         point = obb_center - ray.origin()
@@ -5,6 +5,9 @@ from Source.Graphics.Actor import Actor
 
 class Axis(Actor):
 
+    ## small mesh, drawn from the shared buffers of the BufferArena
+    UsesArena = True
+
     ## initialization
     def __init__(self, scene, **kwargs):
         """Initialize actor."""
@@ -54,7 +57,7 @@ class Axis(Actor):
 
     def render(self):
         """Render grid"""
-        GL.glDrawArrays(GL.GL_LINES, 0, 4)
+        self.drawArrays(GL.GL_LINES, 0, 4)
 
 
 
@@ -6,10 +6,13 @@ from Source.Graphics.Actor import Actor
 
 class Background(Actor):
 
+    ## small mesh, drawn from the shared buffers of the BufferArena
+    UsesArena = True
+
     ## initialization
     def __init__(self, scene, **kwargs):
         """Initialize actor."""
-        super(Background, self).__init__(scene, type=Actor.RenderType.Overlay)
+        super(Background, self).__init__(scene, type=Actor.RenderType.Overlay, arena=kwargs.get("arena", Background.UsesArena))
 
         defaultPalette = {
             'top_left': QColor(107, 128, 140),
@@ -158,7 +161,7 @@ class Background(Actor):
 
     def render(self):
         """Render background"""
-        GL.glDrawArrays(self._render_mode, 0, self.numberOfVertices)
+        self.drawArrays(self._render_mode, 0, self.numberOfVertices)
 
 
 
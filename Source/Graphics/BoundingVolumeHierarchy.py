@@ -0,0 +1,252 @@
+import math
+import numpy as np
+
+##  Bounding volume hierarchy over the pickable items of a scene.
+##
+##  Items are actors, group parts or instances: anything with pickBounds(),
+##  its world space box as min and max, and intersect(ray). The tree is a
+##  binary tree built top-down, splitting each node at the best of Bins
+##  candidate planes along its longest centroid axis by the surface area
+##  heuristic, down to leaves of at most LeafSize items. An item that moved
+##  is refit: its leaf and the boxes above it grow or shrink to the new
+##  bounds, the tree shape is kept. Rays visit the nearer child first and
+##  skip the nodes entered beyond the closest hit found so far.
+class BoundingVolumeHierarchy:
+
+    ## candidate split planes per node
+    Bins = 16
+
+    ## largest number of items in a leaf
+    LeafSize = 4
+
+    ## initialization
+    def __init__(self):
+        """Initialize empty hierarchy"""
+        self._items = []
+        self._positions = {}
+        self._bounds = []
+        self._boxes = []
+        self._left = []
+        self._first = []
+        self._count = []
+        self._parent = []
+        self._leaves = []
+        self._moved = set()
+        self._visited = 0
+
+
+    def __len__(self):
+        return len(self._items)
+
+
+    def numberOfNodes(self):
+        """Returns the number of nodes of the tree"""
+        return len(self._boxes)
+
+
+    @staticmethod
+    def area(low, high):
+        """Returns half the surface area of the boxes between low and high, 0 for empty boxes"""
+        extent = np.maximum(high - low, 0.0)
+        return extent[..., 0] * extent[..., 1] + extent[..., 1] * extent[..., 2] + extent[..., 2] * extent[..., 0]
+
+
+    def split(self, indices, bounds, centroids):
+        """Returns the number of indices, reordered in place, that go to the left child"""
+        count = len(indices)
+        points = centroids[indices]
+        low, high = points.min(axis=0), points.max(axis=0)
+        axis = int(np.argmax(high - low))
+        if high[axis] - low[axis] <= 0.0:
+            return count // 2
+
+        ## bin the centroids and gather the count and box of every bin
+        bins = BoundingVolumeHierarchy.Bins
+        slots = np.minimum(((points[:, axis] - low[axis]) / (high[axis] - low[axis]) * bins).astype(np.int64), bins - 1)
+        counts = np.bincount(slots, minlength=bins)
+        boxes = bounds[indices[np.argsort(slots, kind="stable")]]
+        present = np.flatnonzero(counts)
+        starts = np.cumsum(counts)[present] - counts[present]
+        lows = np.full((bins, 3), np.inf)
+        highs = np.full((bins, 3), -np.inf)
+        lows[present] = np.minimum.reduceat(boxes[:, :3], starts)
+        highs[present] = np.maximum.reduceat(boxes[:, 3:], starts)
+
+        ## cost of each plane between two bins, from boxes accumulated from both ends
+        leftLows, leftHighs = np.minimum.accumulate(lows), np.maximum.accumulate(highs)
+        rightLows, rightHighs = np.minimum.accumulate(lows[::-1])[::-1], np.maximum.accumulate(highs[::-1])[::-1]
+        leftCounts = np.cumsum(counts)
+        rightCounts = count - leftCounts
+        costs = (self.area(leftLows[:-1], leftHighs[:-1]) * leftCounts[:-1]
+            + self.area(rightLows[1:], rightHighs[1:]) * rightCounts[:-1])
+        costs[(leftCounts[:-1] == 0) | (rightCounts[:-1] == 0)] = np.inf
+        plane = int(np.argmin(costs))
+        if not np.isfinite(costs[plane]):
+            order = np.argsort(points[:, axis], kind="stable")
+            indices[:] = indices[order]
+            return count // 2
+
+        left = slots <= plane
+        indices[:] = np.concatenate([indices[left], indices[~left]])
+        return int(left.sum())
+
+
+    def build(self, items):
+        """Builds the tree over items"""
+        self._items = list(items)
+        self._moved = set()
+        self._boxes, self._left, self._first, self._count, self._parent = [], [], [], [], []
+        count = len(self._items)
+        self._leaves = [0] * count
+        if count == 0:
+            self._positions = {}
+            self._bounds = []
+            return
+
+        bounds = np.array([item.pickBounds() for item in self._items], dtype=np.float64).reshape(count, 6)
+        centroids = (bounds[:, :3] + bounds[:, 3:]) * 0.5
+        order = np.arange(count)
+
+        ## nodes are appended in creation order, the children of a node are consecutive
+        self.addNode(-1)
+        stack = [(0, 0, count)]
+        while stack:
+            node, start, end = stack.pop()
+            indices = order[start:end]
+            self._boxes[node] = tuple(bounds[indices, :3].min(axis=0).tolist() + bounds[indices, 3:].max(axis=0).tolist())
+            if end - start <= BoundingVolumeHierarchy.LeafSize:
+                self._first[node] = start
+                self._count[node] = end - start
+                continue
+            middle = start + self.split(indices, bounds, centroids)
+            left = self.addNode(node)
+            self.addNode(node)
+            self._left[node] = left
+            stack.append((left, start, middle))
+            stack.append((left + 1, middle, end))
+
+        ## items in leaf order
+        self._items = [self._items[i] for i in order.tolist()]
+        self._bounds = [tuple(bounds[i].tolist()) for i in order.tolist()]
+        self._positions = {id(item): position for position, item in enumerate(self._items)}
+        for node, (first, size) in enumerate(zip(self._first, self._count)):
+            for position in range(first, first + size):
+                self._leaves[position] = node
+
+
+    def addNode(self, parent):
+        """Appends an empty node below parent, returns its index"""
+        self._boxes.append(None)
+        self._left.append(-1)
+        self._first.append(0)
+        self._count.append(0)
+        self._parent.append(parent)
+        return len(self._boxes) - 1
+
+
+    def contains(self, item):
+        """Returns true if item is in the tree"""
+        return id(item) in self._positions
+
+
+    def moved(self, item):
+        """Marks item for refitting before the next query"""
+        position = self._positions.get(id(item))
+        if position is not None:
+            self._moved.add(position)
+
+
+    @staticmethod
+    def union(a, b):
+        """Returns the box enclosing boxes a and b"""
+        return (min(a[0], b[0]), min(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3]), max(a[4], b[4]), max(a[5], b[5]))
+
+
+    def refit(self):
+        """Updates the bounds of the moved items and the boxes of their leaves and ancestors"""
+        if not self._moved:
+            return
+        nodes = set()
+        for position in self._moved:
+            self._bounds[position] = tuple(np.asarray(self._items[position].pickBounds(), dtype=np.float64).tolist())
+            nodes.add(self._leaves[position])
+        self._moved = set()
+
+        for node in nodes:
+            first = self._first[node]
+            box = self._bounds[first]
+            for position in range(first + 1, first + self._count[node]):
+                box = self.union(box, self._bounds[position])
+            self._boxes[node] = box
+
+        ## parents after their children, children always have larger indices
+        parents = set(self._parent[node] for node in nodes) - {-1}
+        while parents:
+            node = max(parents)
+            parents.discard(node)
+            left = self._left[node]
+            self._boxes[node] = self.union(self._boxes[left], self._boxes[left + 1])
+            if self._parent[node] != -1:
+                parents.add(self._parent[node])
+
+
+    def closest(self, ray, accept=None):
+        """Returns (item, distance) of the closest item hit by ray and accepted by accept(item), (None, inf) if none"""
+        if not self._items:
+            return (None, math.inf)
+        self.refit()
+
+        origin, direction = ray.origin(), ray.direction()
+        ox, oy, oz = origin.x(), origin.y(), origin.z()
+        ix, iy, iz = [1.0 / d if abs(d) > 1e-30 else math.copysign(1e30, d) for d in (direction.x(), direction.y(), direction.z())]
+        boxes, items = self._boxes, self._items
+        result, best = None, math.inf
+
+        def entry(box, limit):
+            """Returns the distance at which the ray enters box before limit, None if it misses"""
+            x0, x1 = (box[0] - ox) * ix, (box[3] - ox) * ix
+            y0, y1 = (box[1] - oy) * iy, (box[4] - oy) * iy
+            z0, z1 = (box[2] - oz) * iz, (box[5] - oz) * iz
+            near = max(min(x0, x1), min(y0, y1), min(z0, z1), 0.0)
+            far = min(max(x0, x1), max(y0, y1), max(z0, z1), limit)
+            return near if near <= far else None
+
+        visited = 0
+        stack = [(0.0, 0)] if entry(boxes[0], best) is not None else []
+        while stack:
+            near, node = stack.pop()
+            if near > best:
+                continue
+            visited += 1
+
+            ## leaf, test the items exactly
+            count = self._count[node]
+            if count:
+                first = self._first[node]
+                for item in items[first:first + count]:
+                    if accept is None or accept(item):
+                        hit = item.intersect(ray)
+                        if hit[0] and hit[1] < best:
+                            result, best = item, hit[1]
+                continue
+
+            ## the nearer child is pushed last and visited first
+            left = self._left[node]
+            a, b = entry(boxes[left], best), entry(boxes[left + 1], best)
+            if a is not None and b is not None:
+                if a <= b:
+                    stack.append((b, left + 1)); stack.append((a, left))
+                else:
+                    stack.append((a, left)); stack.append((b, left + 1))
+            elif a is not None:
+                stack.append((a, left))
+            elif b is not None:
+                stack.append((b, left + 1))
+
+        self._visited = visited
+        return (result, best)
+
+
+    def statistics(self):
+        """Returns a dictionary with the items and nodes of the tree and the nodes visited by the last query"""
+        return {"items": len(self._items), "nodes": len(self._boxes), "visited": self._visited}
@@ -0,0 +1,304 @@
+import bisect
+import numpy as np
+
+from PyQt5.QtGui import QOpenGLBuffer, QOpenGLVertexArrayObject
+
+from OpenGL import GL
+from Source.Graphics.ResourceManager import ResourceManager
+
+##  Shared GL buffers sub-allocated by many small actors.
+##
+##  Actors created with arena=True do not own a vertex array object, vertex
+##  buffer and index buffer. Their interleaved vertices and uint32 indices
+##  are placed in the buffers of a pool, one pool per vertex layout, and they
+##  draw with base vertex and first index offsets. Freed ranges go back to a
+##  free list; when no free block is large enough the pool is compacted if
+##  that makes room, or grown otherwise. Both keep the GL buffer names, so
+##  the pool's vertex array object stays valid.
+class BufferArena:
+
+    __instance = None
+
+    ## vertices and indices of a new pool
+    InitialVertices = 16384
+    InitialIndices = 49152
+
+    def __new__(cls):
+        if BufferArena.__instance is None:
+            BufferArena.__instance = object.__new__(cls)
+            BufferArena.__instance.initialize()
+        return BufferArena.__instance
+
+
+    ##  First fit free list over a range of units, vertices or indices.
+    class Allocator:
+
+        def __init__(self, capacity):
+            """Initialize allocator with every unit free"""
+            self._capacity = capacity
+            self._free = [(0, capacity)] if capacity > 0 else []
+
+
+        def capacity(self):
+            """Returns the number of units managed"""
+            return self._capacity
+
+
+        def used(self):
+            """Returns the number of allocated units"""
+            return self._capacity - self.freeCount()
+
+
+        def freeCount(self):
+            """Returns the number of free units"""
+            return sum(count for first, count in self._free)
+
+
+        def largestFree(self):
+            """Returns the size of the largest free block"""
+            return max([count for first, count in self._free] or [0])
+
+
+        def fragmentation(self):
+            """Returns the fraction of free units outside the largest free block"""
+            free = self.freeCount()
+            return 1.0 - self.largestFree() / float(free) if free > 0 else 0.0
+
+
+        def allocate(self, count):
+            """Returns the first unit of count contiguous units, None if no free block is large enough"""
+            for i, (first, size) in enumerate(self._free):
+                if size >= count:
+                    if size == count:
+                        del self._free[i]
+                    else:
+                        self._free[i] = (first + count, size - count)
+                    return first
+            return None
+
+
+        def free(self, first, count):
+            """Returns count units starting at first to the free list, merging neighbours"""
+            i = bisect.bisect(self._free, (first, count))
+            if i < len(self._free) and first + count == self._free[i][0]:
+                count += self._free.pop(i)[1]
+            if i > 0 and self._free[i - 1][0] + self._free[i - 1][1] == first:
+                first, count = self._free[i - 1][0], self._free[i - 1][1] + count
+                i -= 1
+                del self._free[i]
+            self._free.insert(i, (first, count))
+
+
+        def grow(self, capacity):
+            """Extends the managed range up to capacity units"""
+            if capacity > self._capacity:
+                self.free(self._capacity, capacity - self._capacity)
+                self._capacity = capacity
+
+
+        def reset(self, used):
+            """Marks the first used units allocated and the rest free, after compaction"""
+            self._free = [(used, self._capacity - used)] if used < self._capacity else []
+
+
+    ##  A range of units allocated from a pool.
+    class Range:
+
+        def __init__(self, pool, first, count):
+            """Initialize range of count units from first"""
+            self.pool = pool
+            self.first = first
+            self.count = count
+
+
+    ##  Vertex array object, vertex buffer and index buffer shared by one vertex layout.
+    class Pool:
+
+        def __init__(self, layout, shaders):
+            """Creates the GL objects of a pool for an interleaved layout, needs a current context"""
+            self.stride = layout.vertexSize()
+            self.vertices = BufferArena.Allocator(BufferArena.InitialVertices)
+            self.indices = BufferArena.Allocator(BufferArena.InitialIndices)
+            self.vertexRanges = []
+            self.indexRanges = []
+
+            self.vao = QOpenGLVertexArrayObject()
+            self.vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+            self.ibo = QOpenGLBuffer(QOpenGLBuffer.IndexBuffer)
+            self.vao.create()
+            self.vao.bind()
+            self.vbo.create()
+            self.vbo.bind()
+            self.vbo.allocate(self.vertices.capacity() * self.stride)
+            layout.configure(shaders, 0)
+            self.ibo.create()
+            self.ibo.bind()
+            self.ibo.allocate(self.indices.capacity() * 4)
+            self.vao.release()
+            self.vbo.release()
+            self.ibo.release()
+
+            resources = ResourceManager()
+            resources.track(self.vao, self, ResourceManager.Kind.VertexArray)
+            resources.track(self.vbo, self, ResourceManager.Kind.Buffer, self.vertices.capacity() * self.stride)
+            resources.track(self.ibo, self, ResourceManager.Kind.Buffer, self.indices.capacity() * 4)
+
+
+        def bindBuffer(self, buffer):
+            """Binds one of the pool's buffers, the index buffer through the pool's vertex array object"""
+            if buffer is self.ibo:
+                self.vao.bind()
+            buffer.bind()
+
+
+        def releaseBuffer(self, buffer):
+            """Releases a buffer bound with bindBuffer, leaving the vertex array object's index buffer in place"""
+            if buffer is self.ibo:
+                self.vao.release()
+            else:
+                buffer.release()
+
+
+        def bytesInUse(self):
+            """Returns the allocated bytes of both buffers"""
+            return self.vertices.used() * self.stride + self.indices.used() * 4
+
+
+        def bytesAllocated(self):
+            """Returns the GL storage of both buffers"""
+            return self.vertices.capacity() * self.stride + self.indices.capacity() * 4
+
+
+        def reserve(self, allocator, ranges, buffer, itemsize, count):
+            """Returns the first unit of count units, compacting or growing the buffer when needed"""
+            first = allocator.allocate(count)
+            if first is not None:
+                return first
+            if allocator.freeCount() >= count:
+                self.compactBuffer(allocator, ranges, buffer, itemsize)
+            else:
+                capacity = allocator.capacity()
+                while capacity - allocator.used() < count:
+                    capacity *= 2
+                self.growBuffer(allocator, buffer, itemsize, capacity)
+            return allocator.allocate(count)
+
+
+        def growBuffer(self, allocator, buffer, itemsize, capacity):
+            """Reallocates buffer with room for capacity units, keeping its contents and name"""
+            data = np.empty(allocator.capacity() * itemsize, dtype=np.uint8)
+            self.bindBuffer(buffer)
+            buffer.read(0, data, data.nbytes)
+            buffer.allocate(capacity * itemsize)
+            buffer.write(0, data, data.nbytes)
+            self.releaseBuffer(buffer)
+            allocator.grow(capacity)
+            ResourceManager().resize(buffer, capacity * itemsize)
+
+
+        def compactBuffer(self, allocator, ranges, buffer, itemsize):
+            """Moves every live range to the front of buffer, in order, leaving one free block"""
+            data = np.empty(allocator.capacity() * itemsize, dtype=np.uint8)
+            self.bindBuffer(buffer)
+            buffer.read(0, data, data.nbytes)
+            packed = np.empty_like(data)
+            first = 0
+            for each in sorted(ranges, key=lambda each: each.first):
+                packed[first * itemsize:(first + each.count) * itemsize] = \
+                    data[each.first * itemsize:(each.first + each.count) * itemsize]
+                each.first = first
+                first += each.count
+            buffer.write(0, packed, first * itemsize)
+            self.releaseBuffer(buffer)
+            allocator.reset(first)
+
+
+        def compact(self):
+            """Compacts both buffers of the pool, needs a current context"""
+            self.compactBuffer(self.vertices, self.vertexRanges, self.vbo, self.stride)
+            self.compactBuffer(self.indices, self.indexRanges, self.ibo, 4)
+
+
+        def destroy(self):
+            """Hands the GL objects of the pool to the ResourceManager"""
+            resources = ResourceManager()
+            resources.release(self.vao)
+            resources.release(self.vbo)
+            resources.release(self.ibo)
+
+
+    def initialize(self):
+        """Create empty arena"""
+        self._pools = {}
+
+
+    @staticmethod
+    def signature(layout):
+        """Returns a key identifying the vertex format of an interleaved layout"""
+        return tuple((each.name, each.type, each.size, each.normalized) for each in layout.attributes())
+
+
+    def allocate(self, layout, vertices, indices, shaders):
+        """Places packed interleaved vertices and uint32 indices in a pool, returns their (vertex, index) ranges"""
+        key = self.signature(layout)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = BufferArena.Pool(layout, shaders)
+
+        count = layout.vertexCount()
+        first = pool.reserve(pool.vertices, pool.vertexRanges, pool.vbo, pool.stride, count)
+        vertexRange = BufferArena.Range(pool, first, count)
+        pool.vertexRanges.append(vertexRange)
+        pool.bindBuffer(pool.vbo)
+        pool.vbo.write(first * pool.stride, vertices, vertices.nbytes)
+        pool.releaseBuffer(pool.vbo)
+
+        indexRange = None
+        if indices is not None:
+            first = pool.reserve(pool.indices, pool.indexRanges, pool.ibo, 4, len(indices))
+            indexRange = BufferArena.Range(pool, first, len(indices))
+            pool.indexRanges.append(indexRange)
+            pool.bindBuffer(pool.ibo)
+            pool.ibo.write(first * 4, indices, indices.nbytes)
+            pool.releaseBuffer(pool.ibo)
+        return vertexRange, indexRange
+
+
+    def free(self, vertexRange, indexRange=None):
+        """Returns the ranges of an actor to their pool"""
+        pool = vertexRange.pool
+        pool.vertices.free(vertexRange.first, vertexRange.count)
+        pool.vertexRanges.remove(vertexRange)
+        if indexRange is not None:
+            pool.indices.free(indexRange.first, indexRange.count)
+            pool.indexRanges.remove(indexRange)
+
+
+    def compact(self):
+        """Compacts every pool, needs a current context"""
+        for pool in self._pools.values():
+            pool.compact()
+
+
+    def clear(self):
+        """Deletes every pool"""
+        for pool in self._pools.values():
+            pool.destroy()
+        self._pools.clear()
+
+
+    def numberOfPools(self):
+        """Returns the number of pools, each with one vertex and one index buffer"""
+        return len(self._pools)
+
+
+    def statistics(self):
+        """Returns a dictionary with the pools, allocations, bytes in use, bytes allocated and fragmentation"""
+        pools = list(self._pools.values())
+        return {
+            "pools": len(pools),
+            "allocations": sum(len(each.vertexRanges) for each in pools),
+            "bytesInUse": sum(each.bytesInUse() for each in pools),
+            "bytesAllocated": sum(each.bytesAllocated() for each in pools),
+            "fragmentation": max([max(each.vertices.fragmentation(), each.indices.fragmentation()) for each in pools] or [0.0]),
+        }
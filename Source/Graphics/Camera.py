@@ -4,6 +4,12 @@ from PyQt5.QtCore import QObject
 from PyQt5.QtGui import QVector3D, QVector4D, QMatrix4x4, QQuaternion
 
 ##  Base camera class
+##
+##  The view and projection matrices, their product and the inverses are
+##  cached and rebuilt only after a parameter they depend on changes. Every
+##  change increments version, so consumers can tell whether anything derived
+##  from the camera must be updated by comparing a single integer. The cached
+##  matrices are shared, callers must copy them before modifying them.
 class Camera(QObject):
 
     class Lens:
@@ -34,6 +40,30 @@ class Camera(QObject):
 
         self._stored = None
 
+        ## derived matrices, rebuilt on first use after a change
+        self._inverse_view_matrix = QMatrix4x4()
+        self._inverse_projection_matrix = QMatrix4x4()
+        self._view_projection_matrix = QMatrix4x4()
+        self._inverse_view_projection_matrix = QMatrix4x4()
+        self._view_dirty = True
+        self._projection_dirty = True
+        self._combined_dirty = True
+        self._version = 0
+
+
+    @property
+    def version(self):
+        """Returns a counter incremented whenever the view or projection changes"""
+        return self._version
+
+
+    def invalidate(self, view=True, projection=True):
+        """Marks the view and/or projection matrices for recomputation"""
+        self._view_dirty = self._view_dirty or view
+        self._projection_dirty = self._projection_dirty or projection
+        self._combined_dirty = True
+        self._version += 1
+
 
     def copyFrom(self, camera):
         """Copy parameters from other camera"""
@@ -45,13 +75,12 @@ class Camera(QObject):
         self._near_distance = camera.nearDistance
         self._far_distance = camera.farDistance
 
-        self._projection_matrix = QMatrix4x4(camera.projectionMatrix.data())
-        self._view_matrix = QMatrix4x4(camera.viewMatrix.data())
         self._orientation = QMatrix4x4(camera.orientation.data())
         self._rotation = QQuaternion(camera.rotation.toVector4D())
 
         self._focal_distance = camera.focalDistance
         self._aspect_ratio = camera.aspectRatio
+        self.invalidate()
 
 
     def store(self):
@@ -65,7 +94,7 @@ class Camera(QObject):
         """Recall stored camera settings"""
         if self._stored:
             self.copyFrom(self._stored)
-            self._aspect_ratio = aspect
+            self.setAspectRatio(aspect)
             
 
     @property
@@ -97,6 +126,7 @@ class Camera(QObject):
                     self._position = focal_point - self._focal_distance * direction
             
             self._lens = lens
+            self.invalidate()
 
 
     @property
@@ -107,7 +137,9 @@ class Camera(QObject):
 
     def setPosition(self, position):
         """Sets the position of the camera"""
-        self._position = position
+        if position != self._position:
+            self._position = QVector3D(position)
+            self.invalidate(projection=False)
 
 
     @property
@@ -118,7 +150,9 @@ class Camera(QObject):
 
     def setAspectRatio(self, aspect):
         """Sets the aspect ratio of the camera"""
-        self._aspect_ratio = aspect
+        if aspect != self._aspect_ratio:
+            self._aspect_ratio = aspect
+            self.invalidate(view=False)
 
     
     @property
@@ -140,7 +174,9 @@ class Camera(QObject):
 
     def setHeight(self, height):
         """Sets the height of the camera"""
-        self._height = height
+        if height != self._height:
+            self._height = height
+            self.invalidate(view=False)
 
 
     def scaleHeight(self, scaleFactor):
@@ -149,6 +185,7 @@ class Camera(QObject):
             self._height *= scaleFactor
         else:
             self._fovy *= scaleFactor
+        self.invalidate(view=False)
 
 
     @property
@@ -159,7 +196,9 @@ class Camera(QObject):
 
     def setHeightAngle(self, fov):
         """Sets the height angle of the camera"""
-        self._fovy = fovy
+        if fov != self._fovy:
+            self._fovy = fov
+            self.invalidate(view=False)
 
 
     @property
@@ -170,7 +209,9 @@ class Camera(QObject):
 
     def setNearDistance(self, near):
         """Sets the distance to the near clipping plane from the camera"""
-        self._near_distance = near
+        if near != self._near_distance:
+            self._near_distance = near
+            self.invalidate(view=False)
 
 
     @property
@@ -181,7 +222,9 @@ class Camera(QObject):
 
     def setFarDistance(self, far):
         """Sets the distance to the far clipping plane from the camera"""
-        self._far_distance = far
+        if far != self._far_distance:
+            self._far_distance = far
+            self.invalidate(view=False)
 
 
     @property
@@ -192,7 +235,9 @@ class Camera(QObject):
 
     def setRotation(self, rotation):
         """Sets the rotation of the camera"""
-        self._rotation = rotation
+        if rotation != self._rotation:
+            self._rotation = QQuaternion(rotation)
+            self.invalidate(projection=False)
 
 
     @property
@@ -203,7 +248,9 @@ class Camera(QObject):
 
     def setOrientation(self, orientation):
         """Sets the orientation matrix of the camera"""
-        self._orientation = orientation
+        if orientation != self._orientation:
+            self._orientation = QMatrix4x4(orientation)
+            self.invalidate(projection=False)
 
 
     def pointAt(self, target, up=QVector3D(0.0, 1.0, 0.0)):
@@ -223,6 +270,7 @@ class Camera(QObject):
             y[0], y[1], y[2], 0.0,
             z[0], z[1], z[2], 0.0,
             0.0, 0.0, 0.0, 1.0)
+        self.invalidate(projection=False)
 
 
     def cameraMatrixOriginal(self):
@@ -242,20 +290,83 @@ class Camera(QObject):
         return camera_matrix
 
 
+    def updateView(self):
+        """Rebuilds the view matrix and its inverse if a parameter changed"""
+        if self._view_dirty:
+            self._inverse_view_matrix = self.cameraMatrix()
+            self._view_matrix = self._inverse_view_matrix.inverted()[0]
+            self._view_dirty = False
+
+
+    def updateProjection(self):
+        """Rebuilds the projection matrix and its inverse if a parameter changed"""
+        if self._projection_dirty:
+            self._projection_matrix = QMatrix4x4()
+            if self._lens == Camera.Lens.Orthographic:
+                xradius = 0.5 * self._height * self._aspect_ratio
+                yradius = 0.5 * self._height
+                self._projection_matrix.ortho(-xradius, xradius, -yradius, yradius, self._near_distance, self._far_distance)
+            else:
+                self._projection_matrix.perspective(self._fovy, self._aspect_ratio, self._near_distance, self._far_distance)
+            self._inverse_projection_matrix = self._projection_matrix.inverted()[0]
+            self._projection_dirty = False
+
+
+    def updateCombined(self):
+        """Rebuilds the view-projection matrix and its inverse if the view or projection changed"""
+        if self._combined_dirty:
+            self._view_projection_matrix = self.projectionMatrix * self.viewMatrix
+            self._inverse_view_projection_matrix = self.inverseViewMatrix * self.inverseProjectionMatrix
+            self._combined_dirty = False
+
+
     @property
     def viewMatrix(self):
         """Returns view matrix for this camera"""
-        return self.cameraMatrix().inverted()[0]
+        self.updateView()
+        return self._view_matrix
+
+
+    @property
+    def inverseViewMatrix(self):
+        """Returns the inverse of the view matrix, the camera to world transform"""
+        self.updateView()
+        return self._inverse_view_matrix
 
 
     @property
     def projectionMatrix(self):
         """Returns the projection matrix for this camera"""
-        self._projection_matrix.setToIdentity()
-        if self._lens == Camera.Lens.Orthographic:
-            xradius = 0.5 * self._height * self._aspect_ratio
-            yradius = 0.5 * self._height
-            self._projection_matrix.ortho(-xradius, xradius, -yradius, yradius, self._near_distance, self._far_distance)
-        else:
-            self._projection_matrix.perspective(self._fovy, self._aspect_ratio, self._near_distance, self._far_distance)
+        self.updateProjection()
         return self._projection_matrix
+
+
+    @property
+    def inverseProjectionMatrix(self):
+        """Returns the inverse of the projection matrix"""
+        self.updateProjection()
+        return self._inverse_projection_matrix
+
+
+    @property
+    def viewProjectionMatrix(self):
+        """Returns the projection matrix times the view matrix"""
+        self.updateCombined()
+        return self._view_projection_matrix
+
+
+    @property
+    def inverseViewProjectionMatrix(self):
+        """Returns the inverse of the view-projection matrix, from clip to world coordinates"""
+        self.updateCombined()
+        return self._inverse_view_projection_matrix
+
+
+    def projectedSize(self, center, radius):
+        """Returns the fraction of the viewport height covered by a sphere given in world coordinates"""
+        if self._lens == Camera.Lens.Orthographic:
+            return 2.0 * radius / self._height
+        depth = -(self.viewMatrix * center).z()
+        if depth <= radius:
+            return math.inf
+        return radius / (depth * math.tan(math.radians(self._fovy / 2.0)))
@@ -5,6 +5,9 @@ from Source.Graphics.Actor import Actor
 
 class Cone(Actor):
 
+    ## small mesh, drawn from the shared buffers of the BufferArena
+    UsesArena = True
+
     ## initialization
     def __init__(self, renderer,  **kwargs):
         """Initialize actor."""
@@ -108,7 +111,7 @@ class Cone(Actor):
 
     def render(self):
         """Render cube"""
-        GL.glDrawArrays(GL.GL_TRIANGLES, 0, self._num_vertices_side)
-        GL.glDrawArrays(GL.GL_TRIANGLE_FAN, self._num_vertices_side, self._num_vertices_bot)
+        self.drawArrays(GL.GL_TRIANGLES, 0, self._num_vertices_side)
+        self.drawArrays(GL.GL_TRIANGLE_FAN, self._num_vertices_side, self._num_vertices_bot)
 
     
\ No newline at end of file
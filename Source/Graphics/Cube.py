@@ -166,6 +166,6 @@ class Cube(Actor):
 
     def render(self):
         """Render cube"""
-        GL.glDrawArrays(self._render_mode, 0, len(self._vertices))
+        self.drawArrays(self._render_mode, 0, len(self._vertices))
 
     
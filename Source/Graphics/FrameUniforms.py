@@ -0,0 +1,140 @@
+import numpy as np
+
+from PyQt5.QtGui import QVector4D
+
+from OpenGL import GL
+from Source.Graphics.Shaders import Shaders
+from Source.Graphics.UniformBuffer import UniformBuffer
+from Source.Graphics.ResourceManager import ResourceManager
+
+##  Contents of the FrameData and ObjectData uniform blocks of a scene.
+##
+##  Camera and light state is the same for every actor of a frame, so it is
+##  packed once per frame into the FrameData block instead of being set on
+##  every program for every actor. The transforms of all actors drawn in the
+##  frame are packed into one buffer, one aligned ObjectData record per actor,
+##  and uploaded together; drawing an actor then only binds its record range.
+##  Both layouts follow std140, see Shaders.uniformBlockDeclarations.
+class FrameUniforms:
+
+    ## sizes of the blocks in floats
+    FrameFloats = 52
+    ObjectFloats = 36
+
+    ## light position of a headlight, in eye coordinates
+    HeadLightDirection = QVector4D(0.0, 0.0, 1.0, 0.0)
+    HeadLightPosition = QVector4D(0.0, 0.0, 0.0, 1.0)
+
+    ## initialization
+    def __init__(self, scene):
+        """Initialize empty blocks, no GL object exists until the first update()"""
+        self._scene = scene
+        self._frame = UniformBuffer(usage=GL.GL_STREAM_DRAW)
+        self._objects = UniformBuffer(usage=GL.GL_STREAM_DRAW)
+        self._frameData = np.zeros(FrameUniforms.FrameFloats, dtype=np.float32)
+        self._objectData = np.zeros((0, 0), dtype=np.float32)
+        self._stride = 0
+        self._slots = {}
+        self._spare = 0
+        self._cameraKey = None
+        self._uploaded = None
+
+
+    @staticmethod
+    def lightPosition(camera, light):
+        """Returns the position of light in eye coordinates"""
+        if light.headlight:
+            if light.directional:
+                return FrameUniforms.HeadLightDirection
+            return FrameUniforms.HeadLightPosition
+        return camera.viewMatrix * light.position
+
+
+    @staticmethod
+    def packCamera(camera, out):
+        """Writes the camera matrices of the FrameData block into out"""
+        out[0:16] = camera.viewMatrix.data()
+        out[16:32] = camera.projectionMatrix.data()
+
+
+    @classmethod
+    def packLight(cls, camera, light, out):
+        """Writes the light members of the FrameData block into out"""
+        position = cls.lightPosition(camera, light)
+        out[32:36] = (position.x(), position.y(), position.z(), position.w())
+        for offset, value in [(36, light.attenuation), (40, light.ambientColor), (44, light.diffuseColor), (48, light.specularColor)]:
+            out[offset:offset + 3] = (value.x(), value.y(), value.z())
+
+
+    @classmethod
+    def packFrame(cls, camera, light, out):
+        """Writes the FrameData block of camera and light into out, an array of FrameFloats floats"""
+        cls.packCamera(camera, out)
+        cls.packLight(camera, light, out)
+
+
+    def stride(self):
+        """Returns the distance in floats between ObjectData records"""
+        return self._stride
+
+
+    def update(self, actors):
+        """Packs and uploads the FrameData block and the ObjectData records of actors, needs a current context"""
+        if not self._frame.isCreated():
+            self._frame.create()
+            self._objects.create()
+            ResourceManager().track(self._frame, self._scene, ResourceManager.Kind.Buffer)
+            ResourceManager().track(self._objects, self._scene, ResourceManager.Kind.Buffer)
+
+            ## records start at multiples of the uniform buffer offset alignment
+            alignment = int(GL.glGetIntegerv(GL.GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT)) // 4
+            self._stride = -(-FrameUniforms.ObjectFloats // alignment) * alignment
+
+        ## camera and light, the matrices are repacked only when the camera version changed
+        camera = self._scene.camera
+        if self._cameraKey != (id(camera), camera.version):
+            self._cameraKey = (id(camera), camera.version)
+            self.packCamera(camera, self._frameData)
+        self.packLight(camera, self._scene.light, self._frameData)
+        if self._uploaded is None or not np.array_equal(self._frameData, self._uploaded):
+            self._frame.allocate(self._frameData)
+            self._uploaded = self._frameData.copy()
+        self._frame.bindBase(Shaders.FrameDataBinding)
+
+        ## one record per actor and a spare record for actors drawn outside the list
+        rows = len(actors) + 1
+        if self._objectData.shape[0] < rows:
+            self._objectData = np.zeros((max(rows, 2 * self._objectData.shape[0]), self._stride), dtype=np.float32)
+        self._slots.clear()
+        for slot, actor in enumerate(actors):
+            actor.writeObjectData(self._objectData[slot])
+            self._slots[id(actor)] = slot
+        self._spare = len(actors)
+        self._objects.allocate(self._objectData[:rows])
+
+        ResourceManager().resize(self._frame, self._frame.size())
+        ResourceManager().resize(self._objects, self._objects.size())
+
+
+    def bindObject(self, actor):
+        """Binds the ObjectData record of actor, written on demand if actor was not in the last update()"""
+        if not self._objects.isCreated():
+            return
+        slot = self._slots.get(id(actor))
+        if slot is None:
+            slot = self._spare
+            actor.writeObjectData(self._objectData[slot])
+            self._objects.write(slot * self._stride * 4, self._objectData[slot, :FrameUniforms.ObjectFloats])
+        self._objects.bindRange(Shaders.ObjectDataBinding, slot * self._stride * 4, FrameUniforms.ObjectFloats * 4)
+
+
+    def destroy(self):
+        """Releases the uniform buffers"""
+        if self._frame.isCreated():
+            ResourceManager().release(self._frame)
+            ResourceManager().release(self._objects)
+        self._frame = UniformBuffer(usage=GL.GL_STREAM_DRAW)
+        self._objects = UniformBuffer(usage=GL.GL_STREAM_DRAW)
+        self._slots.clear()
+        self._cameraKey = None
+        self._uploaded = None
@@ -0,0 +1,107 @@
+import numpy as np
+
+from Source.Graphics.Actor import Actor
+
+##  View frustum culling stage of a scene.
+##
+##  The six planes of the frustum are extracted from the camera's combined
+##  view and projection matrix, again only when the camera version changes.
+##  Every frame the world space bounds of all candidate actors, see
+##  Actor.worldBounds, are stacked into one array and tested against the
+##  planes at once: an actor is culled if its bounding sphere or its box lies
+##  entirely behind one plane. Overlay actors and actors without known bounds
+##  are always drawn.
+class FrustumCuller:
+
+    ## initialization
+    def __init__(self, **kwargs):
+        """Initialize stage, nothing culled"""
+        self._enabled = kwargs.get("enabled", True)
+        self._planes = None
+        self._camera = None
+        self._version = None
+        self._culled = set()
+        self._tested = 0
+        self._drawn = 0
+
+
+    def isEnabled(self):
+        """Returns whether actors outside the frustum are skipped"""
+        return self._enabled
+
+
+    def setEnabled(self, value):
+        """Turns culling on or off"""
+        self._enabled = value
+        if not value:
+            self._culled = set()
+            self._tested = 0
+
+
+    @staticmethod
+    def extractPlanes(matrix):
+        """Returns the left, right, bottom, top, near and far planes of a view projection QMatrix4x4 as a (6, 4) array"""
+        rows = np.array(matrix.data(), dtype=np.float64).reshape(4, 4).T
+        planes = np.array([rows[3] + rows[0], rows[3] - rows[0], rows[3] + rows[1],
+            rows[3] - rows[1], rows[3] + rows[2], rows[3] - rows[2]])
+        return (planes / np.linalg.norm(planes[:, :3], axis=1)[:, np.newaxis]).astype(np.float32)
+
+
+    def planes(self, camera):
+        """Returns the frustum planes of camera, points inside have a non-negative distance to all of them"""
+        if camera is not self._camera or camera.version != self._version:
+            self._planes = self.extractPlanes(camera.viewProjectionMatrix)
+            self._camera = camera
+            self._version = camera.version
+        return self._planes
+
+
+    @staticmethod
+    def outside(planes, bounds):
+        """Returns which of the (n, 10) bounds, see Actor.worldBounds, lie entirely outside the planes"""
+        normals, offsets = planes[:, :3], planes[:, 3]
+
+        ## spheres behind a plane
+        distances = bounds[:, 0:3] @ normals.T + offsets
+        culled = (distances < -bounds[:, 3:4]).any(axis=1)
+
+        ## boxes whose corner farthest along the normal is behind a plane
+        centers = (bounds[:, 4:7] + bounds[:, 7:10]) * 0.5
+        extents = (bounds[:, 7:10] - bounds[:, 4:7]) * 0.5
+        culled |= (centers @ normals.T + extents @ np.abs(normals).T + offsets < 0.0).any(axis=1)
+        return culled
+
+
+    def cull(self, camera, actors):
+        """Tests actors against the frustum of camera, see isCulled"""
+        self._culled = set()
+        self._tested = 0
+        self._drawn = len(actors)
+        if not self._enabled:
+            return
+
+        candidates = []
+        bounds = []
+        for actor in actors:
+            if actor.renderType != Actor.RenderType.Overlay:
+                each = actor.worldBounds()
+                if each is not None:
+                    candidates.append(actor)
+                    bounds.append(each)
+        self._tested = len(candidates)
+        if not candidates:
+            return
+
+        culled = self.outside(self.planes(camera), np.array(bounds))
+        self._culled = set(id(actor) for actor, out in zip(candidates, culled) if out)
+        self._drawn -= len(self._culled)
+
+
+    def isCulled(self, actor):
+        """Returns true if actor was outside the frustum in this frame"""
+        return id(actor) in self._culled
+
+
+    def statistics(self):
+        """Returns a dictionary with the actors tested, culled and drawn in the last frame"""
+        return {"tested": self._tested, "culled": len(self._culled), "drawn": self._drawn}
@@ -0,0 +1,192 @@
+from OpenGL import GL
+
+##  Shadow copy of the GL state changed while rendering.
+##
+##  Actors and scene passes set polygon mode, depth and polygon offset state
+##  before every draw, although consecutive actors mostly need the same
+##  values. Rendering code changes this state, and the bound program and
+##  texture, through here: each request is compared with the last value set
+##  and the GL call is skipped when they match. Programs and textures stay
+##  bound after a draw, so consecutive draws sorted by the RenderQueue share
+##  their binds. The shadow state is unknown after invalidate(), so the next
+##  request of each kind is always issued, e.g. after the context was
+##  recreated or after code outside the tracker changed the state.
+class GLState:
+
+    __instance = None
+
+    def __new__(cls):
+        if GLState.__instance is None:
+            GLState.__instance = object.__new__(cls)
+            GLState.__instance.initialize()
+        return GLState.__instance
+
+
+    def initialize(self):
+        """Create tracker with unknown state"""
+        self._capabilities = {}
+        self._polygonMode = None
+        self._depthMask = None
+        self._polygonOffset = None
+        self._blendFunc = None
+        self._lineWidth = None
+        self._pointSize = None
+        self._program = None
+        self._texture = None
+        self._programSwitches = 0
+        self._textureBinds = 0
+        self._frameProgramSwitches = 0
+        self._frameTextureBinds = 0
+        self._issued = 0
+        self._skipped = 0
+        self._frameIssued = 0
+        self._frameSkipped = 0
+        self._lastFrame = (0, 0, 0, 0)
+
+
+    def invalidate(self):
+        """Forgets the shadow state, the next change of each kind is issued"""
+        self._capabilities.clear()
+        self._polygonMode = None
+        self._depthMask = None
+        self._polygonOffset = None
+        self._blendFunc = None
+        self._lineWidth = None
+        self._pointSize = None
+        self._program = None
+        self._texture = None
+
+
+    def count(self, issued):
+        """Counts a state change request, issued or skipped"""
+        if issued:
+            self._issued += 1
+            self._frameIssued += 1
+        else:
+            self._skipped += 1
+            self._frameSkipped += 1
+        return issued
+
+
+    def setEnabled(self, capability, value):
+        """Enables or disables capability; returns true if a GL call was issued"""
+        value = bool(value)
+        if not self.count(self._capabilities.get(capability) is not value):
+            return False
+        self._capabilities[capability] = value
+        if value:
+            GL.glEnable(capability)
+        else:
+            GL.glDisable(capability)
+        return True
+
+
+    def enable(self, capability):
+        """Enables capability"""
+        return self.setEnabled(capability, True)
+
+
+    def disable(self, capability):
+        """Disables capability"""
+        return self.setEnabled(capability, False)
+
+
+    def isEnabled(self, capability):
+        """Returns the shadowed state of capability, None if unknown"""
+        return self._capabilities.get(capability)
+
+
+    def polygonMode(self, mode):
+        """Sets the polygon mode of front and back faces"""
+        if not self.count(self._polygonMode != mode):
+            return False
+        self._polygonMode = mode
+        GL.glPolygonMode(GL.GL_FRONT_AND_BACK, mode)
+        return True
+
+
+    def depthMask(self, flag):
+        """Turns writing to the depth buffer on or off"""
+        flag = bool(flag)
+        if not self.count(self._depthMask is not flag):
+            return False
+        self._depthMask = flag
+        GL.glDepthMask(GL.GL_TRUE if flag else GL.GL_FALSE)
+        return True
+
+
+    def polygonOffset(self, factor, units):
+        """Sets the scale and units of the polygon depth offset"""
+        if not self.count(self._polygonOffset != (factor, units)):
+            return False
+        self._polygonOffset = (factor, units)
+        GL.glPolygonOffset(factor, units)
+        return True
+
+
+    def blendFunc(self, source, destination):
+        """Sets the blending factors"""
+        if not self.count(self._blendFunc != (source, destination)):
+            return False
+        self._blendFunc = (source, destination)
+        GL.glBlendFunc(source, destination)
+        return True
+
+
+    def lineWidth(self, width):
+        """Sets the width of rasterized lines"""
+        if not self.count(self._lineWidth != width):
+            return False
+        self._lineWidth = width
+        GL.glLineWidth(width)
+        return True
+
+
+    def pointSize(self, size):
+        """Sets the diameter of rasterized points"""
+        if not self.count(self._pointSize != size):
+            return False
+        self._pointSize = size
+        GL.glPointSize(size)
+        return True
+
+
+    def useProgram(self, program):
+        """Binds program, a QOpenGLShaderProgram"""
+        if not self.count(self._program is not program):
+            return False
+        self._program = program
+        program.bind()
+        self._programSwitches += 1
+        self._frameProgramSwitches += 1
+        return True
+
+
+    def bindTexture(self, texture):
+        """Binds texture, a QOpenGLTexture, to the active texture unit; None keeps the bound texture"""
+        if texture is None or not self.count(self._texture is not texture):
+            return False
+        self._texture = texture
+        texture.bind()
+        self._textureBinds += 1
+        self._frameTextureBinds += 1
+        return True
+
+
+    def beginFrame(self):
+        """Starts counting the state changes of a new frame, bindings made outside the tracker are forgotten"""
+        self._lastFrame = (self._frameIssued, self._frameSkipped, self._frameProgramSwitches, self._frameTextureBinds)
+        self._frameIssued = 0
+        self._frameSkipped = 0
+        self._frameProgramSwitches = 0
+        self._frameTextureBinds = 0
+        self._program = None
+        self._texture = None
+
+
+    def statistics(self):
+        """Returns a dictionary with the state changes issued and skipped in the last frame and overall"""
+        return {"frameIssued": self._lastFrame[0], "frameSkipped": self._lastFrame[1],
+            "frameProgramSwitches": self._lastFrame[2], "frameTextureBinds": self._lastFrame[3],
+            "issued": self._issued, "skipped": self._skipped,
+            "programSwitches": self._programSwitches, "textureBinds": self._textureBinds}
@@ -6,6 +6,9 @@ from Source.Graphics.Actor import Actor
 
 class Gizmos(Actor):
 
+    ## small mesh, drawn from the shared buffers of the BufferArena
+    UsesArena = True
+
     ## initialization
     def __init__(self, scene, **kwargs):
         """Initialize actor."""
@@ -28,9 +31,20 @@ class Gizmos(Actor):
         self.initialize()
 
 
+    @staticmethod
+    def axisIndex(eixo):
+        """Returns 0, 1 or 2 for the x, y or z axis names, None for no axis"""
+        return {"x": 0, "y": 1, "z": 2}.get(eixo.lower()) if eixo is not None else None
+
+
+    def setAxis(self, eixo):
+        """Highlights axis eixo drawing the others in grey, None highlights every axis"""
+        self.eixo = eixo
+
+
     def generateGeometry(self):
-        """Generate vertices"""
-        self._vertices = np.array([
+        """Generate vertices, every axis in its color followed by every axis in grey"""
+        lines = np.array([
             self.center.x(), self.center.y(), self.center.z(),
             self.center.x() + self.size, self.center.y(), self.center.z(),
             self.center.x(), self.center.y(), self.center.z(),
@@ -38,43 +52,22 @@ class Gizmos(Actor):
             self.center.x(), self.center.y(), self.center.z(),
             self.center.x(), self.center.y(), self.center.z() + self.size
         ], dtype=np.float32)
-    
-        if self.eixo in ("x", "X"):
-            self._colors = np.array([
-                1.0, 0.0, 0.0,
-                1.0, 0.0, 0.0,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-            ], dtype=np.float32)
-        elif self.eixo in ("y", "Y"):
-            self._colors = np.array([
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.0, 1.0, 0.0,
-                0.0, 1.0, 0.0,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-            ], dtype=np.float32)
-        elif self.eixo in ("z", "Z"):
-            self._colors = np.array([
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.5, 0.5, 0.5,
-                0.0, 0.0, 1.0,
-                0.0, 0.0, 1.0,
-            ], dtype=np.float32)
-        else:
-            self._colors = np.array([
-                1.0, 0.0, 0.0,
-                1.0, 0.0, 0.0,
-                0.0, 1.0, 0.0,
-                0.0, 1.0, 0.0,
-                0.0, 0.0, 1.0,
-                0.0, 0.0, 1.0,
-            ], dtype=np.float32)
+        self._vertices = np.concatenate([lines, lines])
+
+        self._colors = np.array([
+            1.0, 0.0, 0.0,
+            1.0, 0.0, 0.0,
+            0.0, 1.0, 0.0,
+            0.0, 1.0, 0.0,
+            0.0, 0.0, 1.0,
+            0.0, 0.0, 1.0,
+            0.5, 0.5, 0.5,
+            0.5, 0.5, 0.5,
+            0.5, 0.5, 0.5,
+            0.5, 0.5, 0.5,
+            0.5, 0.5, 0.5,
+            0.5, 0.5, 0.5,
+        ], dtype=np.float32)
 
 
     def initialize(self):
@@ -87,9 +80,10 @@ class Gizmos(Actor):
 
 
     def render(self):
-        """Render grid"""
-        GL.glDrawArrays(GL.GL_LINES, 0, 6)
-
-
-
-    
\ No newline at end of file
+        """Render axes, the highlight only selects which copy of each axis is drawn"""
+        axis = self.axisIndex(self.eixo)
+        if axis is None:
+            self.drawArrays(GL.GL_LINES, 0, 6)
+            return
+        for i in range(3):
+            self.drawArrays(GL.GL_LINES, 2 * i if i == axis else 6 + 2 * i, 2)
@@ -0,0 +1,89 @@
+from PyQt5.QtGui import QMatrix4x4, QVector3D
+
+from Source.Graphics.Group import Group
+from Source.Graphics.Material import Material
+from Source.Graphics.Gizmos import Gizmos
+
+##  Base class of the transform gizmos: axis lines with a tip on each axis.
+##
+##  The parts are created once. place() moves the gizmo to an actor and
+##  highlights an axis by changing transforms and materials only, which are
+##  uniforms at draw time, so following a drag needs no geometry generation
+##  and no buffer upload.
+class GizmosGroup(Group):
+
+    ## (angle, axis) rotating each tip into place, None keeps the tip as modelled
+    TipRotations = [None, None, None]
+
+    ## color of the axes not highlighted
+    Grey = QVector3D(0.5, 0.5, 0.5)
+
+    ## initialization
+    def __init__(self, scene, **kwargs):
+        """Initialize actor."""
+        super(GizmosGroup, self).__init__(scene, **kwargs)
+
+        self._resolution = kwargs.get("resolution", 12)
+        colors = [kwargs.get("xcolor", QVector3D(1.0, 0.0, 0.0)),
+            kwargs.get("ycolor", QVector3D(0.0, 1.0, 0.0)),
+            kwargs.get("zcolor", QVector3D(0.0, 0.0, 1.0))]
+
+        self.setPickable(False)
+        self.setName(type(self).__name__)
+
+        ## highlighted and grey material of each axis, swapped by place()
+        self._materials = [(self.tipMaterial(color), self.tipMaterial(GizmosGroup.Grey)) for color in colors]
+
+        ## create lines and tips, the matrices are reused by place()
+        self._lines = Gizmos(self.scene)
+        self.addPart(self._lines)
+        self._tips = []
+        for axis, name in enumerate(["xaxis", "yaxis", "zaxis"]):
+            tip = self.createTip(name, self._materials[axis][0])
+            self.addPart(tip)
+            self._tips.append(tip)
+        self._local = [QMatrix4x4() for i in range(4)]
+
+        self.place(kwargs.get("transform", QMatrix4x4()), kwargs.get("center", QVector3D(0.0, 0.0, 0.0)),
+            kwargs.get("size", QVector3D(1.0, 1.0, 1.0)), kwargs.get("eixo", None))
+
+
+    @staticmethod
+    def tipMaterial(color):
+        """Returns the material of an axis tip"""
+        return Material(diffuse=color, specular=QVector3D(0.5, 0.5, 0.5), shininess=76.8)
+
+
+    def createTip(self, name, material):
+        """Returns the actor drawn at the end of an axis"""
+        raise NotImplementedError("createTip() must be implemented in child class")
+
+
+    def place(self, transform, center, size, eixo=None):
+        """Moves the gizmo to center, with axes of length size in the frame of transform, highlighting axis eixo"""
+        self.center = center
+        self.size = size
+        self.eixo = eixo
+
+        ## lines
+        local = self._local[0]
+        local.setToIdentity()
+        local.translate(center)
+        local.scale(size)
+        self._lines.setTransform(transform * local)
+        self._lines.setAxis(eixo)
+
+        ## tips
+        highlighted = Gizmos.axisIndex(eixo)
+        for axis, tip in enumerate(self._tips):
+            local = self._local[axis + 1]
+            local.setToIdentity()
+            local.translate(center)
+            local.translate(size.x() if axis == 0 else 0.0, size.y() if axis == 1 else 0.0, size.z() if axis == 2 else 0.0)
+            local.scale(0.05)
+            local.scale(size)
+            rotation = self.TipRotations[axis]
+            if rotation is not None:
+                local.rotate(rotation[0], rotation[1])
+            tip.setTransform(transform * local)
+            tip.setMaterial(self._materials[axis][0 if highlighted in (None, axis) else 1])
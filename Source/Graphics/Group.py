@@ -108,3 +108,14 @@ class Group(QObject):
         """Add a part to the group"""
         self._parts[part.name] = part
 
+
+    def initialize(self):
+        """Recreates the GPU objects of every part"""
+        for each in self._parts.values():
+            each.initialize()
+
+
+    def destroy(self):
+        """Hands the GPU objects of every part to the ResourceManager"""
+        for each in self._parts.values():
+            each.destroy()
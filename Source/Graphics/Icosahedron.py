@@ -2,9 +2,13 @@ import math
 import numpy as np
 from OpenGL import GL
 from Source.Graphics.Actor import Actor
+from Source.Graphics.VertexCacheOptimizer import optimize
 
 class Icosahedron(Actor):
 
+    ## small mesh, drawn from the shared buffers of the BufferArena
+    UsesArena = True
+
     ## initialization
     def __init__(self, renderer,  **kwargs):
         """Initialize actor."""
@@ -13,6 +17,7 @@ class Icosahedron(Actor):
         self._level = kwargs.get("level", 2)
         self._radius = kwargs.get("radius", 1.0)
         self._rgb_colors = kwargs.get("colors", False)
+        self._optimize = kwargs.get("optimize", False)
 
         ## register shaders
         if self._rgb_colors:
@@ -145,6 +150,13 @@ class Icosahedron(Actor):
         self._normals = np.array(vertices, dtype=np.float32)
         self._indices = np.array(indices, dtype=np.uint32)
 
+        ## order triangles for the vertex cache and vertices for fetching
+        if self._optimize:
+            self._vertices, colors, self._normals, self._indices = optimize(self._indices,
+                self._vertices, self._colors if self._rgb_colors else None, self._normals)
+            if self._rgb_colors:
+                self._colors = colors
+
 
     def initialize(self):
         """Creates icosahedron geometry"""
@@ -159,6 +171,6 @@ class Icosahedron(Actor):
 
     def render(self):
         """Render icosahedron"""
-        GL.glDrawElements(self._render_mode, self.numberOfIndices, GL.GL_UNSIGNED_INT, None)
+        self.drawElements(self._render_mode, self.numberOfIndices)
 
     
\ No newline at end of file
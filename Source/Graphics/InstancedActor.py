@@ -0,0 +1,358 @@
+import ctypes
+import numpy as np
+
+from PyQt5.QtGui import QMatrix4x4, QVector3D, QOpenGLBuffer, QOpenGLVertexArrayObject
+
+from OpenGL import GL
+from Source.Graphics.Actor import Actor
+from Source.Graphics.Shaders import Shaders
+from Source.Graphics.ResourceManager import ResourceManager
+
+##  Many copies of one mesh drawn with hardware instancing.
+##
+##  The mesh comes from a prototype actor, which is owned by the instanced
+##  actor and not added to the scene. Every copy is an Instance with its own
+##  transform, color and selection state, stored as one record of an
+##  instance buffer read by the instanced variants of the prototype's
+##  shaders; the draws of the prototype's render() are issued once for all
+##  instances. Changing one instance rewrites only its record. Scene.pick
+##  returns instances, which the Renderer selects and moves with its gizmos
+##  like actors. Instance transforms are relative to the transform of the
+##  instanced actor, the identity by default.
+class InstancedActor(Actor):
+
+    ## floats per instance record: model matrix, normal matrix columns, color with highlight in alpha, padding
+    RecordFloats = 32
+
+    ##  One copy of the mesh of an InstancedActor.
+    class Instance:
+
+        def __init__(self, actor, slot, transform, color):
+            """Initialize instance in slot of actor"""
+            self._actor = actor
+            self._slot = slot
+            self._transform = transform
+            self._color = color
+            self._visible = True
+            self._selected = False
+            self._highlighted = False
+
+
+        @property
+        def name(self):
+            """Returns the name of this instance"""
+            return "Instance" + str(id(self))
+
+
+        def actor(self):
+            """Returns the instanced actor drawing this instance, None once removed"""
+            return self._actor
+
+
+        def slot(self):
+            """Returns the index of the record of this instance in the instance buffer"""
+            return self._slot
+
+
+        def changed(self):
+            """Marks the record of this instance for upload"""
+            if self._actor is not None:
+                self._actor.invalidateInstance(self)
+
+
+        def transform(self):
+            return self._transform
+
+
+        def setTransform(self, xform):
+            self._transform = xform
+            self.changed()
+            if self._actor is not None:
+                self._actor.scene().actorMoved(self)
+
+
+        def update(self, **kwargs):
+            """Updates the transform, the only state gizmos change"""
+            self.setTransform(kwargs.get("transform", QMatrix4x4()))
+
+
+        def position(self):
+            xform = self._transform
+            return QVector3D(xform[0,3], xform[1,3], xform[2,3])
+
+
+        def center(self):
+            return self._actor.center()
+
+
+        def size(self):
+            return self._actor.size()
+
+
+        def color(self):
+            """Returns the color the diffuse color of the mesh is multiplied by"""
+            return self._color
+
+
+        def setColor(self, color):
+            """Sets the color the diffuse color of the mesh is multiplied by"""
+            self._color = color
+            self.changed()
+
+
+        def isPickable(self):
+            return self._actor is not None and self._actor.isPickable()
+
+
+        def isSelectable(self):
+            return True
+
+
+        def isVisible(self):
+            return self._visible
+
+
+        def setVisible(self, value):
+            self._visible = value
+            self.changed()
+
+
+        def isSelected(self):
+            return self._selected
+
+
+        def setSelected(self, value):
+            self._selected = value
+            self.changed()
+
+
+        def isHighlighted(self):
+            return self._highlighted
+
+
+        def setHighlighted(self, value):
+            self._highlighted = value
+            self.changed()
+
+
+        def pickBounds(self):
+            """Returns the world space box, min and max as 6 floats, enclosing the box tested by intersect()"""
+            return self._actor.pickBounds(self._actor.transform() * self._transform)
+
+
+        def intersect(self, ray):
+            """Returns intersection if any, with the bounding box of the mesh placed by this instance"""
+            return self._actor.intersect(ray, self._actor.transform() * self._transform)
+
+
+        def writeRecord(self, out):
+            """Writes the instance record into out, hidden instances collapse to a point"""
+            xform = self._transform if self._visible else QMatrix4x4(*([0.0] * 16))
+            out[0:16] = xform.data()
+            out[16:25] = xform.normalMatrix().data()
+            out[25:28] = (self._color.x(), self._color.y(), self._color.z())
+            out[28] = 1.0 if self._selected or self._highlighted else 0.0
+
+
+    ## initialization
+    def __init__(self, scene, prototype, **kwargs):
+        """Initialize instanced actor drawing the mesh of prototype, which must be created and have instanced shaders"""
+        super(InstancedActor, self).__init__(scene, material=prototype.material, wireframe=prototype._wireframe,
+            mode=prototype.renderMode, type=prototype.renderType, **kwargs)
+        self._prototype = prototype
+        shaders = self.shaderCollection
+        for shader in [prototype.solidShader, prototype.solidFlatShader, prototype.noLightSolidShader,
+            prototype.wireframeShader, prototype.noLightWireframeShader]:
+            if shaders.instancedShader(shader) is None:
+                raise ValueError("actor {} has a shader without an instanced variant".format(prototype.name))
+        self.setSolidShader(shaders.instancedShader(prototype.solidShader))
+        self.setSolidFlatShader(shaders.instancedShader(prototype.solidFlatShader))
+        self.setNoLightSolidShader(shaders.instancedShader(prototype.noLightSolidShader))
+        self.setWireframeShader(shaders.instancedShader(prototype.wireframeShader))
+        self.setNoLightWireframeShader(shaders.instancedShader(prototype.noLightWireframeShader))
+
+        ## the mesh is read with the dequantization of the prototype's vertex format
+        self._position_scale = prototype._position_scale
+        self._position_offset = prototype._position_offset
+        self._normal_encoding = prototype._normal_encoding
+
+        ## picking and depth sorting use the bounds of the mesh
+        self._center = prototype.center()
+        self._size = prototype.size()
+
+        self._instances = []
+        self._records = np.zeros((0, InstancedActor.RecordFloats), dtype=np.float32)
+        self._dirty = set()
+        self._capacity = 0
+        self._instance_vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        self._uploads = 0
+
+
+    def prototype(self):
+        """Returns the actor whose mesh is drawn"""
+        return self._prototype
+
+
+    def numberOfInstances(self):
+        """Returns the number of instances drawn"""
+        return len(self._instances)
+
+
+    def instances(self):
+        """Returns the instances, in instance buffer order"""
+        return list(self._instances)
+
+
+    def addInstance(self, transform=None, color=None):
+        """Adds an instance placed by transform, the mesh's diffuse color multiplied by color; returns it"""
+        instance = InstancedActor.Instance(self, len(self._instances), QMatrix4x4(transform) if transform is not None else QMatrix4x4(),
+            color if color is not None else QVector3D(1.0, 1.0, 1.0))
+        self._instances.append(instance)
+        self._scene.invalidatePicking()
+        if len(self._instances) > len(self._records):
+            records = np.zeros((max(2 * len(self._records), 64), InstancedActor.RecordFloats), dtype=np.float32)
+            records[:len(self._records)] = self._records
+            self._records = records
+        self.invalidateInstance(instance)
+        return instance
+
+
+    def removeInstance(self, instance):
+        """Removes instance, the last instance moves into its slot"""
+        if instance.actor() is not self:
+            return
+        slot = instance.slot()
+        last = self._instances.pop()
+        if last is not instance:
+            self._instances[slot] = last
+            last._slot = slot
+            self.invalidateInstance(last)
+        self._dirty.discard(len(self._instances))
+        instance._actor = None
+        instance._slot = None
+        self._scene.invalidatePicking()
+
+
+    def invalidateInstance(self, instance):
+        """Rewrites the record of instance, uploaded before the next draw"""
+        instance.writeRecord(self._records[instance.slot()])
+        self._dirty.add(instance.slot())
+
+
+    def pick(self, ray):
+        """Returns (instance, distance) of the closest instance hit by ray, (None, inf) if none"""
+        result = (None, float("inf"))
+        for instance in self._instances:
+            if instance.isVisible():
+                hit = instance.intersect(ray)
+                if hit[0] and hit[1] < result[1]:
+                    result = (instance, hit[1])
+        return result
+
+
+    def uploadStatistics(self):
+        """Returns the number of instance buffer writes issued so far"""
+        return self._uploads
+
+
+    def createInstanceBuffer(self):
+        """Creates the vertex array reading the prototype's mesh and the instance buffer at the current capacity"""
+        self.destroyInstanceBuffer()
+        prototype = self._prototype
+        resources = ResourceManager()
+        self._capacity = len(self._records)
+
+        self._vao.create()
+        self._vao.bind()
+        resources.track(self._vao, self, ResourceManager.Kind.VertexArray)
+
+        ## per-vertex attributes from the prototype's buffers
+        prototype._vbo.bind()
+        prototype._vertex_layout.configure(self.attributeShaders(),
+            prototype._stream.offset() if prototype._stream is not None else 0)
+        prototype._vbo.release()
+        if prototype._hasIndices:
+            prototype._ibo.bind()
+
+        ## per-instance attributes, advanced once per instance
+        self._instance_vbo.setUsagePattern(QOpenGLBuffer.DynamicDraw)
+        self._instance_vbo.create()
+        self._instance_vbo.bind()
+        self._instance_vbo.allocate(self._records, self._records.nbytes)
+        resources.track(self._instance_vbo, self, ResourceManager.Kind.Buffer, self._records.nbytes)
+        stride = InstancedActor.RecordFloats * 4
+        columns = [(Shaders.InstanceMatrixLocation + i, 4, 16 * i) for i in range(4)]
+        columns += [(Shaders.InstanceNormalMatrixLocation + i, 3, 64 + 12 * i) for i in range(3)]
+        columns += [(Shaders.InstanceColorLocation, 4, 100)]
+        for location, size, offset in columns:
+            GL.glVertexAttribPointer(location, size, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(offset))
+            GL.glVertexAttribDivisor(location, 1)
+            GL.glEnableVertexAttribArray(location)
+        self._vao.release()
+        self._instance_vbo.release()
+        if prototype._hasIndices:
+            prototype._ibo.release()
+        self._dirty.clear()
+        self._uploads += 1
+
+
+    def destroyInstanceBuffer(self):
+        """Hands the vertex array and the instance buffer to the ResourceManager"""
+        if self._instance_vbo.isCreated():
+            resources = ResourceManager()
+            resources.release(self._vao)
+            resources.release(self._instance_vbo)
+            self._vao = QOpenGLVertexArrayObject()
+            self._instance_vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+
+
+    def uploadInstances(self):
+        """Uploads the changed records, one write per run of consecutive slots"""
+        if self._capacity != len(self._records):
+            self.createInstanceBuffer()
+            return
+        slots = sorted(self._dirty)
+        self._dirty.clear()
+        if not slots:
+            return
+        self._instance_vbo.bind()
+        first = previous = slots[0]
+        for slot in slots[1:] + [None]:
+            if slot is not None and slot == previous + 1:
+                previous = slot
+                continue
+            data = np.ascontiguousarray(self._records[first:previous + 1])
+            self._instance_vbo.write(first * data.shape[1] * 4, data, data.nbytes)
+            self._uploads += 1
+            first = previous = slot
+        self._instance_vbo.release()
+
+
+    def setUniformBindings(self, wireframe=False):
+        """Sets up uniform shader bindings and the emission of highlighted instances"""
+        super(InstancedActor, self).setUniformBindings(wireframe)
+        self.setUniform("highlightEmission", Actor.HighlightEmission)
+
+
+    def beginRendering(self, draw_style, lighting, shading, passNumber):
+        """Uploads the changed instances once per frame, then sets up rendering"""
+        if passNumber == 0:
+            self.uploadInstances()
+        super(InstancedActor, self).beginRendering(draw_style, lighting, shading, passNumber)
+
+        ## material table of Obj prototypes
+        table = getattr(self._prototype, "_material_buffer", None)
+        if table is not None:
+            table.bindBase(Shaders.MaterialTableBinding)
+
+
+    def render(self):
+        """Draws every instance"""
+        if self._instances:
+            self._prototype.renderInstanced(self._active_shader, len(self._instances))
+
+
+    def destroy(self):
+        """Hands the GPU objects of the instances and of the prototype to the ResourceManager"""
+        self.destroyInstanceBuffer()
+        self._prototype.destroy()
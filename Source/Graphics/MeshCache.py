@@ -0,0 +1,243 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
+
+from Source.Graphics.ObjParser import ObjParser
+
+##  On-disk binary cache of parsed OBJ meshes.
+##
+##  After the first parse, the final arrays of an ObjParser are written to a
+##  compact binary file keyed by source path, size, mtime and content hash.
+##  Later loads memory map that file instead of parsing the text again. The
+##  total size of the cache is capped, evicting the least recently used files.
+class MeshCache:
+
+    __instance = None
+
+    Version = 5
+    Magic = b"MAC420MESH"
+    Alignment = 16
+
+    def __new__(cls):
+        if MeshCache.__instance is None:
+            MeshCache.__instance = object.__new__(cls)
+            MeshCache.__instance.initialize()
+        return MeshCache.__instance
+
+
+    def initialize(self):
+        """Sets up default cache location and capacity"""
+        self._directory = os.environ.get("MAC420_MESH_CACHE",
+            os.path.join(os.path.expanduser("~"), ".cache", "mac420", "meshes"))
+        self._capacity = 256 * 1024 * 1024
+        self._enabled = True
+        self._lock = threading.Lock()
+
+
+    def directory(self):
+        """Returns the cache directory"""
+        return self._directory
+
+
+    def setDirectory(self, directory):
+        """Sets the cache directory"""
+        self._directory = directory
+
+
+    def capacity(self):
+        """Returns the maximum size of the cache in bytes"""
+        return self._capacity
+
+
+    def setCapacity(self, capacity):
+        """Sets the maximum size of the cache in bytes"""
+        self._capacity = capacity
+        self.evict()
+
+
+    def isEnabled(self):
+        """Returns whether the cache is used"""
+        return self._enabled
+
+
+    def setEnabled(self, value):
+        """Sets whether the cache is used"""
+        self._enabled = value
+
+
+    @staticmethod
+    def stamp(filename):
+        """Returns the (size, mtime) stamp of a file, None if it does not exist"""
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+
+    def key(self, filename, **options):
+        """Returns the cache key of a source file parsed with the ObjParser options"""
+        path = os.path.abspath(filename)
+        with open(path, "rb") as arq:
+            content = hashlib.sha1(arq.read()).hexdigest()
+        ## equivalent options share a key, whether given or left to their defaults
+        options = sorted(ObjParser.options(**options).items())
+        key = json.dumps([MeshCache.Version, ObjParser.Arrays, path, self.stamp(path), content, options])
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+    def path(self, key):
+        """Returns the cache file of a key"""
+        return os.path.join(self._directory, key + ".mesh")
+
+
+    def parse(self, filename, **options):
+        """Returns the mesh of filename (without .obj) parsed with the ObjParser options, from cache when possible"""
+        if not self._enabled:
+            return ObjParser(filename, **options).parse()
+
+        key = self.key(filename + ".obj", **options)
+        mesh = self.load(key, filename)
+        if mesh is None:
+            mesh = ObjParser(filename, **options).parse()
+            self.store(key, mesh)
+        return mesh
+
+
+    def load(self, key, filename):
+        """Returns the cached mesh of a key, None on a miss"""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as arq:
+                if arq.read(len(MeshCache.Magic)) != MeshCache.Magic:
+                    return None
+                size = int.from_bytes(arq.read(8), "little")
+                header = json.loads(arq.read(size).decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        ## materials may have changed while the geometry did not
+        materialFile = header["properties"].get("materialFile")
+        if materialFile is not None and self.stamp(materialFile) != header["materialStamp"]:
+            return None
+
+        mesh = ObjParser(filename)
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        for name, entry in header["arrays"].items():
+            if entry is None:
+                setattr(mesh, name, None)
+                continue
+            count = int(np.prod(entry["shape"]))
+            view = data[entry["offset"]:entry["offset"] + count * np.dtype(entry["dtype"]).itemsize]
+            setattr(mesh, name, view.view(entry["dtype"]).reshape(entry["shape"]))
+        for name, value in header["properties"].items():
+            setattr(mesh, name, value)
+
+        ## mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return mesh
+
+
+    def store(self, key, mesh):
+        """Writes the arrays of a parsed mesh to the cache"""
+        arrays = {}
+        blobs = []
+        offset = 0
+        for name in ObjParser.Arrays:
+            array = getattr(mesh, name)
+            if array is None:
+                arrays[name] = None
+                continue
+            array = np.ascontiguousarray(array)
+            arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            blobs.append((offset, array))
+            offset += -(-array.nbytes // MeshCache.Alignment) * MeshCache.Alignment
+
+        header = {
+            "arrays": arrays,
+            "properties": {name: getattr(mesh, name) for name in ObjParser.Properties},
+            "materialStamp": self.stamp(mesh.materialFile) if mesh.materialFile else None
+        }
+
+        ## place data right after the header, aligned
+        start = 0
+        while True:
+            for name, (offset, array) in zip([name for name in arrays if arrays[name] is not None], blobs):
+                arrays[name]["offset"] = start + offset
+            encoded = json.dumps(header).encode("utf-8")
+            needed = -(-(len(MeshCache.Magic) + 8 + len(encoded)) // MeshCache.Alignment) * MeshCache.Alignment
+            if needed <= start:
+                break
+            start = needed
+        encoded += b" " * (start - len(MeshCache.Magic) - 8 - len(encoded))
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as arq:
+                arq.write(MeshCache.Magic)
+                arq.write(len(encoded).to_bytes(8, "little"))
+                arq.write(encoded)
+                for offset, array in blobs:
+                    arq.seek(start + offset)
+                    arq.write(array.tobytes())
+            os.replace(temporary, self.path(key))
+        except OSError:
+            return False
+
+        self.evict()
+        return True
+
+
+    def entries(self):
+        """Returns (path, size, last use) of every cache file, least recently used first"""
+        entries = []
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.endswith(".mesh"):
+                path = os.path.join(self._directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime_ns))
+        return sorted(entries, key=lambda entry: entry[2])
+
+
+    def size(self):
+        """Returns the total size of the cache in bytes"""
+        return sum(entry[1] for entry in self.entries())
+
+
+    def evict(self):
+        """Removes least recently used files until the cache fits its capacity"""
+        with self._lock:
+            entries = self.entries()
+            total = sum(entry[1] for entry in entries)
+            for path, size, used in entries:
+                if total <= self._capacity:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+
+    def clear(self):
+        """Removes every cache file"""
+        with self._lock:
+            for path, size, used in self.entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,80 @@
+import hashlib
+import numpy as np
+
+from Source.Graphics.ResourceManager import ResourceManager
+
+##  Reference counted registry of GPU mesh buffers.
+##
+##  Actors created from the same mesh content share one vertex array object,
+##  vertex buffer and index buffer, plus any other GPU object of the actor's
+##  shared state. Each actor keeps its own transform and material; the
+##  buffers are destroyed when the last actor releases them.
+class MeshRegistry:
+
+    __instance = None
+
+    def __new__(cls):
+        if MeshRegistry.__instance is None:
+            MeshRegistry.__instance = object.__new__(cls)
+            MeshRegistry.__instance.initialize()
+        return MeshRegistry.__instance
+
+
+    def initialize(self):
+        """Create empty registry"""
+        self._meshes = {}
+
+
+    @staticmethod
+    def contentKey(*arrays):
+        """Returns a hash identifying the content of the given arrays"""
+        digest = hashlib.sha1()
+        for each in arrays:
+            if each is None:
+                digest.update(b"none")
+                continue
+            each = np.ascontiguousarray(each)
+            digest.update("{}{}".format(each.dtype.str, each.shape).encode("utf-8"))
+            digest.update(each.data)
+        return digest.hexdigest()
+
+
+    def acquire(self, key):
+        """Returns the buffer state registered for key and adds a reference, None if unknown"""
+        entry = self._meshes.get(key)
+        if entry is None:
+            return None
+        entry["references"] += 1
+        return entry["state"]
+
+
+    def register(self, key, state):
+        """Registers the buffer state of a new mesh with one reference, the registry owns its GPU objects from now on"""
+        self._meshes[key] = {"state": state, "references": 1}
+        for value in state.values():
+            ResourceManager().adopt(value, self)
+        return state
+
+
+    def release(self, key):
+        """Drops a reference, destroying the buffers when none is left"""
+        entry = self._meshes.get(key)
+        if entry is None:
+            return
+        entry["references"] -= 1
+        if entry["references"] <= 0:
+            del self._meshes[key]
+            for value in entry["state"].values():
+                if hasattr(value, "destroy"):
+                    ResourceManager().release(value)
+
+
+    def references(self, key):
+        """Returns the number of actors sharing the mesh of key"""
+        entry = self._meshes.get(key)
+        return entry["references"] if entry is not None else 0
+
+
+    def numberOfMeshes(self):
+        """Returns the number of meshes currently on the GPU"""
+        return len(self._meshes)
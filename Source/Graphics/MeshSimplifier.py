@@ -0,0 +1,172 @@
+import heapq
+import numpy as np
+
+## default triangle ratios of the generated levels of detail
+LevelRatios = (0.5, 0.25, 0.125)
+
+## weight of the planes holding open borders in place
+BorderWeight = 1000.0
+
+
+def quadric(Q, point):
+    """Returns the error of point under quadric Q"""
+    return float(point @ Q[:3, :3] @ point + 2.0 * (Q[:3, 3] @ point) + Q[3, 3])
+
+
+##  Quadric error metric mesh simplification.
+##
+##  Garland and Heckbert edge collapses restricted to half edges: a vertex is
+##  always moved onto one of its neighbours, so every level of detail is only
+##  another index buffer over the same vertex arrays. Vertices sharing a
+##  position (attribute seams) collapse together, open borders are held by
+##  perpendicular penalty planes, and collapses flipping a triangle are
+##  rejected.
+def simplify(indices, positions, *attributes, **kwargs):
+    """Returns one index array per ratio of the triangle count, or (indices, source triangles) pairs with sources=True"""
+    ratios = kwargs.get("ratios", LevelRatios)
+    sources = kwargs.get("sources", False)
+    indices = np.asarray(indices)
+    triangles = indices.reshape(-1, 3)
+    if len(triangles) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return [(indices.copy(), empty) if sources else indices.copy() for ratio in ratios]
+
+    ## collapse on positions, not on attribute vertices
+    points, group = np.unique(np.asarray(positions, dtype=np.float64), axis=0, return_inverse=True)
+    group = group.reshape(-1)
+    corners = group[triangles]
+
+    ## plane quadrics weighted by triangle area
+    p0, p1, p2 = points[corners[:, 0]], points[corners[:, 1]], points[corners[:, 2]]
+    normals = np.cross(p1 - p0, p2 - p0)
+    area = np.linalg.norm(normals, axis=1)
+    unit = normals / np.maximum(area, 1e-30)[:, None]
+    planes = np.concatenate([unit, -np.einsum("ij,ij->i", unit, p0)[:, None]], axis=1)
+    Q = np.zeros((len(points), 4, 4))
+    weighted = 0.5 * area[:, None, None] * planes[:, :, None] * planes[:, None, :]
+    for k in range(3):
+        np.add.at(Q, corners[:, k], weighted)
+
+    ## penalty planes along open borders
+    edges = np.concatenate([corners[:, [0, 1]], corners[:, [1, 2]], corners[:, [2, 0]]])
+    owner = np.tile(np.arange(len(corners)), 3)
+    keys = np.sort(edges, axis=1)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    border = counts[inverse.reshape(-1)] == 1
+    if border.any():
+        a, b = edges[border, 0], edges[border, 1]
+        direction = points[b] - points[a]
+        normal = np.cross(direction, unit[owner[border]])
+        length = np.linalg.norm(normal, axis=1)
+        normal /= np.maximum(length, 1e-30)[:, None]
+        plane = np.concatenate([normal, -np.einsum("ij,ij->i", normal, points[a])[:, None]], axis=1)
+        penalty = BorderWeight * np.einsum("ij,ij->i", direction, direction)[:, None, None] * plane[:, :, None] * plane[:, None, :]
+        np.add.at(Q, a, penalty)
+        np.add.at(Q, b, penalty)
+
+    ## mutable topology in position space
+    faces = corners.tolist()
+    alive = [len(set(face)) == 3 for face in faces]
+    around = [set() for _ in range(len(points))]
+    for t, face in enumerate(faces):
+        if alive[t]:
+            for g in face:
+                around[g].add(t)
+    version = [0] * len(points)
+    removed = [False] * len(points)
+    remaining = sum(alive)
+
+    def neighbours(g):
+        result = set()
+        for t in around[g]:
+            result.update(faces[t])
+        result.discard(g)
+        return result
+
+    heap = []
+    def push(a, b):
+        heap.append((quadric(Q[a] + Q[b], points[b]), a, b, version[a], version[b]))
+
+    for a in range(len(points)):
+        for b in neighbours(a):
+            push(a, b)
+    heapq.heapify(heap)
+
+    ## collapse the cheapest valid edges, recording each level on the way
+    targets = sorted(((int(remaining * ratio), i) for i, ratio in enumerate(ratios)), reverse=True)
+    levels = [None] * len(ratios)
+    while targets:
+        while targets and remaining <= targets[0][0]:
+            levels[targets.pop(0)[1]] = [(t, list(faces[t])) for t in range(len(faces)) if alive[t]]
+        if not targets or not heap:
+            break
+
+        cost, a, b, va, vb = heapq.heappop(heap)
+        if removed[a] or removed[b] or version[a] != va or version[b] != vb:
+            continue
+
+        ## link condition, keeps the surface manifold
+        shared = [t for t in around[a] if b in faces[t]]
+        if len(neighbours(a) & neighbours(b)) > len(shared):
+            continue
+
+        ## reject collapses flipping a triangle
+        flipped = False
+        for t in around[a]:
+            if b in faces[t]:
+                continue
+            face = faces[t]
+            before = np.cross(points[face[1]] - points[face[0]], points[face[2]] - points[face[0]])
+            moved = [b if g == a else g for g in face]
+            after = np.cross(points[moved[1]] - points[moved[0]], points[moved[2]] - points[moved[0]])
+            if before @ after <= 0.0:
+                flipped = True
+                break
+        if flipped:
+            continue
+
+        ## move a onto b
+        for t in list(around[a]):
+            if b in faces[t]:
+                alive[t] = False
+                remaining -= 1
+                for g in faces[t]:
+                    around[g].discard(t)
+            else:
+                faces[t] = [b if g == a else g for g in faces[t]]
+                around[b].add(t)
+        around[a].clear()
+        removed[a] = True
+        Q[b] += Q[a]
+        version[b] += 1
+        for g in neighbours(b):
+            heapq.heappush(heap, (quadric(Q[g] + Q[b], points[b]), g, b, version[g], version[b]))
+            heapq.heappush(heap, (quadric(Q[b] + Q[g], points[g]), b, g, version[b], version[g]))
+
+    ## levels the collapses could not reach keep the coarsest result
+    current = [(t, list(faces[t])) for t in range(len(faces)) if alive[t]]
+    levels = [current if level is None else level for level in levels]
+
+    ## back from positions to attribute vertices
+    members = [[] for _ in range(len(points))]
+    for v, g in enumerate(group.tolist()):
+        members[g].append(v)
+    present = [np.asarray(each, dtype=np.float64).reshape(len(group), -1) for each in attributes if each is not None]
+    features = np.concatenate(present, axis=1) if present else np.zeros((len(group), 0))
+    chosen = {}
+
+    def vertex(u, g):
+        """Returns the vertex of position g with attributes closest to vertex u"""
+        if group[u] == g:
+            return u
+        if (u, g) not in chosen:
+            candidates = members[g]
+            distance = ((features[candidates] - features[u]) ** 2).sum(axis=1)
+            chosen[(u, g)] = candidates[int(np.argmin(distance))]
+        return chosen[(u, g)]
+
+    result = []
+    for level in levels:
+        buffer = np.array([vertex(u, g) for t, face in level for u, g in zip(triangles[t].tolist(), face)], dtype=indices.dtype)
+        result.append((buffer, np.array([t for t, face in level], dtype=np.int64)) if sources else buffer)
+    return result
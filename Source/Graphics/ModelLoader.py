@@ -0,0 +1,86 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Source.Graphics.MeshCache import MeshCache
+
+##  Loads OBJ meshes on a worker pool.
+##
+##  Parsing (or mapping from the mesh cache) runs off the GUI thread; results
+##  are delivered through queued signals, so the receiver only has to do the
+##  GPU upload on the GL thread. Each request gets a ticket which can be
+##  cancelled, after which its result is dropped.
+class ModelLoader(QObject):
+
+    loaded = pyqtSignal(int, str, object)
+    failed = pyqtSignal(int, str, str)
+
+    ## initialization
+    def __init__(self, parent=None, **kwargs):
+        """Initialize loader"""
+        super(ModelLoader, self).__init__(parent)
+
+        self._executor = ThreadPoolExecutor(max_workers=kwargs.get("workers", 2))
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._ticket = 0
+
+
+    def load(self, filename, **options):
+        """Starts loading an .obj file with the ObjParser options and returns the request ticket"""
+        with self._lock:
+            self._ticket += 1
+            ticket = self._ticket
+            self._pending[ticket] = self._executor.submit(self._parse, ticket, filename, options)
+        return ticket
+
+
+    def isPending(self, ticket):
+        """Returns whether a request is still active"""
+        with self._lock:
+            return ticket in self._pending
+
+
+    def cancel(self, ticket):
+        """Cancels a request, its result will never be delivered"""
+        with self._lock:
+            future = self._pending.pop(ticket, None)
+        if future is not None:
+            future.cancel()
+
+
+    def cancelAll(self):
+        """Cancels every active request"""
+        with self._lock:
+            futures = list(self._pending.values())
+            self._pending.clear()
+        for each in futures:
+            each.cancel()
+
+
+    def finish(self, ticket):
+        """Marks a delivered request as consumed, returns False if it was cancelled meanwhile"""
+        with self._lock:
+            return self._pending.pop(ticket, None) is not None
+
+
+    def shutdown(self):
+        """Cancels all requests and stops the workers"""
+        self.cancelAll()
+        self._executor.shutdown(wait=False)
+
+
+    def _parse(self, ticket, filename, options):
+        """Worker side of a request"""
+        if not self.isPending(ticket):
+            return
+        try:
+            mesh = MeshCache().parse(os.path.splitext(filename)[0], **options)
+        except Exception as error:
+            if self.isPending(ticket):
+                self.failed.emit(ticket, filename, str(error))
+            return
+        if self.isPending(ticket):
+            self.loaded.emit(ticket, filename, mesh)
@@ -0,0 +1,105 @@
+import os
+import threading
+
+##  Parsed Wavefront MTL material library.
+##
+##  Each .mtl file is parsed once into a dictionary of materials and shared by
+##  every Obj referencing it. A library is parsed again only when the file's
+##  modification time or size changes.
+class MtlLibrary:
+
+    __libraries = {}
+    __lock = threading.Lock()
+    __reads = 0
+
+    ## default diffuse color for unknown materials
+    DefaultDiffuse = (0.5, 0.5, 0.0)
+
+    def __init__(self, filename, **kwargs):
+        """Initialize library for filename"""
+        self._filename = filename
+        self._stamp = kwargs.get("stamp", None)
+        self._materials = {}
+
+
+    @classmethod
+    def load(cls, filename):
+        """Returns the shared library of filename, parsing it if needed"""
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+
+        with cls.__lock:
+            library = cls.__libraries.get(path)
+            if library is None or library._stamp != stamp:
+                library = MtlLibrary(path, stamp=stamp)
+                if stamp is not None:
+                    library.parse()
+                    cls.__reads += 1
+                cls.__libraries[path] = library
+            return library
+
+
+    @classmethod
+    def clearCache(cls):
+        """Drops every cached library"""
+        with cls.__lock:
+            cls.__libraries.clear()
+
+
+    @classmethod
+    def numberOfReads(cls):
+        """Returns how many times an .mtl file was read from disk"""
+        return cls.__reads
+
+
+    @property
+    def filename(self):
+        """Returns the path of this library"""
+        return self._filename
+
+
+    def parse(self):
+        """Parses all materials of the file"""
+        current = None
+        with open(self._filename, "r") as arq:
+            for line in arq:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                values = line.split(None, 1)
+                key = values[0]
+                rest = values[1].strip() if len(values) > 1 else ""
+                if key == 'newmtl':
+                    ## the first definition of a name wins
+                    current = self._materials.setdefault(rest.split()[0] if rest else "", {})
+                elif current is None or key in current:
+                    continue
+                elif key.startswith('map_') or key in ('bump', 'disp', 'decal', 'refl'):
+                    current[key] = rest
+                else:
+                    try:
+                        numbers = tuple(float(v) for v in rest.split())
+                    except ValueError:
+                        current[key] = rest
+                        continue
+                    current[key] = numbers[0] if key in ('Ns', 'd', 'Tr', 'Ni', 'illum') and numbers else numbers
+        return self
+
+
+    def names(self):
+        """Returns the names of all materials in this library"""
+        return list(self._materials.keys())
+
+
+    def properties(self, name):
+        """Returns a copy of the property dictionary of a material, empty if unknown"""
+        return dict(self._materials.get(name, {}))
+
+
+    def diffuse(self, name):
+        """Returns the Kd color of a material as a tuple"""
+        return self.properties(name).get('Kd', MtlLibrary.DefaultDiffuse)
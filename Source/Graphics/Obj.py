@@ -5,29 +5,24 @@ from PyQt5.QtGui import QVector3D
 
 from OpenGL import GL
 from Source.Graphics.Actor import Actor
-
-def getMaterial(filename, mat):
-    arq = open(filename + ".mtl", "r")
-    kd = [0.5,0.5,0]
-    mat_ = ""
-    for line in arq:
-        if line.startswith('#'):
-            continue
-        values = line.split()
-        if not values:
-            continue
-        if values[0] == 'newmtl':
-            mat_ = values[1]
-        if values[0] == 'Kd' and mat_ == mat:
-            kd = []
-            for v in values[1:]:
-                kd.append(float(v))
-            
-            return kd
-    return kd
+from Source.Graphics.MeshCache import MeshCache
+from Source.Graphics.MeshRegistry import MeshRegistry
+from Source.Graphics.UniformBuffer import UniformBuffer
+from Source.Graphics.ResourceManager import ResourceManager
+from Source.Graphics.VertexLayout import VertexLayout
+from Source.Graphics.Shaders import Shaders
 
 class Obj(Actor):
 
+    ## the material table is shared with the vertex buffers
+    SharedState = Actor.SharedState + ['_material_buffer']
+
+    ## viewport fraction below which the first simplified level is used, halved for each next level
+    LevelCoverage = 0.5
+
+    ## relative margin around each switching point, avoids popping back and forth
+    LevelHysteresis = 0.15
+
     ## initialization
     def __init__(self, scene,  **kwargs):
         """Initialize actor."""
@@ -40,8 +35,31 @@ class Obj(Actor):
         self._normals = None
         self._texcoords = None
         self._colors = None
+        self._indices = None
+        self._lodIndices = None
+        self._lodCounts = None
+        self._materialTable = None
+        self._materialCounts = None
+        self._material_buffer = None
+        self._contentHash = None
+        self._levels = []
+        self._level = 0
+        self._lod = kwargs.get("lod", True)
+
+        ## vertex encodings, float32 by default
+        self._format = kwargs.get("format", None)
+
+        ## planar or interleaved vertex buffer
+        self._layout = kwargs.get("layout", VertexLayout.Mode.Planar)
         self._rgb_colors = True
 
+        ## vertex cache reordering and level of detail ratios of the parsed mesh, see ObjParser
+        self._optimize = kwargs.get("optimize", False)
+        self._lodRatios = tuple(kwargs.get("lods", ()))
+
+        ## mesh already parsed elsewhere, e.g. by the model loader
+        self._mesh = kwargs.get("mesh", None)
+
         if self._rgb_colors:
             self.setSolidShader(self.shaderCollection.attributeColorPhongShader())
             self.setSolidFlatShader(self.shaderCollection.attributeColorPhongFlatShader())
@@ -59,124 +77,26 @@ class Obj(Actor):
 
 
     def generateGeometry(self):
-        v_ = []
-        pointMin_x = math.inf
-        pointMin_y = math.inf
-        pointMin_z = math.inf
-        pointMax_x = -math.inf
-        pointMax_y = -math.inf
-        pointMax_z = -math.inf
-        arq = open(self._filename + ".obj", "r")
-        for line in arq:
-            if line.startswith('#'):
-                continue
-            values = line.split()
-            if not values:
-                continue
-            if values[0] != 'v':
-                continue
-            else:
-                v_.append([float(values[1]), float(values[2]), float(values[3])])
-                if float(values[1]) < pointMin_x:
-                    pointMin_x = float(values[1])
-                if float(values[2]) < pointMin_y:
-                    pointMin_y = float(values[2])
-                if float(values[3]) < pointMin_z:
-                    pointMin_z = float(values[3])
-
-                if float(values[1]) > pointMax_x:
-                    pointMax_x = float(values[1])
-                if float(values[2]) > pointMax_y:
-                    pointMax_y = float(values[2])
-                if float(values[3]) > pointMax_z:
-                    pointMax_z = float(values[3])
-        arq.close()
-        self.setPointMin(QVector3D(pointMin_x, pointMin_y, pointMin_z))
-        self.setPointMax(QVector3D(pointMax_x, pointMax_y, pointMax_z))
+        """Parses the obj file into vertex arrays, or maps them from the mesh cache"""
+        mesh = self._mesh if self._mesh is not None else MeshCache().parse(self._filename, optimize=self._optimize, lods=self._lodRatios)
+        self._mesh = None
+        self.mtl = mesh.mtllib
+
+        self.setPointMin(QVector3D(*[float(x) for x in mesh.pointMin]))
+        self.setPointMax(QVector3D(*[float(x) for x in mesh.pointMax]))
         self.setCenter()
         self.setSize()
 
-        vertices = []
-        n = []
-        t = []
-        normals = []
-        texture = []
-        colors = []
-        arq = open(self._filename + ".obj", "r")
-        
-        for line in arq:
-            if line.startswith('#'):
-                continue
-            values = line.split()
-            if not values:
-                continue
-            if values[0] == 'mtllib':
-                self.mtl = values[1]
-            elif values[0] == 'v':
-                continue
-            elif values[0] == 'vn':
-                n.append([float(values[1]), float(values[2]), float(values[3])])
-            elif values[0] == 'vt':
-                t.append([float(values[1]), float(values[2])])
-            elif values[0] in ('usemtl', 'usemat'):
-                color = getMaterial(self._filename, values[1])
-            elif values[0] == 'f':
-                face = []
-                text = []
-                norm = []
-                if len(values[1:]) == 4:
-                    for v in values[1:]:
-                        w = v.split('/')
-                        face.append(int(w[0])-1)
-                        colors.append(color)
-                        if len(w) >= 2 and len(w[1]) > 0:
-                            text.append(t[int(w[1]) -1])
-                        if len(w) >= 3 and len(w[2]) > 0:
-                            norm.append(n[int(w[2])-1])
-                    vertices.append(v_[face[0]])
-                    texture.append(text[0])
-                    normals.append(norm[0])
-                    vertices.append(v_[face[1]]) 
-                    texture.append(text[1])
-                    normals.append(norm[1])
-                    vertices.append(v_[face[2]])
-                    texture.append(text[2])
-                    normals.append(norm[2])
-                    vertices.append(v_[face[2]]) 
-                    texture.append(text[2])
-                    normals.append(norm[2])
-                    vertices.append(v_[face[3]]) 
-                    texture.append(text[3])
-                    normals.append(norm[3])
-                    vertices.append(v_[face[0]])
-                    texture.append(text[0])
-                    normals.append(norm[0])
-                    colors.append(color)
-                    colors.append(color)
-
-                    #falta ver as normais
-                else:
-                    for v in values[1:]:
-                        w = v.split('/')
-                        vertices.append(v_[int(w[0])-1])
-                        colors.append(color)
-                        if len(w) >= 2 and len(w[1]) > 0:
-                            texture.append(t[int(w[1]) -1])
-                        if len(w) >= 3 and len(w[2]) > 0:
-                            norm = QVector3D(n[int(w[2])-1][0], n[int(w[2])-1][1], n[int(w[2])-1][2])
-                            norm = norm.normalized()
-                            normals.append([norm[0], norm[1], norm[2]])
-                        else:
-                            norm = QVector3D(v_[int(w[0])-1][0], v_[int(w[0])-1][1], v_[int(w[0])-1][2])
-                            norm = norm.normalized()
-                            normals.append([norm[0], norm[1], norm[2]])
-        arq.close()
-
-        self._vertices = np.array(vertices, dtype=np.float32)
-        self._normals = np.array(normals, dtype=np.float32)
-        self._texcoords = np.array(texture, dtype=np.float32)
-        self._colors = np.array(colors, dtype=np.float32)
-
+        self._vertices = mesh.vertices
+        self._normals = mesh.normals
+        self._texcoords = mesh.texcoords
+        self._colors = mesh.colors
+        self._indices = mesh.indices
+        self._lodIndices = mesh.lodIndices
+        self._lodCounts = mesh.lodCounts
+        self._materialTable = mesh.materialTable
+        self._materialCounts = mesh.materialCounts
+        self._contentHash = mesh.contentHash
 
 
     def initialize(self):
@@ -184,15 +104,129 @@ class Obj(Actor):
         if self._vertices is None:
             self.generateGeometry()
 
-        ## create object
-        self.create(vertices=self._vertices, 
+        if self._contentHash is None:
+            self._contentHash = MeshRegistry.contentKey(
+                self._vertices, self._normals, self._texcoords, self._colors, self._indices, self._lodIndices,
+                self._materialTable, self._materialCounts)
+
+        ## colors come from the material table, one draw per material range
+        if self._materialTable is not None:
+            self.setSolidShader(self.shaderCollection.materialTablePhongShader())
+            self.setSolidFlatShader(self.shaderCollection.materialTablePhongFlatShader())
+            self.setNoLightSolidShader(self.shaderCollection.materialTableShader())
+            self.setWireframeShader(self.shaderCollection.materialTablePhongShader())
+
+        ## all levels of detail live in one index buffer, each level as (byte offset, count, material) ranges
+        indices = self._indices
+        if indices is not None:
+            counts = [len(indices)]
+            if self._lodIndices is not None:
+                counts += self._lodCounts.tolist()
+                indices = np.concatenate([indices, self._lodIndices])
+            if self._format is not None:
+                indices = self._format.encodeIndices(indices)
+            offsets = np.cumsum([0] + counts[:-1]) * indices.dtype.itemsize
+            if self._materialCounts is None:
+                self._levels = [[(int(offset), count, 0)] for offset, count in zip(offsets, counts)]
+            else:
+                self._levels = []
+                for offset, materials in zip(offsets, self._materialCounts):
+                    starts = offset + (np.cumsum(materials) - materials) * indices.dtype.itemsize
+                    self._levels.append([(int(start), int(count), material) for material, (start, count)
+                        in enumerate(zip(starts, materials)) if count > 0])
+
+        ## create object, sharing buffers with copies of the same mesh, format and layout
+        key = self._contentHash if self._format is None else self._contentHash + ":" + self._format.key()
+        if self._layout != VertexLayout.Mode.Planar:
+            key += ":{}".format(self._layout)
+        self.createShared(key,
+            vertices=self._vertices,
             colors=self._colors,
             normals=self._normals,
-            texcoords=self._texcoords)
+            texcoords=self._texcoords,
+            indices=indices,
+            format=self._format,
+            layout=self._layout)
+
+
+    def create(self, vertices, **kwargs):
+        """Create object buffers and the uniform buffer of the material table"""
+        super(Obj, self).create(vertices, **kwargs)
+        if self._materialTable is not None:
+            table = np.zeros((Shaders.MaxMaterials, 12), dtype=np.float32)
+            table[:len(self._materialTable)] = self._materialTable
+            self._material_buffer = UniformBuffer()
+            self._material_buffer.create()
+            self._material_buffer.allocate(table)
+            ResourceManager().track(self._material_buffer, self, ResourceManager.Kind.Buffer, table.nbytes)
+
+
+    def numberOfMaterials(self):
+        """Returns the number of material ranges of the mesh, 0 for per-vertex colors"""
+        return 0 if self._materialTable is None else len(self._materialTable)
+
+
+    def numberOfLevels(self):
+        """Returns the number of levels of detail of this actor"""
+        return max(len(self._levels), 1)
+
+
+    def levelOfDetail(self):
+        """Returns the level of detail currently drawn, 0 being the full mesh"""
+        return self._level
+
+
+    def setLevelOfDetailEnabled(self, value):
+        """Sets whether simplified levels are drawn when the actor is small on screen"""
+        self._lod = value
+        if not value:
+            self._level = 0
+
+
+    def numberOfTriangles(self):
+        """Returns the number of triangles drawn at the current level of detail"""
+        if self._levels:
+            return sum(count for offset, count, material in self._levels[self._level]) // 3
+        return len(self._vertices) // 3
+
+
+    @staticmethod
+    def levelForCoverage(coverage, level, count):
+        """Returns the level of detail for a screen coverage, moving from level with hysteresis"""
+        while level < count - 1 and coverage < Obj.LevelCoverage * 0.5 ** level * (1.0 - Obj.LevelHysteresis):
+            level += 1
+        while level > 0 and coverage > Obj.LevelCoverage * 0.5 ** (level - 1) * (1.0 + Obj.LevelHysteresis):
+            level -= 1
+        return level
+
+
+    def selectLevelOfDetail(self):
+        """Chooses the level of detail from the projected size of the bounding sphere"""
+        if not self._lod or len(self._levels) < 2:
+            return
+        xform = self._transform
+        scale = max(xform.column(i).toVector3D().length() for i in range(3))
+        coverage = self._scene.camera.projectedSize(xform * self._center, 0.5 * scale * self._size.length())
+        self._level = Obj.levelForCoverage(coverage, self._level, len(self._levels))
+
+
+    def beginRendering(self, draw_style, lighting, shading, passNumber):
+        """Picks the level of detail once per frame, then sets up rendering"""
+        if passNumber == 0:
+            self.selectLevelOfDetail()
+        super(Obj, self).beginRendering(draw_style, lighting, shading, passNumber)
+        if self._material_buffer is not None:
+            self._material_buffer.bindBase(Shaders.MaterialTableBinding)
 
 
     def render(self):
         """Render Obj"""
-        GL.glDrawArrays(self._render_mode, 0, len(self._vertices))
+        if self._indices is not None:
+            for offset, count, material in self._levels[self._level]:
+                if self._material_buffer is not None:
+                    self.setUniform("materialIndex", material)
+                self.drawElements(self._render_mode, count, offset // (2 if self.indexType == GL.GL_UNSIGNED_SHORT else 4))
+        else:
+            self.drawArrays(self._render_mode, 0, len(self._vertices))
 
     
@@ -0,0 +1,310 @@
+import os
+import numpy as np
+
+from Source.Graphics.MtlLibrary import MtlLibrary
+from Source.Graphics.VertexWelder import weld
+from Source.Graphics.VertexCacheOptimizer import optimize, optimizeRanges
+from Source.Graphics.MeshSimplifier import simplify
+from Source.Graphics.MeshRegistry import MeshRegistry
+from Source.Graphics.Shaders import Shaders
+
+##  Single pass Wavefront OBJ parser.
+##
+##  The file is read once and every record is classified in bulk with numpy,
+##  so no Python object is created per face corner. Faces with any number of
+##  corners are fan triangulated as (0, 1, 2), (2, 3, 0), (3, 4, 0), ...
+##  Reordering the welded mesh for the vertex cache is optional, enabled
+##  with optimize=True, as it costs more than the rest of the parse. So are
+##  the simplified levels of detail, built for the triangle ratios given as
+##  lods, e.g. MeshSimplifier.LevelRatios.
+class ObjParser:
+
+    ## parsed results, as stored by the mesh cache
+    Arrays = ['vertices', 'normals', 'texcoords', 'colors', 'indices', 'lodIndices', 'lodCounts',
+        'materialTable', 'materialCounts', 'pointMin', 'pointMax']
+    Properties = ['mtllib', 'materialFile', 'materialNames', 'numberOfFaces', 'contentHash']
+
+    ## parse options and their defaults
+    Options = {"weld": True, "optimize": False, "lods": (), "materials": True}
+
+    def __init__(self, filename, **kwargs):
+        """Initialize parser for filename, given without the .obj extension"""
+        self._filename = filename
+        options = ObjParser.options(**kwargs)
+        self._weld = options["weld"]
+        self._optimize = options["optimize"]
+        self._lods = options["lods"]
+        self._materials = options["materials"]
+
+        self.vertices = None
+        self.normals = None
+        self.texcoords = None
+        self.colors = None
+        self.indices = None
+        self.lodIndices = None
+        self.lodCounts = None
+        self.materialTable = None
+        self.materialCounts = None
+        self.materialNames = None
+        self.pointMin = None
+        self.pointMax = None
+        self.mtllib = None
+        self.materialFile = None
+        self.numberOfFaces = 0
+        self.contentHash = None
+        self._triangleMaterial = None
+
+
+    @staticmethod
+    def options(**kwargs):
+        """Returns every parse option, the defaults filled in, in a canonical form"""
+        options = {name: kwargs.get(name, default) for name, default in ObjParser.Options.items()}
+        options["weld"] = bool(options["weld"])
+        options["optimize"] = bool(options["optimize"])
+        options["lods"] = tuple(float(ratio) for ratio in options["lods"])
+        options["materials"] = bool(options["materials"])
+        return options
+
+
+    @property
+    def filename(self):
+        """Returns the parsed file name, without extension"""
+        return self._filename
+
+
+    @staticmethod
+    def partition(strings, separator):
+        """Splits each string around its first separator into (head, separator, tail) columns"""
+        parts = np.char.partition(strings, separator).reshape(-1, 3)
+        return parts[:, 0], parts[:, 1], parts[:, 2]
+
+
+    @staticmethod
+    def floats(rows, width):
+        """Returns the first width values of each row as a float64 array"""
+        values = np.fromstring(" ".join(rows.tolist()), dtype=np.float64, sep=" ")
+        if values.size != width * len(rows):
+            ## ragged records (e.g. v x y z w), take them one by one
+            values = np.array([row.split()[:width] for row in rows], dtype=np.float64)
+        return values.reshape(-1, width)
+
+
+    @staticmethod
+    def corners(faces, count):
+        """Returns the v/vt/vn indices of count face corners, 0 where an index is missing"""
+        tokens = " ".join(faces)
+        if tokens.count("/") % max(count, 1) != 0 or "/ " in tokens + " ":
+            ## corners mix different formats, pad each one to v/vt/vn
+            tokens = np.array(tokens.split(), dtype=str)
+            slashes = np.minimum(np.char.count(tokens, "/"), 2)
+            tokens = " ".join(np.char.add(tokens, np.array(["//", "/", ""])[slashes]))
+        text = (tokens + " ").replace("//", "/0/").replace("/ ", "/0 ")
+        fields = text.count("/") // max(count, 1) + 1
+        values = np.fromstring(text.replace("/", " "), dtype=np.int64, sep=" ")
+        if values.size != count * fields:
+            raise ValueError("malformed face records")
+        return np.pad(values.reshape(-1, fields), ((0, 0), (0, 3 - fields)))
+
+
+    @staticmethod
+    def normalize(vectors):
+        """Normalizes float32 vectors exactly like QVector3D.normalized()"""
+        vectors = vectors.astype(np.float32)
+        x, y, z = vectors.astype(np.float64).T
+        length = x * x + y * y + z * z
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = (vectors / np.sqrt(length)[:, None]).astype(np.float32)
+        unit = np.abs(length - 1.0) <= 1e-12
+        result[unit] = vectors[unit]
+        result[length <= 1e-12] = 0.0
+        return result
+
+
+    @staticmethod
+    def resolve(values, before):
+        """Converts 1-based (or negative, relative) OBJ indices to 0-based ones"""
+        return np.where(values < 0, before + values, values - 1)
+
+
+    def library(self):
+        """Returns the material library referenced by the file"""
+        filename = self._filename + ".mtl"
+        if self.mtllib is not None:
+            path = os.path.join(os.path.dirname(self._filename), self.mtllib)
+            if os.path.exists(path):
+                filename = path
+        self.materialFile = os.path.abspath(filename)
+        return MtlLibrary.load(filename)
+
+
+    def parse(self):
+        """Parses the file and fills the vertex arrays"""
+        with open(self._filename + ".obj", "r") as arq:
+            text = arq.read().replace("\t", " ")
+
+        lines = np.char.strip(np.array(text.splitlines(), dtype=str))
+        kind, _, rest = self.partition(lines, " ")
+        line_number = np.arange(len(lines))
+
+        ## vertex attributes
+        is_v = kind == "v"
+        positions = self.floats(rest[is_v], 3)
+        vn = self.normalize(self.floats(rest[kind == "vn"], 3))
+        vt = self.floats(rest[kind == "vt"], 2).astype(np.float32)
+
+        if len(positions) > 0:
+            self.pointMin = positions.min(axis=0)
+            self.pointMax = positions.max(axis=0)
+        else:
+            self.pointMin = np.full(3, np.inf)
+            self.pointMax = np.full(3, -np.inf)
+
+        ## materials, each face takes the last usemtl above it
+        mtllib = rest[kind == "mtllib"]
+        self.mtllib = str(mtllib[0]) if len(mtllib) > 0 else None
+        is_mtl = (kind == "usemtl") | (kind == "usemat")
+        mtl_names = [name.split()[0] if name.strip() else "" for name in rest[is_mtl]]
+        library = self.library() if mtl_names else None
+        kd = np.array([MtlLibrary.DefaultDiffuse] + [library.diffuse(name)[:3] for name in mtl_names], dtype=np.float32)
+
+        ## faces and their corners
+        is_f = kind == "f"
+        faces = rest[is_f].tolist()
+        face_line = line_number[is_f]
+        self.numberOfFaces = len(faces)
+        counts = np.fromiter(map(len, map(str.split, faces)), dtype=np.int64, count=len(faces))
+        corners = self.corners(faces, int(counts.sum()))
+        corner_line = np.repeat(face_line, counts)
+
+        v_idx = self.resolve(corners[:, 0], np.searchsorted(line_number[is_v], corner_line))
+        vt_idx = self.resolve(corners[:, 1], np.searchsorted(line_number[kind == "vt"], corner_line))
+        vn_idx = self.resolve(corners[:, 2], np.searchsorted(line_number[kind == "vn"], corner_line))
+        vt_missing = corners[:, 1] == 0
+        vn_missing = corners[:, 2] == 0
+
+        ## fan triangulation
+        ntri = np.maximum(counts - 2, 0)
+        tri_face = np.repeat(np.arange(len(faces)), ntri)
+        first_tri = np.cumsum(ntri) - ntri
+        k = np.arange(ntri.sum()) - first_tri[tri_face]
+        start = (np.cumsum(counts) - counts)[tri_face]
+        fan = np.stack([np.where(k == 0, 0, k + 1), np.where(k == 0, 1, k + 2), np.where(k == 0, 2, 0)], axis=1)
+        corner = (start[:, None] + fan).reshape(-1)
+
+        ## gather vertex arrays
+        self.vertices = positions.astype(np.float32)[v_idx[corner]]
+
+        normals = np.empty((len(corner), 3), dtype=np.float32)
+        missing = vn_missing[corner]
+        normals[~missing] = vn[vn_idx[corner][~missing]]
+        normals[missing] = self.normalize(self.vertices[missing])
+        self.normals = normals
+
+        if len(corner) > 0 and not vt_missing[corner].any():
+            self.texcoords = vt[vt_idx[corner]]
+        elif len(corner) > 0 and not vt_missing[corner].all():
+            texcoords = np.zeros((len(corner), 2), dtype=np.float32)
+            has_vt = ~vt_missing[corner]
+            texcoords[has_vt] = vt[vt_idx[corner][has_vt]]
+            self.texcoords = texcoords
+        else:
+            self.texcoords = None
+
+        material = np.searchsorted(line_number[is_mtl], face_line)
+        triangle_material = material[tri_face]
+        ## one draw range per material, unless the shaders' table cannot hold them all
+        if self._materials and len(set(mtl_names)) < Shaders.MaxMaterials:
+            self.groupMaterials(triangle_material, mtl_names, library)
+        else:
+            self.colors = kd[np.repeat(triangle_material, 3)]
+
+        ## share identical corners through an index buffer
+        if self._weld:
+            self.vertices, self.normals, self.texcoords, self.colors, self.indices = weld(
+                self.vertices, self.normals, self.texcoords, self.colors)
+
+            ## order triangles for the vertex cache and vertices for fetching
+            if self._optimize:
+                self.vertices, self.normals, self.texcoords, self.colors, self.indices = optimize(
+                    self.indices, self.vertices, self.normals, self.texcoords, self.colors,
+                    ranges=self.ranges(self.materialCounts, 0))
+
+            ## simplified index buffers over the same vertices, coarser and coarser
+            if self._lods:
+                levels = simplify(self.indices, self.vertices, self.normals, self.texcoords, self.colors,
+                    ratios=self._lods, sources=True)
+                buffers = []
+                counts = [] if self.materialCounts is None else [self.materialCounts[0]]
+                for indices, sources in levels:
+                    if self.materialCounts is not None:
+                        indices, level_counts = self.sortByMaterial(indices, self._triangleMaterial[sources])
+                        counts.append(level_counts)
+                    if self._optimize:
+                        indices = optimizeRanges(indices, self.ranges(counts, -1), len(self.vertices))
+                    buffers.append(indices)
+                self.lodIndices = np.concatenate(buffers).astype(self.indices.dtype)
+                self.lodCounts = np.array([len(each) for each in buffers], dtype=np.int64)
+                if self.materialCounts is not None:
+                    self.materialCounts = np.array(counts, dtype=np.int64)
+
+        ## identifies meshes whose GPU buffers can be shared
+        self.contentHash = MeshRegistry.contentKey(
+            self.vertices, self.normals, self.texcoords, self.colors, self.indices, self.lodIndices,
+            self.materialTable, self.materialCounts)
+
+        return self
+
+
+    def groupMaterials(self, triangle_material, mtl_names, library):
+        """Sorts the triangle corners by material and builds the material table"""
+        names = sorted(set(mtl_names), key=mtl_names.index)
+        statement = np.array([0] + [names.index(name) + 1 for name in mtl_names], dtype=np.int64)
+        used = np.unique(statement[triangle_material])
+        triangle_material = np.searchsorted(used, statement[triangle_material])
+
+        ## one std140 record per material: ambient, diffuse, specular and shininess
+        self.materialNames = []
+        table = np.zeros((len(used), 12), dtype=np.float32)
+        for i, each in enumerate(used.tolist()):
+            name = names[each - 1] if each > 0 else ""
+            properties = library.properties(name) if library is not None and each > 0 else {}
+            table[i, 0:3] = properties.get('Ka', [1.0, 1.0, 1.0])[:3]
+            table[i, 4:7] = library.diffuse(name)[:3] if library is not None and each > 0 else MtlLibrary.DefaultDiffuse
+            table[i, 8:11] = properties.get('Ks', [0.0, 0.0, 0.0])[:3]
+            table[i, 11] = properties.get('Ns', 12.0)
+            self.materialNames.append(name)
+        self.materialTable = table
+
+        ## contiguous corners per material
+        order = np.argsort(triangle_material, kind="stable")
+        corners = np.arange(len(triangle_material) * 3).reshape(-1, 3)[order].reshape(-1)
+        self.vertices = self.vertices[corners]
+        self.normals = self.normals[corners]
+        if self.texcoords is not None:
+            self.texcoords = self.texcoords[corners]
+        self._triangleMaterial = triangle_material[order]
+        self.materialCounts = np.array([3 * np.bincount(self._triangleMaterial, minlength=len(used))], dtype=np.int64)
+
+
+    def sortByMaterial(self, indices, triangle_material):
+        """Returns indices with triangles grouped by material, and the index count of every material"""
+        order = np.argsort(triangle_material, kind="stable")
+        indices = indices.reshape(-1, 3)[order].reshape(-1)
+        return indices, 3 * np.bincount(triangle_material, minlength=len(self.materialTable))
+
+
+    @staticmethod
+    def ranges(counts, level):
+        """Returns the (first index, count) ranges of the materials of a level"""
+        if counts is None:
+            return None
+        counts = np.asarray(counts[level], dtype=np.int64)
+        return list(zip((np.cumsum(counts) - counts).tolist(), counts.tolist()))
+
+
+    def expanded(self):
+        """Returns the (vertices, normals, texcoords, colors) arrays with one entry per triangle corner"""
+        if self.indices is None:
+            return self.vertices, self.normals, self.texcoords, self.colors
+        return tuple(None if each is None else each[self.indices] for each in
+            (self.vertices, self.normals, self.texcoords, self.colors))
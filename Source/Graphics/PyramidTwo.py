@@ -1,6 +1,7 @@
 import numpy as np
 from OpenGL import GL
 from Source.Graphics.Actor import Actor
+from Source.Graphics.GLState import GLState
 
 class Pyramid(Actor):
 	def __init__(self, renderer, **kwargs):
@@ -47,11 +48,7 @@ class Pyramid(Actor):
 	def render(self):
 		GL.glDrawArrays(self._render_mode, 0, len(self.vertices_))
 
-		self._normal_visualizing_shader.bind()
-		self._normal_visualizing_shader.setUniformValue("modelMatrix", self._transform)
-		self._normal_visualizing_shader.setUniformValue("viewMatrix", self._scene.camera.viewMatrix)
-		self._normal_visualizing_shader.setUniformValue("projectionMatrix", self._scene.camera.projectionMatrix)
-		self._normal_visualizing_shader.setUniformValue("normalMatrix", self._transform.normalMatrix())
-		
+		## camera and transform come from the FrameData and ObjectData blocks bound for this actor
+		GLState().useProgram(self._normal_visualizing_shader)
+
 		GL.glDrawArrays(self._render_mode, 0, len(self.vertices_))
-		self._normal_visualizing_shader.release()
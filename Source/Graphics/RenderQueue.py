@@ -0,0 +1,110 @@
+from operator import itemgetter
+
+from Source.Graphics.Actor import Actor
+
+##  Draw packets of a scene frame, sorted by a 64-bit state key.
+##
+##  Scene.render adds one packet per actor and pass, then draws them in key
+##  order so that actors sharing a shader program, texture and material are
+##  drawn one after the other and GLState skips their repeated binds. From
+##  the most significant bits down a key holds:
+##
+##      layer     8 bits, overlay actors draw without depth testing, so
+##                each gets a layer of its own to keep its place
+##      bucket    2 bits, opaque, edges of the second pass, transparent
+##      program  14 bits, texture 12 bits, material 12 bits
+##      depth    16 bits, front to back
+##
+##  Transparent packets are blended in the order they are drawn, so their
+##  depth, back to front, moves above the state fields. State fields are
+##  ranks in order of first use in the frame, not GL names.
+class RenderQueue:
+
+    class Bucket:
+        Opaque = 0
+        Edges = 1
+        Transparent = 2
+
+    LayerShift = 56
+    BucketShift = 54
+    StateShift = 16
+    DepthBits = 16
+    DepthMax = (1 << DepthBits) - 1
+    RankMax = (1 << 12) - 1
+
+    ## initialization
+    def __init__(self):
+        """Initialize empty queue"""
+        self._enabled = True
+        self._packets = []
+        self._ranks = ({}, {}, {})
+        self._layer = 0
+
+
+    def isEnabled(self):
+        """Returns whether packets are sorted, otherwise they are drawn in the order they were added"""
+        return self._enabled
+
+
+    def setEnabled(self, value):
+        """Turns sorting on or off"""
+        self._enabled = value
+
+
+    def clear(self):
+        """Removes all packets, starting a new frame"""
+        self._packets = []
+        for ranks in self._ranks:
+            ranks.clear()
+        self._layer = 0
+
+
+    def __len__(self):
+        return len(self._packets)
+
+
+    def rank(self, field, value):
+        """Returns the rank of value among the values of field used in this frame, 0 for None"""
+        if value is None:
+            return 0
+        ranks = self._ranks[field]
+        rank = ranks.get(id(value))
+        if rank is None:
+            rank = ranks[id(value)] = min(len(ranks) + 1, RenderQueue.RankMax)
+        return rank
+
+
+    def key(self, actor, shader, material, passNumber, depth):
+        """Returns the sort key of a packet, depth in [0, 1] from near to far"""
+        depth = int(min(max(depth, 0.0), 1.0) * RenderQueue.DepthMax)
+        state = (min(self.rank(0, shader), 0x3fff) << 24) | (self.rank(1, actor.texture()) << 12) | self.rank(2, material)
+        layer = min(self._layer, 0xff) << RenderQueue.LayerShift
+        if actor.renderType == Actor.RenderType.Transparent:
+            return (layer | (RenderQueue.Bucket.Transparent << RenderQueue.BucketShift)
+                | ((RenderQueue.DepthMax - depth) << 38) | state)
+        bucket = RenderQueue.Bucket.Edges if passNumber == 1 else RenderQueue.Bucket.Opaque
+        return layer | (bucket << RenderQueue.BucketShift) | (state << RenderQueue.StateShift) | depth
+
+
+    def add(self, actor, draw_style, passNumber, offset, lighting, shading, depth):
+        """Adds a packet drawing actor in a pass, with the polygon offset of the first pass if offset is true"""
+        overlay = actor.renderType == Actor.RenderType.Overlay
+        if overlay:
+            self._layer += 1
+        if self._enabled:
+            shader, material = actor.renderState(draw_style, lighting, shading, passNumber)
+            key = self.key(actor, shader, material, passNumber, depth)
+        else:
+            key = len(self._packets)
+        self._packets.append((key, actor, draw_style, passNumber, offset))
+
+        ## actors added after an overlay are drawn over it, as in submission order
+        if overlay:
+            self._layer += 1
+
+
+    def packets(self):
+        """Returns the (key, actor, draw style, pass, offset) packets in drawing order"""
+        if self._enabled:
+            self._packets.sort(key=itemgetter(0))
+        return self._packets
@@ -16,6 +16,9 @@ from Source.Graphics.Group import Group
 from Source.Graphics.Gnomon import Gnomon
 from Source.Graphics.World import World
 from Source.Graphics.Shaders import Shaders
+from Source.Graphics.ResourceManager import ResourceManager
+from Source.Graphics.UniformCache import UniformCache
+from Source.Graphics.GLState import GLState
 
 # import actors
 from Source.Graphics.Cone import Cone
@@ -27,6 +30,7 @@ from Source.Graphics.Sphere import Sphere
 from Source.Graphics.SphereTessellation import SphereTessellation
 from Source.Graphics.Obj import Obj
 from Source.Graphics.Gizmos import Gizmos
+from Source.Graphics.ModelLoader import ModelLoader
 import Source.Graphics.PyramidOne as PyramidOne
 import Source.Graphics.PyramidTwo as PyramidTwo
 
@@ -39,6 +43,12 @@ from enum import IntEnum
 
 class Renderer(QOpenGLWidget):
 
+    ## a model could not be loaded: file name, reason
+    actorLoadFailed = pyqtSignal(str, str)
+
+    ## gizmo of each transform mode
+    GizmoTypes = {"s": GizmosScale, "t": GizmosTranslate, "r": GizmosRotate}
+
     class ActorType(IntEnum):
         OBJ1 = 0,
         OBJ2 = 1,
@@ -54,7 +64,26 @@ class Renderer(QOpenGLWidget):
         OBJ12 = 11,
         OBJ13 = 12,
         OBJ14 = 13
-        
+
+
+    ## model file of each actor type
+    ActorFiles = {
+        ActorType.OBJ1: "obj-models/buildings/1.obj",
+        ActorType.OBJ2: "obj-models/buildings/2.obj",
+        ActorType.OBJ3: "obj-models/buildings/3.obj",
+        ActorType.OBJ4: "obj-models/buildings/4.obj",
+        ActorType.OBJ5: "obj-models/buildings/5.obj",
+        ActorType.OBJ6: "obj-models/buildings/6.obj",
+        ActorType.OBJ7: "obj-models/buildings/7.obj",
+        ActorType.OBJ8: "obj-models/buildings/8.obj",
+        ActorType.OBJ9: "obj-models/buildings/9.obj",
+        ActorType.OBJ10: "obj-models/buildings/10.obj",
+        ActorType.OBJ11: "obj-models/buildings/11.obj",
+        ActorType.OBJ12: "obj-models/buildings/12.obj",
+        ActorType.OBJ13: "obj-models/buildings/13.obj",
+        ActorType.OBJ14: "obj-models/low-poly-mill/low-poly-mill.obj"
+    }
+
 
     ## initialization
     def __init__(self, parent=None, **kwargs):
@@ -92,10 +121,19 @@ class Renderer(QOpenGLWidget):
         self.setAutoFillBackground(False)
 
         self.currentActor_ = None
+        self._loadedActor = None
 
         self._transform = None
         self._eixo = None
         self._gizmos = None
+        self._gizmoPool = {}
+
+        ## models are parsed off the GUI thread, only uploaded here
+        self._loader = ModelLoader(self)
+        self._loader.loaded.connect(self.actorLoaded)
+        self._loader.failed.connect(self.actorFailed)
+        self._loadingTicket = None
+        self._placeholder = None
 
 
     def printOpenGLInformation(self, format, verbosity=0):
@@ -121,6 +159,10 @@ class Renderer(QOpenGLWidget):
 
     def initializeGL(self):
         """Apply OpenGL version profile and initialize OpenGL functions.""" 	
+        ## uniform values of the programs and the GL state are reset with the context
+        UniformCache().invalidate()
+        GLState().invalidate()
+
         if not self._initialized:
             self.printOpenGLInformation(self.context().format())
         
@@ -132,24 +174,25 @@ class Renderer(QOpenGLWidget):
             self._gnomon.camera.setRotation(self._trackball.rotation().inverted())
 
   
-            GL.glEnable(GL.GL_DEPTH_TEST)
-            GL.glEnable(GL.GL_DEPTH_CLAMP)
-            #GL.glEnable(GL.GL_CULL_FACE)
-            GL.glEnable(GL.GL_MULTISAMPLE)
-            GL.glEnable(GL.GL_FRAMEBUFFER_SRGB)
+            state = GLState()
+            state.enable(GL.GL_DEPTH_TEST)
+            state.enable(GL.GL_DEPTH_CLAMP)
+            #state.enable(GL.GL_CULL_FACE)
+            state.enable(GL.GL_MULTISAMPLE)
+            state.enable(GL.GL_FRAMEBUFFER_SRGB)
             
             ## attempt at line antialising
             if self._antialiasing:
         
-                GL.glEnable(GL.GL_POLYGON_SMOOTH)
-                GL.glEnable(GL.GL_BLEND)
+                state.enable(GL.GL_POLYGON_SMOOTH)
+                state.enable(GL.GL_BLEND)
 
-                GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+                state.blendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
                 GL.glHint(GL.GL_LINE_SMOOTH_HINT, GL.GL_NICEST)
                 GL.glHint(GL.GL_POLYGON_SMOOTH_HINT, GL.GL_NICEST)
 
-                GL.glPointSize(5)
-                GL.glLineWidth(1)
+                state.pointSize(5)
+                state.lineWidth(1)
 
             ## clear color
             GL.glClearColor(0.75, 0.76, 0.76, 0.0)
@@ -177,13 +220,12 @@ class Renderer(QOpenGLWidget):
             ###
             ### Add an object to the scene
             ###
-            self.currentActor_ = Obj(self._world)
-            self._world.addActor(self.currentActor_)
             self._sub = 1
             self._radius = 1.0
             self._v = 10
             self._h = 10
             self._indexActor = 0
+            self.changeActor(self._indexActor)
             ###
 
 
@@ -198,17 +240,61 @@ class Renderer(QOpenGLWidget):
         ## initialize OpenGL timer
         self._query = GL.glGenQueries(1)
 
+        ## delete what is still queued and report leaks before the context goes away
+        self.context().aboutToBeDestroyed.connect(self.cleanupGL)
+
 
     def clear(self):
         """Clear scene"""
+        self.makeCurrent()
         self._world.clear()
+        self.doneCurrent()
+        self._gizmos = None
+        self._gizmoPool = {}
         self.update()
 
 
+    def cleanupGL(self):
+        """Deletes the GPU objects released since the last frame and reports those leaked"""
+        self.makeCurrent()
+        for scene in [self._world, self._gnomon]:
+            scene.frameUniforms().destroy()
+        ResourceManager().collect()
+        self.doneCurrent()
+        report = ResourceManager().report()
+        if report:
+            print(report)
+
+
     def renderTimeEstimates(self):
         return [self._frameElapsed, self._gpuElapsed]
 
 
+    def gpuBytesAllocated(self):
+        """Returns the bytes of GPU memory held by vertex arrays, buffers and textures"""
+        return ResourceManager().bytesAllocated()
+
+
+    def uniformStatistics(self):
+        """Returns the uniforms requested and uploaded in the last frame, see UniformCache"""
+        return UniformCache().statistics()
+
+
+    def stateStatistics(self):
+        """Returns the GL state changes issued and skipped in the last frame, see GLState"""
+        return GLState().statistics()
+
+
+    def resourceStatistics(self):
+        """Returns the statistics of the ResourceManager"""
+        return ResourceManager().statistics()
+
+
+    def cullingStatistics(self):
+        """Returns the actors culled and drawn in the last frame of the main scene, see FrustumCuller"""
+        return self._world.cullingStatistics()
+
+
     @property
     def lighting(self):
         return self._lighting
@@ -255,6 +341,11 @@ class Renderer(QOpenGLWidget):
     def paintGL(self):
         """Draw scene"""
 
+        ## delete the GPU objects of actors removed since the last frame
+        ResourceManager().collect()
+        UniformCache().beginFrame()
+        GLState().beginFrame()
+
         ## record render time statistics
         if self._statistics:
 
@@ -308,9 +399,7 @@ class Renderer(QOpenGLWidget):
             self._world.highlightActor(None)
             self._transform = None
             self._eixo = None
-            if self._gizmos is not None:
-                self._world.removeActor(self._gizmos)
-                self._gizmos = None
+            self.hideGizmos()
         
         new_actor = self._world.selectedActor()
         if new_actor is not None:
@@ -344,34 +433,37 @@ class Renderer(QOpenGLWidget):
         self._world.highlightActor(None)
         self._transform = None
         self._eixo = None
+        self.makeCurrent()
         self._world.removeActor(new_actor)
+        self.hideGizmos()
+
+    def hideGizmos(self):
+        """Hides the active gizmo, it stays in the pool for the next interaction"""
         if self._gizmos is not None:
-            self._world.removeActor(self._gizmos)
+            self._gizmos.setVisible(False)
             self._gizmos = None
 
     def gizmosUpdate(self, new_actor):
-        if self._gizmos is not None:
-            self._world.removeActor(self._gizmos)
-            self._gizmos = None 
+        """Places the gizmo of the current transform mode on new_actor"""
+        mode = self._transform.lower() if self._transform is not None else None
+        gizmos = self._gizmoPool.get(mode)
+        if gizmos is not self._gizmos:
+            self.hideGizmos()
+        if mode not in Renderer.GizmoTypes:
+            return
+
+        ## each mode's gizmo is created once and then only moved
+        if gizmos is None:
+            self.makeCurrent()
+            gizmos = self._gizmoPool[mode] = Renderer.GizmoTypes[mode](self._world)
+            self._world.addActor(gizmos)
+
         size = new_actor.size()/2 +  QVector3D(1.0,1.0,1.0)
-        center = new_actor.center()
-        transf = new_actor.transform()
-        eixo = self._eixo
-        if self._transform in ("R", "r"):
-            eixo = None
-            
+        eixo = None if mode == "r" else self._eixo
+        gizmos.place(new_actor.transform(), new_actor.center(), size, eixo)
+        gizmos.setVisible(True)
+        self._gizmos = gizmos
 
-        self.makeCurrent()
-        if self._transform in ("s", "S"):
-            self._gizmos = GizmosScale(self._world, transform=transf, center=center, size=size, eixo=eixo)
-            self._world.addActor(self._gizmos)
-        elif self._transform in ("t", "T"):
-            self._gizmos = GizmosTranslate(self._world, transform=transf, center=center, size=size, eixo= eixo)
-            self._world.addActor(self._gizmos)
-        elif self._transform in ("r", "R"):
-            self._gizmos = GizmosRotate(self._world, transform=transf, center=center, size=size, eixo= eixo)
-            self._world.addActor(self._gizmos)
-        
 
 
     def mousePressEvent(self, event):
@@ -387,10 +479,7 @@ class Renderer(QOpenGLWidget):
                 self._world.highlightActor(new_actor)    
                 self._transform = None
                 self._eixo = None 
-                if self._gizmos is not None:
-                    self.makeCurrent()
-                    self._world.removeActor(self._gizmos)
-                    self._gizmos = None                         
+                self.hideGizmos()
 
 
         if event.buttons()== Qt.LeftButton and QApplication.keyboardModifiers() == Qt.ShiftModifier:
@@ -655,6 +744,8 @@ class Renderer(QOpenGLWidget):
 
     def setSubvisionLevel(self, val):
         self._sub = val
+        if self.currentActor_ is None:
+            return
         self.makeCurrent()
         self.currentActor_.setSubdivisionLevel(val)
         self.update()
@@ -672,39 +763,58 @@ class Renderer(QOpenGLWidget):
         self.changeActor(self._indexActor)
 
     def changeActor(self, index):
+        """Starts loading the model of the given actor type in the background"""
         self._indexActor = index
         self.makeCurrent()
-        
-        if index == Renderer.ActorType.OBJ1:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/1.obj")
-        elif index == Renderer.ActorType.OBJ2:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/2.obj")
-        elif index == Renderer.ActorType.OBJ3:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/3.obj")
-        elif index == Renderer.ActorType.OBJ4:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/4.obj")
-        elif index == Renderer.ActorType.OBJ5:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/5.obj")
-        elif index == Renderer.ActorType.OBJ6:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/6.obj")
-        elif index == Renderer.ActorType.OBJ7:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/7.obj")
-        elif index == Renderer.ActorType.OBJ8:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/8.obj")
-        elif index == Renderer.ActorType.OBJ9:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/9.obj")
-        elif index == Renderer.ActorType.OBJ10:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/10.obj")
-        elif index == Renderer.ActorType.OBJ11:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/11.obj")
-        elif index == Renderer.ActorType.OBJ12:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/12.obj")
-        elif index == Renderer.ActorType.OBJ13:
-            self.currentActor_ = Obj(self._world, filename="obj-models/buildings/13.obj")
-        elif index == Renderer.ActorType.OBJ14:
-            self.currentActor_ = Obj(self._world, filename="obj-models/low-poly-mill/low-poly-mill.obj")
+
+        ## drop the model still being loaded, if any
+        if self._loadingTicket is not None:
+            self._loader.cancel(self._loadingTicket)
+        self.removePlaceholder()
+
+        ## show a placeholder until the model is ready
+        self._placeholder = Icosahedron(self._world, name="placeholder", level=1, radius=0.25,
+            material=Material(diffuse=QVector3D(0.6, 0.6, 0.6)))
+        self._placeholder.setPickable(False)
+        self._world.addActor(self._placeholder)
+        self.currentActor_ = self._placeholder
+
+        self._loadingTicket = self._loader.load(Renderer.ActorFiles[index])
+        self.update()
 
 
+    def removePlaceholder(self):
+        """Removes the loading placeholder from the scene"""
+        if self._placeholder is not None:
+            self._world.removeActor(self._placeholder)
+            self._placeholder = None
+
+
+    def actorLoaded(self, ticket, filename, mesh):
+        """Uploads a model parsed by the loader and adds it to the world"""
+        if ticket != self._loadingTicket or not self._loader.finish(ticket):
+            return
+        self._loadingTicket = None
+
+        self.makeCurrent()
+        self.removePlaceholder()
+        self.currentActor_ = Obj(self._world, filename=filename, mesh=mesh)
+        self._loadedActor = self.currentActor_
         self._world.addActor(self.currentActor_)
-        
+        self.doneCurrent()
+        self.update()
+
+
+    def actorFailed(self, ticket, filename, message):
+        """Reports a model that could not be loaded, the last loaded model stays current"""
+        if ticket != self._loadingTicket or not self._loader.finish(ticket):
+            return
+        self._loadingTicket = None
+
+        self.makeCurrent()
+        self.removePlaceholder()
+        self.currentActor_ = self._loadedActor
+        self.doneCurrent()
+        self.update()
+        self.actorLoadFailed.emit(filename, message)
 
@@ -0,0 +1,175 @@
+import threading
+import weakref
+
+from PyQt5.QtGui import QOpenGLContext
+
+##  Lifecycle of the GPU objects created by the application.
+##
+##  Every vertex array object, buffer and texture is tracked with the object
+##  owning it and the bytes of GPU memory it holds. GL objects may only be
+##  deleted with their context current, on the thread rendering with it, while
+##  actors are dropped from event handlers at any time. release() therefore
+##  only queues an object; collect() deletes the queue and is called by the
+##  renderer at the start of every frame. An object still tracked after its
+##  owner was garbage collected can no longer be released by anyone, it is
+##  reported as a leak.
+class ResourceManager:
+
+    __instance = None
+
+    class Kind:
+        VertexArray = 0
+        Buffer = 1
+        Texture = 2
+        Kinds = [VertexArray, Buffer, Texture]
+        Names = {VertexArray: "vertex array", Buffer: "buffer", Texture: "texture"}
+
+
+    def __new__(cls):
+        if ResourceManager.__instance is None:
+            ResourceManager.__instance = object.__new__(cls)
+            ResourceManager.__instance.initialize()
+        return ResourceManager.__instance
+
+
+    def initialize(self):
+        """Create empty manager"""
+        self._resources = {}
+        self._pending = []
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._created = 0
+        self._deleted = 0
+
+
+    @staticmethod
+    def describe(owner):
+        """Returns a printable description of an owner"""
+        name = getattr(owner, "name", None)
+        if name is None or callable(name):
+            return type(owner).__name__
+        return "{} '{}'".format(type(owner).__name__, name)
+
+
+    @staticmethod
+    def textureSize(texture):
+        """Returns an estimate of the bytes held by a QOpenGLTexture, four bytes per texel plus its mipmaps"""
+        texels = texture.width() * max(texture.height(), 1) * max(texture.depth(), 1) * max(texture.layers(), 1)
+        if texture.mipLevels() > 1:
+            texels = texels * 4 // 3
+        return texels * 4
+
+
+    def track(self, resource, owner, kind, size=0):
+        """Records a created GL object of owner holding size bytes, updating it if already tracked"""
+        with self._lock:
+            entry = self._resources.get(id(resource))
+            if entry is None:
+                entry = self._resources[id(resource)] = {"resource": resource, "kind": kind, "size": 0}
+                self._created += 1
+            entry["owner"] = weakref.ref(owner)
+            entry["description"] = self.describe(owner)
+            self._bytes += size - entry["size"]
+            entry["size"] = size
+        return resource
+
+
+    def resize(self, resource, size):
+        """Updates the bytes held by a tracked object after reallocation"""
+        with self._lock:
+            entry = self._resources.get(id(resource))
+            if entry is not None:
+                self._bytes += size - entry["size"]
+                entry["size"] = size
+
+
+    def adopt(self, resource, owner):
+        """Hands a tracked object over to a new owner"""
+        with self._lock:
+            entry = self._resources.get(id(resource))
+            if entry is not None:
+                entry["owner"] = weakref.ref(owner)
+                entry["description"] = self.describe(owner)
+
+
+    def isTracked(self, resource):
+        """Returns true if the object is tracked and not yet released"""
+        return id(resource) in self._resources
+
+
+    def owner(self, resource):
+        """Returns the owner of a tracked object, None if unknown or collected"""
+        entry = self._resources.get(id(resource))
+        return entry["owner"]() if entry is not None else None
+
+
+    def release(self, resource):
+        """Queues an object with a destroy() method for deletion by collect(), safe from any thread"""
+        if resource is None:
+            return
+        with self._lock:
+            if any(each is resource for each in self._pending):
+                return
+            self._pending.append(resource)
+
+
+    def collect(self):
+        """Destroys the queued objects in release order, needs a current context; returns the number destroyed"""
+        if QOpenGLContext.currentContext() is None:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for resource in pending:
+            resource.destroy()
+            with self._lock:
+                entry = self._resources.pop(id(resource), None)
+                if entry is not None:
+                    self._bytes -= entry["size"]
+                    self._deleted += 1
+        return len(pending)
+
+
+    def bytesAllocated(self):
+        """Returns the bytes of GPU memory held by the tracked objects, including those waiting for deletion"""
+        return self._bytes
+
+
+    def numberOfResources(self):
+        """Returns the number of tracked objects"""
+        return len(self._resources)
+
+
+    def numberOfPending(self):
+        """Returns the number of objects waiting for collect()"""
+        return len(self._pending)
+
+
+    def leaks(self):
+        """Returns (description, kind, size) of the tracked objects whose owner is gone without releasing them"""
+        with self._lock:
+            pending = set(id(each) for each in self._pending)
+            return [(entry["description"], entry["kind"], entry["size"]) for key, entry in self._resources.items()
+                if entry["owner"]() is None and key not in pending]
+
+
+    def report(self):
+        """Returns a printable list of the leaked objects, empty if there is none"""
+        leaks = self.leaks()
+        if len(leaks) == 0:
+            return ""
+        lines = ["{} GPU objects leaked, {} bytes:".format(len(leaks), sum(size for description, kind, size in leaks))]
+        for description, kind, size in sorted(leaks):
+            lines.append("    {} of {}, {} bytes".format(ResourceManager.Kind.Names[kind], description, size))
+        return "\n".join(lines)
+
+
+    def statistics(self):
+        """Returns a dictionary with the tracked, pending, created and deleted objects, bytes and leaks"""
+        with self._lock:
+            kinds = {ResourceManager.Kind.Names[kind]: 0 for kind in ResourceManager.Kind.Kinds}
+            for entry in self._resources.values():
+                kinds[ResourceManager.Kind.Names[entry["kind"]]] += 1
+            statistics = {"resources": len(self._resources), "pending": len(self._pending),
+                "created": self._created, "deleted": self._deleted, "bytes": self._bytes, "kinds": kinds}
+        statistics["leaks"] = len(self.leaks())
+        return statistics
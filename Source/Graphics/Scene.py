@@ -12,6 +12,13 @@ from Source.Graphics.Actor import Actor
 from Source.Graphics.Group import Group
 from Source.Graphics.Floor import Floor
 from Source.Graphics.Background import Background
+from Source.Graphics.FrameUniforms import FrameUniforms
+from Source.Graphics.GLState import GLState
+from Source.Graphics.RenderQueue import RenderQueue
+from Source.Graphics.StaticBatcher import StaticBatcher
+from Source.Graphics.InstancedActor import InstancedActor
+from Source.Graphics.FrustumCuller import FrustumCuller
+from Source.Graphics.BoundingVolumeHierarchy import BoundingVolumeHierarchy
 
 ##  Base scene class
 class Scene(QObject):
@@ -46,6 +53,13 @@ class Scene(QObject):
         self._light = kwargs.get("light", None) 
         self._lighting = kwargs.get("lighting", True) 
         self._shading = kwargs.get("shading", Scene.Shading.Smooth)
+        self._frameUniforms = FrameUniforms(self)
+        self._queue = RenderQueue()
+        self._batcher = StaticBatcher(self, enabled=kwargs.get("batching", True))
+        self._culler = FrustumCuller(enabled=kwargs.get("culling", True))
+        self._pickTree = BoundingVolumeHierarchy()
+        self._pickGroups = {}
+        self._pickTreeValid = False
 
 
     @property
@@ -66,7 +80,12 @@ class Scene(QObject):
 
     def clear(self):
         """Clear actors from scene"""
+        for each in self._actors.values():
+            if isinstance(each, (Actor, Group)):
+                each.destroy()
         self._actors.clear()
+        self._batcher.clear()
+        self.invalidatePicking()
 
 
     def actor(self, index):
@@ -99,6 +118,7 @@ class Scene(QObject):
     def addActor(self, actor, select=False):
         """Add actor to the list"""
         self._actors[actor.name] = actor
+        self.invalidatePicking()
         if select:
             self.selectActor(actor)
 
@@ -110,8 +130,18 @@ class Scene(QObject):
 
     def removeActor(self, actor):
         """Removes a specific actor from scene"""
+        if isinstance(actor, InstancedActor.Instance):
+            ## an instance leaves its instanced actor, which stays in the scene
+            if actor == self.selectedActor():
+                self.selectActor(None)
+            if actor == self.highlightedActor():
+                self.highlightActor(None)
+            if actor.actor() is not None:
+                actor.actor().removeInstance(actor)
+            return
         if actor.name is not None:
             actor = self._actors.pop(actor.name)
+            self.invalidatePicking()
             if actor == self.selectedActor():
                 if len(self._actors) > 0:
                     selectable_actors = [key for (key, actor) in self._actors.items() if actor.isSelectable()]
@@ -122,13 +152,19 @@ class Scene(QObject):
                         self.selectActor(None)
                 else:
                     self.selectActor(None)
+
+            ## GPU objects are deleted by the ResourceManager on the next frame
+            if isinstance(actor, (Actor, Group)):
+                actor.destroy()
             del actor
 
 
     def removeSystemActor(self, actor):
         """Removes a specific system actor from scene"""
         if actor.name is not None:
-            del self._systemActors[actor.name]
+            actor = self._systemActors.pop(actor.name)
+            if isinstance(actor, (Actor, Group)):
+                actor.destroy()
 
 
     def highlightedActor(self):
@@ -204,6 +240,48 @@ class Scene(QObject):
         self._shading = type
 
 
+    def frameUniforms(self):
+        """Returns the FrameData and ObjectData uniform blocks of this scene"""
+        return self._frameUniforms
+
+
+    def staticBatcher(self):
+        """Returns the static batching stage of this scene"""
+        return self._batcher
+
+
+    def frustumCuller(self):
+        """Returns the view frustum culling stage of this scene"""
+        return self._culler
+
+
+    def cullingStatistics(self):
+        """Returns the actors tested, culled and drawn in the last frame, see FrustumCuller"""
+        return self._culler.statistics()
+
+
+    def renderedSceneActors(self):
+        """Returns the static batches and the actors not drawn by a batch"""
+        return self._batcher.batches() + [each for each in self.actors() if not self._batcher.isBatched(each)]
+
+
+    def renderedActors(self):
+        """Returns the system actors, static batches and the actors not drawn by a batch, in drawing order"""
+        return self.systemActors() + self.renderedSceneActors()
+
+
+    def drawnActors(self, actors=None):
+        """Returns the visible actors and group parts drawn by render(), of actors if given"""
+        result = []
+        for each in self.renderedActors() if actors is None else actors:
+            if each.isVisible():
+                if isinstance(each, Group):
+                    result.extend(part for part in each.parts if part.isVisible())
+                else:
+                    result.append(each)
+        return result
+
+
     def initialize(self):
         pass
 
@@ -245,8 +323,8 @@ class Scene(QObject):
     def ray(self, point):
         ray_start = QVector4D(point); ray_start.setZ(-1.0); ray_start.setW(1.0)
         ray_end = QVector4D(point); ray_end.setZ(0.0); ray_end.setW(1.0)
-        inverseProjectionMatrix = self._camera.projectionMatrix.inverted()[0]
-        inverseViewMatrix = self._camera.viewMatrix.inverted()[0]
+        inverseProjectionMatrix = self._camera.inverseProjectionMatrix
+        inverseViewMatrix = self._camera.inverseViewMatrix
         ray_start_camera = inverseProjectionMatrix * ray_start; ray_start_camera /= ray_start_camera.w()
         ray_end_camera = inverseProjectionMatrix * ray_end; ray_end_camera /= ray_end_camera.w()
         ray_start_world = inverseViewMatrix * ray_start_camera; ray_start_world /= ray_start_world.w()
@@ -258,36 +336,67 @@ class Scene(QObject):
             direction=QVector3D(ray_direction[0], ray_direction[1], ray_direction[2]))
 
 
-    def pick(self, point):
-        """Finds closest intersection if it exists"""
-        result = (None, None)
-        distance = math.inf
+    def invalidatePicking(self):
+        """Rebuilds the picking hierarchy before the next pick, after actors or instances were added or removed"""
+        self._pickTreeValid = False
 
-        ## compute ray
-        ray = self.ray(point)
-        
-        ## inspect all actors
+
+    def actorMoved(self, actor):
+        """Refits the picking hierarchy to an actor, group part or instance whose transform changed"""
+        if isinstance(actor, InstancedActor):
+            self.invalidatePicking()
+        elif self._pickTreeValid:
+            self._pickTree.moved(actor)
+
+
+    def buildPicking(self):
+        """Builds the picking hierarchy over the actors, group parts and instances of the scene"""
+        items = []
+        self._pickGroups = {}
         for each in self.actors():
+            if isinstance(each, InstancedActor):
+                items.extend(each.instances())
+            elif isinstance(each, Group):
+                ## groups have no bounds of their own, their parts stand in for them
+                for index, part in enumerate(each.parts):
+                    self._pickGroups[id(part)] = (each, part if index > 0 else None)
+                    items.append(part)
+            else:
+                items.append(each)
+        self._pickTree.build(items)
+        self._pickTreeValid = True
 
-            ## inspect actor
-            if each.isPickable():
-                #print("inspecting actor: ", each.name)
-                hit = each.intersect(ray)
-                if hit[0]:
-                    if hit[1] < distance:
-                        result = (each, None); distance = hit[1]
 
-                ## inspect group
-                if isinstance(each, Group):
-                    #print("inspecting group: ", each.name)
-                    for part in each.parts[1:]:
-                        if part.isPickable():
-                            #print("   inspecting part: ", part)
-                            hit = part.intersect(ray)
-                            if hit[0] and hit[1] <= distance:
-                                result = (each, part); distance = hit[1]
-        
-        return result 
+    def isPickCandidate(self, item):
+        """Returns true if an item of the picking hierarchy can be picked now"""
+        group = self._pickGroups.get(id(item))
+        if group is not None:
+            return group[0].isPickable() and item.isPickable()
+        if isinstance(item, InstancedActor.Instance):
+            return item.isPickable() and item.isVisible() and item.actor().isVisible()
+        return item.isPickable()
+
+
+    def pickingStatistics(self):
+        """Returns the items and nodes of the picking hierarchy and the nodes visited by the last pick"""
+        return self._pickTree.statistics()
+
+
+    def pick(self, point):
+        """Finds closest intersection if it exists"""
+        if not self._pickTreeValid:
+            self.buildPicking()
+
+        ## closest hit along the ray through the picking hierarchy
+        item = self._pickTree.closest(self.ray(point), self.isPickCandidate)[0]
+        if item is None:
+            return (None, None)
+
+        ## parts are picked together with their group, the first part as the group itself
+        group = self._pickGroups.get(id(item))
+        if group is not None:
+            return group
+        return (item, None)
 
 
     def renderPart(self, part, draw_style, passNumber):
@@ -304,59 +413,65 @@ class Scene(QObject):
             part.endRendering()
 
 
-    def renderBackground(self, actor):
-        """Render scene background"""
-        self.renderPart(actor, Scene.DrawStyle.Solid, 0)
+    def depth(self, actor):
+        """Returns the distance from the camera to the center of actor, scaled to [0, 1] between the clip planes"""
+        center = self._camera.viewMatrix * (actor.transform() * actor.center())
+        near = self._camera.nearDistance
+        far = self._camera.farDistance
+        return (-center.z() - near) / (far - near)
 
 
-    def renderGridFloor(self, actor):
-        """Render scene grid floor"""
-        self.renderPart(actor, Scene.DrawStyle.Solid, 0)
+    def queuePart(self, part, draw_style, passNumber, offset):
+        """Adds a packet drawing a single actor to the render queue"""
+        if part.isVisible() and not self._culler.isCulled(part):
+            self._queue.add(part, draw_style, passNumber, offset, self.lighting, self.shading, self.depth(part))
 
 
-    def renderFirstPass(self, actor):
-        """Render first pass of the scene"""
+    def queueBackground(self, actor):
+        """Queue scene background"""
+        self.queuePart(actor, Scene.DrawStyle.Solid, 0, False)
 
-        if actor.isVisible():
-            GL.glEnable(GL.GL_POLYGON_OFFSET_FILL)
-            
-            if self._draw_style == Scene.DrawStyle.SolidWithEdges:
-                GL.glPolygonOffset(1, 4)
 
-            draw_style = Scene.DrawStyle.Solid if self._draw_style == Scene.DrawStyle.SolidWithEdges else self._draw_style
+    def queueGridFloor(self, actor):
+        """Queue scene grid floor"""
+        self.queuePart(actor, Scene.DrawStyle.Solid, 0, False)
 
-            if isinstance(actor, Group):
 
-                ## if this is group, render its parts individually
-                for each in actor.parts:
-                    self.renderPart(each, draw_style, 0)
+    def queuePasses(self, actor):
+        """Queue the first pass, and the edges pass of the solid with edges style, of an actor or group"""
 
-            else:
-                
-                ## render this actor with current draw style
-                self.renderPart(actor, draw_style, 0)
+        if actor.isVisible():
+            parts = actor.parts if isinstance(actor, Group) else [actor]
+            draw_style = Scene.DrawStyle.Solid if self._draw_style == Scene.DrawStyle.SolidWithEdges else self._draw_style
+            for each in parts:
+                self.queuePart(each, draw_style, 0, True)
+            if self._draw_style == Scene.DrawStyle.SolidWithEdges:
+                for each in parts:
+                    self.queuePart(each, Scene.DrawStyle.Wireframe, 1, False)
 
 
-    def renderSecondPass(self, actor):
-        """Render second pass of the scene"""
-        
-        if actor.isVisible():
-            GL.glDisable(GL.GL_POLYGON_OFFSET_FILL)
+    def renderQueue(self):
+        """Draw the queued packets in key order"""
+        state = GLState()
+        edges = self._draw_style == Scene.DrawStyle.SolidWithEdges
+        for key, part, draw_style, passNumber, offset in self._queue.packets():
 
-            if self._draw_style == Scene.DrawStyle.SolidWithEdges:
-                
-                GL.glPolygonOffset(0, 0)
+            ## the first pass is pushed back so that the edges pass draws over it
+            state.setEnabled(GL.GL_POLYGON_OFFSET_FILL, offset)
+            if edges:
+                state.polygonOffset(*((1, 4) if offset else (0, 0)))
 
-                if isinstance(actor, Group):
+            self.renderPart(part, draw_style, passNumber)
 
-                    ## if this is group, render its parts individually
-                    for each in actor.parts:
-                        self.renderPart(each, Scene.DrawStyle.Wireframe, 1)
 
-                else:
-                    
-                    ## render this actor with current draw style
-                    self.renderPart(actor, Scene.DrawStyle.Wireframe, 1)
+    def renderQueueEnabled(self):
+        """Returns whether the packets of a frame are sorted by state"""
+        return self._queue.isEnabled()
+
+
+    def setRenderQueueEnabled(self, value):
+        """Turns sorting of the packets of a frame by state on or off"""
+        self._queue.setEnabled(value)
 
 
     def setViewportRegion(self):
@@ -372,24 +487,26 @@ class Scene(QObject):
         ## clear buffers
         GL.glClear(GL.GL_DEPTH_BUFFER_BIT)
 
-        for each in self.systemActors() + self.actors():
+        ## merge static actors, moved or removed members are updated in place
+        self._batcher.update()
 
-            if isinstance(each, Background):
-
-                ## render background
-                self.renderBackground(each)
-            
-            elif isinstance(each, Floor):
+        ## skip the scene actors outside the view frustum, system actors are always drawn
+        self._culler.cull(self._camera, self.drawnActors(self.renderedSceneActors()))
 
-                ## render grid floor
-                self.renderGridFloor(each)
+        ## upload camera, light and actor transforms once for the whole frame
+        self._frameUniforms.update([each for each in self.drawnActors() if not self._culler.isCulled(each)])
 
-            else:
-                ## render first pass of the scene
-                self.renderFirstPass(each)
+        ## queue every pass of every actor, then draw them sorted by state
+        self._queue.clear()
+        for each in self.renderedActors():
 
-                ## render second pass of the scene
-                self.renderSecondPass(each)
+            if isinstance(each, Background):
+                self.queueBackground(each)
 
+            elif isinstance(each, Floor):
+                self.queueGridFloor(each)
 
+            else:
+                self.queuePasses(each)
 
+        self.renderQueue()
@@ -1,11 +1,32 @@
 from PyQt5.QtCore import QObject
 from PyQt5.QtGui import QOpenGLShader, QOpenGLShaderProgram
 
+from OpenGL import GL
+
 ## singleton shader class 
 class Shaders(QObject):
 
 	__instance = None
 
+	## uniform block binding point and capacity of the material table
+	MaterialTableBinding = 0
+	MaxMaterials = 256
+
+	## uniform block binding points of the per-frame and per-actor blocks, see FrameUniforms
+	FrameDataBinding = 1
+	ObjectDataBinding = 2
+	UniformBlocks = {"MaterialTable": MaterialTableBinding, "FrameData": FrameDataBinding, "ObjectData": ObjectDataBinding}
+
+	## attribute locations of the per-instance model matrix, normal matrix and color, see InstancedActor
+	InstanceMatrixLocation = 4
+	InstanceNormalMatrixLocation = 8
+	InstanceColorLocation = 11
+
+	## uniform declarations replaced by members of the FrameData and ObjectData blocks
+	BlockUniforms = ["uniform mat4 viewMatrix;", "uniform mat4 projectionMatrix;", "uniform vec4 lightPosition;",
+		"uniform vec3 lightAttenuation;", "uniform Light light;", "uniform mat4 modelMatrix;", "uniform mat3 normalMatrix;",
+		"uniform vec3 positionScale = vec3(1.0);", "uniform vec3 positionOffset = vec3(0.0);", "uniform int normalEncoding = 0;"]
+
 	def __new__(cls):
 		if Shaders.__instance is None:
 			Shaders.__instance = QObject.__new__(cls)
@@ -18,118 +39,373 @@ class Shaders(QObject):
 
 		## create background shader program
 		self.__instance._backgroundShader = QOpenGLShaderProgram()
-		self.__instance._backgroundShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeColorNoTransformVertexShader())
-		self.__instance._backgroundShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._backgroundShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeColorNoTransformVertexShader()))
+		self.__instance._backgroundShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._backgroundShader.link()
 
 		## create uniform material shader with no lighting 
 		self.__instance._wireframeMaterialShader = QOpenGLShaderProgram()
-		self.__instance._wireframeMaterialShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.wireframeMaterialVertexShader())
-		self.__instance._wireframeMaterialShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._wireframeMaterialShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.wireframeMaterialVertexShader()))
+		self.__instance._wireframeMaterialShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._wireframeMaterialShader.link()
 
 		## create uniform material shader with no lighting 
 		self.__instance._uniformMaterialShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialVertexShader())
-		self.__instance._uniformMaterialShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._uniformMaterialShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialVertexShader()))
+		self.__instance._uniformMaterialShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._uniformMaterialShader.link()
 
 		## create uniform material with no lighting calculations
 		self.__instance._attributeColorShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeColorTransformVertexShader())
-		self.__instance._attributeColorShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._attributeColorShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeColorTransformVertexShader()))
+		self.__instance._attributeColorShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._attributeColorShader.link()
 
 		## create Phong mesh shader
 		self.__instance._uniformMaterialPhongShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialPhongShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialPhongVertexShader())
-		self.__instance._uniformMaterialPhongShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformMaterialPhongFragmentShader())
+		self.__instance._uniformMaterialPhongShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialPhongVertexShader()))
+		self.__instance._uniformMaterialPhongShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.uniformMaterialPhongFragmentShader()))
 		self.__instance._uniformMaterialPhongShader.link()
 
 		## create color-based Phong mesh shader
 		#AQUI1
 		self.__instance._attributeColorPhongShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorPhongShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeMaterialPhongVertexShader())
-		self.__instance._attributeColorPhongShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.attributeMaterialPhongFragmentShader())
+		self.__instance._attributeColorPhongShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeMaterialPhongVertexShader()))
+		self.__instance._attributeColorPhongShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.attributeMaterialPhongFragmentShader()))
 		self.__instance._attributeColorPhongShader.link()
 
 		## create Phong mesh shader
 		self.__instance._uniformMaterialPhongFlatShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialPhongVertexFlatShader())
-		self.__instance._uniformMaterialPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformMaterialPhongFragmentFlatShader())
+		self.__instance._uniformMaterialPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialPhongVertexFlatShader()))
+		self.__instance._uniformMaterialPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.uniformMaterialPhongFragmentFlatShader()))
 		self.__instance._uniformMaterialPhongFlatShader.link()
 
 		## create color-based Phong mesh shader
 		self.__instance._attributeColorPhongFlatShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeMaterialPhongVertexFlatShader())
-		self.__instance._attributeColorPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.attributeMaterialPhongFragmentFlatShader())
+		self.__instance._attributeColorPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeMaterialPhongVertexFlatShader()))
+		self.__instance._attributeColorPhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.attributeMaterialPhongFragmentFlatShader()))
 		self.__instance._attributeColorPhongFlatShader.link()
 
 		## create simple textured-based mesh shader
 		self.__instance._texturedShader = QOpenGLShaderProgram()
-		self.__instance._texturedShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.texturedVertexShader())
-		self.__instance._texturedShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.texturedFragmentShader())
+		self.__instance._texturedShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.texturedVertexShader()))
+		self.__instance._texturedShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.texturedFragmentShader()))
 		self.__instance._texturedShader.link()	
 
 		## create simple textured-based mesh flat shader
 		self.__instance._texturedFlatShader = QOpenGLShaderProgram()
-		self.__instance._texturedFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.texturedVertexFlatShader())
-		self.__instance._texturedFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.texturedFragmentFlatShader())
+		self.__instance._texturedFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.texturedVertexFlatShader()))
+		self.__instance._texturedFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.texturedFragmentFlatShader()))
 		self.__instance._texturedFlatShader.link()	
 
 		self.__instance._normalVisShader = QOpenGLShaderProgram()
-		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.normalVisVertexShader())
-		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Geometry, Shaders.normalVisGeometryShader())
-		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.normalVisFragmentShader())
+		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.normalVisVertexShader()))
+		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Geometry, Shaders.uniformBlocks(Shaders.normalVisGeometryShader()))
+		self.__instance._normalVisShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.normalVisFragmentShader()))
 		self.__instance._normalVisShader.link()
 
 		self.__instance._attributeColorPhongTessellationShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeColorTSLVertexShader())
-		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.attributeColorTCS())
-		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.attributeMaterialPhongTES())
-		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.attributeMaterialPhongFragmentShader())
+		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeColorTSLVertexShader()))
+		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.attributeColorTCS()))
+		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.attributeMaterialPhongTES()))
+		self.__instance._attributeColorPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.attributeMaterialPhongFragmentShader()))
 		self.__instance._attributeColorPhongTessellationShader.link()
 
 		## create color-based Phong mesh shader
 		self.__instance._attributeColorPhongFlatTessellationShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeColorTSLVertexShader())
-		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.attributeColorTCS())
-		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.attributeMaterialPhongFlatTES())
-		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.attributeMaterialPhongFragmentFlatShader())
+		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeColorTSLVertexShader()))
+		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.attributeColorTCS()))
+		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.attributeMaterialPhongFlatTES()))
+		self.__instance._attributeColorPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.attributeMaterialPhongFragmentFlatShader()))
 		self.__instance._attributeColorPhongFlatTessellationShader.link()
 
 		## create uniform material with no lighting calculations
 		self.__instance._attributeColorTessellationShader = QOpenGLShaderProgram()
-		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.attributeColorTSLVertexShader())
-		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.attributeColorTCS())
-		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.attributeColorTransformTES())
-		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.attributeColorTSLVertexShader()))
+		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.attributeColorTCS()))
+		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.attributeColorTransformTES()))
+		self.__instance._attributeColorTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._attributeColorTessellationShader.link()
 
 		## create uniform material shader with no lighting tessellation 
 		self.__instance._uniformMaterialPhongTessellationShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialTSLVertexShader())
-		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformMaterialTCS())
-		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformMaterialPhongTES())
-		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformMaterialPhongFragmentShader())
+		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialTSLVertexShader()))
+		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.uniformMaterialTCS()))
+		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.uniformMaterialPhongTES()))
+		self.__instance._uniformMaterialPhongTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.uniformMaterialPhongFragmentShader()))
 		self.__instance._uniformMaterialPhongTessellationShader.link()
 
 		## create Phong mesh shader
 		self.__instance._uniformMaterialPhongFlatTessellationShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialTSLVertexShader())
-		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformMaterialTCS())
-		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformMaterialPhongFlatTES())
-		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformMaterialPhongFragmentFlatShader())
+		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialTSLVertexShader()))
+		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.uniformMaterialTCS()))
+		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.uniformMaterialPhongFlatTES()))
+		self.__instance._uniformMaterialPhongFlatTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.uniformMaterialPhongFragmentFlatShader()))
 		self.__instance._uniformMaterialPhongFlatTessellationShader.link()
 
 		## create uniform material shader with no lighting 
 		self.__instance._uniformMaterialTessellationShader = QOpenGLShaderProgram()
-		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformMaterialTSLVertexShader())
-		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformMaterialTCS())
-		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformMaterialTES())
-		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.simpleFragmentShader())
+		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialTSLVertexShader()))
+		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationControl, Shaders.uniformBlocks(Shaders.uniformMaterialTCS()))
+		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.TessellationEvaluation, Shaders.uniformBlocks(Shaders.uniformMaterialTES()))
+		self.__instance._uniformMaterialTessellationShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
 		self.__instance._uniformMaterialTessellationShader.link()
 
+		## create material table shader with no lighting
+		self.__instance._materialTableShader = QOpenGLShaderProgram()
+		self.__instance._materialTableShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.materialTableVertexShader()))
+		self.__instance._materialTableShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.simpleFragmentShader()))
+		self.__instance._materialTableShader.link()
+
+		## create material table Phong mesh shader
+		self.__instance._materialTablePhongShader = QOpenGLShaderProgram()
+		self.__instance._materialTablePhongShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialPhongVertexShader()))
+		self.__instance._materialTablePhongShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.materialTablePhongFragmentShader()))
+		self.__instance._materialTablePhongShader.link()
+
+		## create material table Phong mesh shader, flat shaded
+		self.__instance._materialTablePhongFlatShader = QOpenGLShaderProgram()
+		self.__instance._materialTablePhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.uniformMaterialPhongVertexFlatShader()))
+		self.__instance._materialTablePhongFlatShader.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.materialTablePhongFragmentFlatShader()))
+		self.__instance._materialTablePhongFlatShader.link()
+
+		## instanced variants of the Phong, unlit and material table shaders, see InstancedActor
+		self.__instance._instancedShaders = {}
+		for shader, vertex, fragment in [
+			(self.__instance._uniformMaterialPhongShader, Shaders.uniformMaterialPhongVertexShader(), Shaders.uniformMaterialPhongFragmentShader()),
+			(self.__instance._attributeColorPhongShader, Shaders.attributeMaterialPhongVertexShader(), Shaders.attributeMaterialPhongFragmentShader()),
+			(self.__instance._uniformMaterialPhongFlatShader, Shaders.uniformMaterialPhongVertexFlatShader(), Shaders.uniformMaterialPhongFragmentFlatShader()),
+			(self.__instance._attributeColorPhongFlatShader, Shaders.attributeMaterialPhongVertexFlatShader(), Shaders.attributeMaterialPhongFragmentFlatShader()),
+			(self.__instance._uniformMaterialShader, Shaders.uniformMaterialVertexShader(), Shaders.simpleFragmentShader()),
+			(self.__instance._attributeColorShader, Shaders.attributeColorTransformVertexShader(), Shaders.simpleFragmentShader()),
+			(self.__instance._materialTableShader, Shaders.materialTableVertexShader(), Shaders.simpleFragmentShader()),
+			(self.__instance._materialTablePhongShader, Shaders.uniformMaterialPhongVertexShader(), Shaders.materialTablePhongFragmentShader()),
+			(self.__instance._materialTablePhongFlatShader, Shaders.uniformMaterialPhongVertexFlatShader(), Shaders.materialTablePhongFragmentFlatShader())]:
+			program = QOpenGLShaderProgram()
+			program.addShaderFromSourceCode(QOpenGLShader.Vertex, Shaders.uniformBlocks(Shaders.instancedVertexShader(vertex)))
+			program.addShaderFromSourceCode(QOpenGLShader.Fragment, Shaders.uniformBlocks(Shaders.instancedFragmentShader(fragment)))
+			program.link()
+			self.__instance._instancedShaders[id(shader)] = program
+
+		## connect the uniform blocks of every program to their binding points
+		for program in self.__instance.programs():
+			Shaders.bindUniformBlocks(program)
+
+
+	def programs(self):
+		"""Returns every shader program of the collection"""
+		return [value for value in vars(self).values() if isinstance(value, QOpenGLShaderProgram)] + list(self._instancedShaders.values())
+
+
+	def instancedShader(self, shader):
+		"""Returns the instanced variant of shader, None if it has none"""
+		return self._instancedShaders.get(id(shader))
+
+
+	@staticmethod
+	def bindUniformBlocks(program):
+		"""Connects the uniform blocks used by a linked program to their binding points"""
+		for name, binding in Shaders.UniformBlocks.items():
+			index = GL.glGetUniformBlockIndex(program.programId(), name)
+			if index != GL.GL_INVALID_INDEX:
+				GL.glUniformBlockBinding(program.programId(), index, binding)
+
+
+	@classmethod
+	def uniformBlockDeclarations(cls):
+		"""Camera and light state shared by all actors of a frame, and the transform of one actor, see FrameUniforms"""
+		return """
+		struct FrameLight {
+			vec3 ambient;
+			vec3 diffuse;
+			vec3 specular;
+		};
+
+		layout(std140) uniform FrameData {
+			mat4 viewMatrix;
+			mat4 projectionMatrix;
+			vec4 lightPosition;
+			vec3 lightAttenuation;
+			FrameLight light;
+		};
+
+		layout(std140) uniform ObjectData {
+			mat4 modelMatrix;
+			mat3 normalMatrix;
+			vec3 positionScale;
+			vec3 positionOffset;
+			int normalEncoding;
+		};
+		"""
+
+
+	@classmethod
+	def uniformBlocks(cls, source):
+		"""Returns source with its camera, light and transform uniforms replaced by the FrameData and ObjectData blocks"""
+		lines = source.split("\n")
+		kept = [line for line in lines if line.strip() not in cls.BlockUniforms]
+		if len(kept) == len(lines):
+			return source
+		version = next(i for i, line in enumerate(kept) if line.strip().startswith("#version"))
+		kept.insert(version + 1, cls.uniformBlockDeclarations())
+		return "\n".join(kept)
+
+
+	@classmethod
+	def instancedVertexShader(cls, source):
+		"""Returns vertex shader source placing each instance with the model and normal matrices of its instance record"""
+		declarations = """layout(location = 0) in vec3 position;
+		layout(location = """ + str(cls.InstanceMatrixLocation) + """) in mat4 instanceMatrix;
+		layout(location = """ + str(cls.InstanceNormalMatrixLocation) + """) in mat3 instanceNormalMatrix;
+		layout(location = """ + str(cls.InstanceColorLocation) + """) in vec4 instanceColor;
+
+		flat out vec4 instanceTint;
+		"""
+		source = source.replace("layout(location = 0) in vec3 position;", declarations)
+		source = source.replace("modelMatrix *", "modelMatrix * instanceMatrix *")
+		source = source.replace("normalMatrix *", "normalMatrix * instanceNormalMatrix *")
+		return source.replace("gl_Position =", "instanceTint = instanceColor;\n\t\t    gl_Position =")
+
+
+	@classmethod
+	def instancedFragmentShader(cls, source):
+		"""Returns fragment shader source tinting the diffuse color by the instance color, highlighted instances glow"""
+		declarations = """out vec4 fragColor;
+
+		flat in vec4 instanceTint;
+		uniform vec3 highlightEmission = vec3(0.25);
+		"""
+		source = source.replace("out vec4 fragColor;", declarations)
+		source = source.replace("vec3 diffuse = light.diffuse *", "vec3 diffuse = instanceTint.rgb * light.diffuse *")
+		source = source.replace("vec3 intensity = material.emission +", "vec3 intensity = mix(material.emission, highlightEmission, instanceTint.a) +")
+		return source.replace("fragColor = vertexColor;",
+			"fragColor = vec4(vertexColor.rgb * instanceTint.rgb + instanceTint.a * highlightEmission, vertexColor.a);")
+
+
+	@classmethod
+	def materialTableDeclarations(cls):
+		"""Per-mesh table of OBJ materials, see ObjParser.groupMaterials"""
+		return """
+		struct TableMaterial {
+			vec3 ambient;
+			vec3 diffuse;
+			vec3 specular;
+			float shininess;
+		};
+
+		layout(std140) uniform MaterialTable {
+			TableMaterial materials[""" + str(cls.MaxMaterials) + """];
+		};
+
+		uniform int materialIndex;
+		"""
+
+
+	@classmethod
+	def materialTableVertexShader(cls):
+		vertexShaderSource = """
+		#version 400
+		layout(location = 0) in vec3 position;
+		""" + cls.vertexFormatDeclarations() + cls.materialTableDeclarations() + """
+		uniform mat4 modelMatrix;
+		uniform mat4 viewMatrix;
+		uniform mat4 projectionMatrix;
+
+		smooth out vec4 vertexColor;
+
+		void main()
+		{
+		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexColor = vec4(materials[materialIndex].diffuse, 1.0);
+		}
+		"""
+		return vertexShaderSource
+
+
+	@classmethod
+	def materialTablePhongFragmentShader(cls):
+		fragmentShaderSource = """
+		#version 400
+		struct Material {
+			vec3 emission;
+			vec3 ambient;
+			vec3 diffuse;
+			vec3 specular;
+			float shininess;
+		};
+
+		struct Light {
+			vec3 ambient;
+			vec3 diffuse;
+			vec3 specular;
+		};
+		""" + cls.materialTableDeclarations() + """
+		smooth in vec4 vertexNormal;
+		smooth in vec4 vertexPosition;
+		smooth in vec3 lightDirection;
+		smooth in float attenuation;
+
+		uniform Material material;
+		uniform Light light;
+
+		out vec4 fragColor;
+
+		void main()
+		{
+			TableMaterial m = materials[materialIndex];
+
+			// ambient term
+			vec3 ambient = m.ambient * light.ambient;
+
+			// diffuse term
+			vec3 N = normalize(vertexNormal.xyz);
+			vec3 L = normalize(lightDirection);
+			vec3 diffuse = light.diffuse * m.diffuse * max(dot(N, L), 0.0);
+
+			// specular term
+			vec3 E = normalize(-vertexPosition.xyz);
+			vec3 R = normalize(-reflect(L, N));
+			vec3 specular = light.specular * m.specular * pow(max(dot(R, E), 0.0), m.shininess);
+
+			// final intensity, emission still comes from the actor's material
+			vec3 intensity = material.emission + clamp(ambient + attenuation * (diffuse + specular), 0.0, 1.0);
+			fragColor = vec4(intensity, 1.0);
+		}
+		"""
+		return fragmentShaderSource
+
+
+	@classmethod
+	def materialTablePhongFragmentFlatShader(cls):
+		return cls.materialTablePhongFragmentShader().replace("smooth in vec4 vertexNormal;", "flat in vec4 vertexNormal;")
+
+	@classmethod
+	def vertexFormatDeclarations(cls):
+		"""Dequantization of compact vertex formats, see VertexFormat"""
+		return """
+		uniform vec3 positionScale = vec3(1.0);
+		uniform vec3 positionOffset = vec3(0.0);
+		uniform int normalEncoding = 0;
+
+		vec3 decodePosition(vec3 p)
+		{
+		    return p * positionScale + positionOffset;
+		}
+
+		vec3 decodeNormal(vec4 n)
+		{
+		    if (normalEncoding == 1) {
+		        vec3 v = vec3(n.xy, 1.0 - abs(n.x) - abs(n.y));
+		        float t = max(-v.z, 0.0);
+		        v.x += v.x >= 0.0 ? -t : t;
+		        v.y += v.y >= 0.0 ? -t : t;
+		        return normalize(v);
+		    }
+		    return n.xyz;
+		}
+		"""
+
+
 	@classmethod
 	def attributeColorTSLVertexShader(cls):
 		vertexShaderSource = """
@@ -539,7 +815,8 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -554,8 +831,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -626,8 +903,9 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
 		layout(location = 2) in vec3 color;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -643,8 +921,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -717,7 +995,8 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -732,8 +1011,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -804,8 +1083,9 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
 		layout(location = 2) in vec3 color;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -821,8 +1101,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -921,6 +1201,7 @@ class Shaders(QObject):
 		}; 
 
 		layout(location = 0) in vec3 position;
+		""" + cls.vertexFormatDeclarations() + """
 		
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
@@ -931,7 +1212,7 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(position, 1.0);
+		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
 		    vertexColor = vec4(material.diffuse, 1.0);
 		}
 		"""
@@ -943,9 +1224,10 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
 		layout(location = 2) in vec3 color;
 		layout(location = 3) in vec2 texcoord;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -961,8 +1243,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -983,9 +1265,10 @@ class Shaders(QObject):
 		vertexShaderSource = """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
 		layout(location = 2) in vec3 color;
 		layout(location = 3) in vec2 texcoord;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -1001,8 +1284,8 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    vertexPosition = viewMatrix * modelMatrix * vec4(position, 1.0);
-		    vertexNormal = viewMatrix * vec4(normalMatrix * normal, 0.0);
+		    vertexPosition = viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+		    vertexNormal = viewMatrix * vec4(normalMatrix * decodeNormal(normal), 0.0);
 		    if (lightPosition.w == 0.0) {
 				lightDirection = normalize(lightPosition.xyz);
 				attenuation = 1.0;
@@ -1032,6 +1315,7 @@ class Shaders(QObject):
 		}; 
 
 		layout(location = 0) in vec3 position;
+		""" + cls.vertexFormatDeclarations() + """
 		
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
@@ -1042,7 +1326,7 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(position, 1.0);
+		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
 		    vertexColor = vec4(wireframe_material.diffuse, 1.0);
 		}
 		"""
@@ -1055,6 +1339,7 @@ class Shaders(QObject):
 		#version 400
 		layout(location = 0) in vec3 position;
 		layout(location = 2) in vec3 color;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -1062,7 +1347,7 @@ class Shaders(QObject):
 
 		void main()
 		{
-		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(position, 1.0);
+		    gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
 		    vertexColor = vec4(color, 1.0);
 		}
 		"""
@@ -1198,7 +1483,8 @@ class Shaders(QObject):
 		return """
 		#version 400
 		layout(location = 0) in vec3 position;
-		layout(location = 1) in vec3 normal;
+		layout(location = 1) in vec4 normal;
+		""" + cls.vertexFormatDeclarations() + """
 		uniform mat4 modelMatrix;
 		uniform mat4 viewMatrix;
 		uniform mat4 projectionMatrix;
@@ -1209,9 +1495,9 @@ class Shaders(QObject):
 
 		void main() 
 		{
-			gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(position, 1.0);
-			vertexPosition = position;
-			vertexNormal = normal;
+			gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(decodePosition(position), 1.0);
+			vertexPosition = decodePosition(position);
+			vertexNormal = decodeNormal(normal);
 		}
 		"""
 
@@ -1349,3 +1635,12 @@ class Shaders(QObject):
 	
 	def uniformMaterialTessellationShader(self):
 		return self.__instance._uniformMaterialTessellationShader
+
+	def materialTableShader(self):
+		return self.__instance._materialTableShader
+
+	def materialTablePhongShader(self):
+		return self.__instance._materialTablePhongShader
+
+	def materialTablePhongFlatShader(self):
+		return self.__instance._materialTablePhongFlatShader
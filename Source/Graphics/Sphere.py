@@ -2,6 +2,7 @@ import math
 import numpy as np
 from OpenGL import GL
 from Source.Graphics.Actor import Actor
+from Source.Graphics.VertexCacheOptimizer import optimize
 
 class Sphere(Actor):
 
@@ -14,6 +15,7 @@ class Sphere(Actor):
         self._v = kwargs.get("v", 10)
         self._h = kwargs.get("h", 10)
         self._rgb_colors = kwargs.get("colors", False)
+        self._optimize = kwargs.get("optimize", False)
 
         self._hStep = 2 * math.pi / self._h
         self._vStep = math.pi / self._v;
@@ -85,6 +87,13 @@ class Sphere(Actor):
         self._indices = np.array(indices, dtype=np.uint32)
         self._texcoords = np.array(texture, dtype=np.uint32)
 
+        ## order triangles for the vertex cache and vertices for fetching
+        if self._optimize:
+            self._vertices, colors, self._normals, self._texcoords, self._indices = optimize(self._indices,
+                self._vertices, self._colors if self._rgb_colors else None, self._normals, self._texcoords)
+            if self._rgb_colors:
+                self._colors = colors
+
 
     def initialize(self):
         """Creates Sphere geometry"""
@@ -100,6 +109,6 @@ class Sphere(Actor):
 
     def render(self):
         """Render Sphere"""
-        GL.glDrawElements(self._render_mode, self.numberOfIndices, GL.GL_UNSIGNED_INT, None)
+        self.drawElements(self._render_mode, self.numberOfIndices)
 
     
\ No newline at end of file
@@ -0,0 +1,311 @@
+import ctypes
+import numpy as np
+
+from PyQt5.QtGui import QMatrix4x4, QVector3D, QOpenGLBuffer, QOpenGLVertexArrayObject
+
+from OpenGL import GL
+from Source.Graphics.Actor import Actor
+from Source.Graphics.Shaders import Shaders
+from Source.Graphics.UniformBuffer import UniformBuffer
+from Source.Graphics.ResourceManager import ResourceManager
+
+##  Merged geometry of static actors sharing shaders and material.
+##
+##  The vertices of every member are transformed by the member's transform
+##  and copied into one vertex buffer, so the batch itself is drawn with the
+##  identity transform. The material tables of the members are merged and
+##  the index buffer holds the triangles of all members grouped by merged
+##  material: the whole batch takes one draw per material. A member whose
+##  transform changes has only its own vertex range rewritten; members
+##  joining or leaving rebuild the index buffer, and the vertex buffer only
+##  when it runs out of room or is mostly holes.
+class StaticBatch(Actor):
+
+    ## per-member state
+    class Member:
+        def __init__(self, actor, base, count, materials, indices, counts):
+            self.actor = actor
+            self.transform = None
+            self.base = base
+            self.count = count
+            self.materials = materials
+            self.indices = indices
+            self.counts = counts
+
+    ## initialization
+    def __init__(self, scene, prototype, **kwargs):
+        """Initialize empty batch drawn with the shaders of prototype"""
+        super(StaticBatch, self).__init__(scene, name="StaticBatch" + str(id(self)), material=prototype.material,
+            wireframe=prototype._wireframe, **kwargs)
+        self.setPickable(False)
+        self.setSolidShader(prototype.solidShader)
+        self.setSolidFlatShader(prototype.solidFlatShader)
+        self.setNoLightSolidShader(prototype.noLightSolidShader)
+        self.setWireframeShader(prototype.wireframeShader)
+        self.setNoLightWireframeShader(prototype.noLightWireframeShader)
+
+        self._colored = prototype._colors is not None
+        self._tabled = prototype._materialTable is not None
+        self._members = {}
+        self._capacity = 0
+        self._used = 0
+        self._live = 0
+        self._positions = np.zeros((0, 3), dtype=np.float32)
+        self._normals = np.zeros((0, 3), dtype=np.float32)
+        self._colors = np.zeros((0, 3), dtype=np.float32) if self._colored else None
+        self._table = []
+        self._tableRows = {}
+        self._ranges = []
+        self._created = False
+        self._material_buffer = None
+        self._dirtyIndices = False
+        self._dirtyTable = False
+
+
+    def numberOfMembers(self):
+        """Returns the number of actors drawn by this batch"""
+        return len(self._members)
+
+
+    def members(self):
+        """Returns the actors drawn by this batch"""
+        return [member.actor for member in self._members.values()]
+
+
+    def contains(self, actor):
+        """Returns true if actor is drawn by this batch"""
+        return id(actor) in self._members
+
+
+    def numberOfDraws(self):
+        """Returns the draw calls issued per pass"""
+        return len(self._ranges)
+
+
+    @staticmethod
+    def source(actor):
+        """Returns (indices, index count per material) of the full detail mesh of an Obj actor"""
+        indices = actor._indices
+        if indices is None:
+            indices = np.arange(len(actor._vertices), dtype=np.uint32)
+        counts = [len(indices)] if actor._materialCounts is None else actor._materialCounts[0].tolist()
+        return np.asarray(indices, dtype=np.uint32), counts
+
+
+    def mergeMaterials(self, actor):
+        """Returns the merged table index of each material of actor, None if the table would overflow"""
+        if not self._tabled:
+            return [0]
+        rows = [row.tobytes() for row in actor._materialTable]
+        added = len(set(row for row in rows if row not in self._tableRows))
+        if len(self._table) + added > Shaders.MaxMaterials:
+            return None
+        result = []
+        for row, data in zip(rows, actor._materialTable):
+            if row not in self._tableRows:
+                self._tableRows[row] = len(self._table)
+                self._table.append(data)
+                self._dirtyTable = True
+            result.append(self._tableRows[row])
+        return result
+
+
+    def add(self, actor):
+        """Adds actor to the batch; returns false if the merged material table cannot hold its materials"""
+        materials = self.mergeMaterials(actor)
+        if materials is None:
+            return False
+        indices, counts = self.source(actor)
+        count = len(actor._vertices)
+        if self._used + count > self._capacity:
+            self.compact(self._used + count)
+        member = StaticBatch.Member(actor, self._used, count, materials, indices, counts)
+        self._members[id(actor)] = member
+        self._used += count
+        self._live += count
+        self.transformMember(member)
+        self._dirtyIndices = True
+        return True
+
+
+    def remove(self, actor):
+        """Removes actor from the batch, its vertices are left as a hole until the next compaction"""
+        member = self._members.pop(id(actor), None)
+        if member is not None:
+            self._live -= member.count
+            self._dirtyIndices = True
+
+
+    def transformMember(self, member):
+        """Writes the vertices of member transformed by its actor's current transform"""
+        actor = member.actor
+        member.transform = QMatrix4x4(actor.transform())
+        matrix = np.array(member.transform.data(), dtype=np.float32).reshape(4, 4).T
+        normal = np.array(member.transform.normalMatrix().data(), dtype=np.float32).reshape(3, 3).T
+        first, last = member.base, member.base + member.count
+        self._positions[first:last] = np.asarray(actor._vertices, dtype=np.float32).reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+        if actor._normals is not None:
+            self._normals[first:last] = np.asarray(actor._normals, dtype=np.float32).reshape(-1, 3) @ normal.T
+        if self._colored:
+            self._colors[first:last] = np.asarray(actor._colors, dtype=np.float32).reshape(-1, 3)[:, :3]
+        if self._created:
+            self.writeVertices(first, last)
+
+        ## culling bounds grow to the moved member until the next index rebuild recomputes them
+        if self._mesh_bounds is not None and member.count > 0:
+            moved = self._positions[first:last]
+            self._mesh_bounds = (np.minimum(self._mesh_bounds[0], moved.min(axis=0)),
+                np.maximum(self._mesh_bounds[1], moved.max(axis=0)))
+            self._world_bounds = None
+
+
+    def sync(self, actors):
+        """Makes the batch draw exactly actors, updating the members that moved since the last sync"""
+        current = {id(actor): actor for actor in actors}
+        for key in [key for key, member in self._members.items() if current.get(key) is not member.actor]:
+            self.remove(self._members[key].actor)
+        for actor in actors:
+            member = self._members.get(id(actor))
+            if member is None:
+                self.add(actor)
+            elif actor.transform() != member.transform:
+                self.transformMember(member)
+
+        ## mostly holes, repack the live members
+        if self._used > 2 * self._live + 1024:
+            self.compact(self._live)
+
+        if not self._created:
+            self.createBuffers()
+        if self._dirtyTable:
+            self.writeTable()
+        if self._dirtyIndices:
+            self.writeIndices()
+
+
+    def compact(self, needed):
+        """Repacks the live members at the start of CPU arrays holding at least needed vertices"""
+        capacity = max(needed, 2 * self._capacity, 1024)
+        positions = np.zeros((capacity, 3), dtype=np.float32)
+        normals = np.zeros((capacity, 3), dtype=np.float32)
+        colors = np.zeros((capacity, 3), dtype=np.float32) if self._colored else None
+        base = 0
+        for member in self._members.values():
+            first, last = member.base, member.base + member.count
+            positions[base:base + member.count] = self._positions[first:last]
+            normals[base:base + member.count] = self._normals[first:last]
+            if self._colored:
+                colors[base:base + member.count] = self._colors[first:last]
+            member.base = base
+            base += member.count
+        self._positions, self._normals, self._colors = positions, normals, colors
+        self._capacity = capacity
+        self._used = base
+        self._dirtyIndices = True
+
+        ## the GL buffers are recreated with the new capacity
+        if self._created:
+            self.destroyBuffers()
+
+
+    def createBuffers(self):
+        """Creates the vertex, index and material buffers at the current capacity"""
+        self.create(self._positions, normals=self._normals, colors=self._colors,
+            indices=np.zeros(max(self._live, 3), dtype=np.uint32), usage=QOpenGLBuffer.DynamicDraw)
+        if self._tabled:
+            self._material_buffer = UniformBuffer()
+            self._material_buffer.create()
+            ResourceManager().track(self._material_buffer, self, ResourceManager.Kind.Buffer)
+            self._dirtyTable = True
+        self._created = True
+        self._dirtyIndices = True
+
+
+    def destroyBuffers(self):
+        """Hands the GL buffers to the ResourceManager"""
+        self.destroy()
+        self._vao = QOpenGLVertexArrayObject()
+        self._vbo = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        self._ibo = QOpenGLBuffer(QOpenGLBuffer.IndexBuffer)
+        self._created = False
+
+
+    def writeVertices(self, first, last):
+        """Uploads the vertices in [first, last) of every attribute"""
+        arrays = {'position': self._positions, 'normal': self._normals, 'color': self._colors}
+        self._vbo.bind()
+        for each in self._vertex_layout.attributes():
+            data = np.ascontiguousarray(arrays[each.name][first:last])
+            self._vbo.write(each.offset + first * each.stride, data, data.nbytes)
+        self._vbo.release()
+
+
+    def writeTable(self):
+        """Uploads the merged material table"""
+        table = np.zeros((Shaders.MaxMaterials, 12), dtype=np.float32)
+        if self._table:
+            table[:len(self._table)] = self._table
+        self._material_buffer.allocate(table)
+        ResourceManager().resize(self._material_buffer, table.nbytes)
+        self._dirtyTable = False
+
+
+    def writeIndices(self):
+        """Rebuilds the index buffer, the triangles of every member grouped by merged material"""
+        groups = {}
+        for member in self._members.values():
+            start = 0
+            for material, count in zip(member.materials, member.counts):
+                if count > 0:
+                    groups.setdefault(material, []).append(member.indices[start:start + count] + member.base)
+                start += count
+        self._ranges = []
+        buffers = []
+        offset = 0
+        for material in sorted(groups):
+            indices = np.concatenate(groups[material]).astype(np.uint32, copy=False)
+            self._ranges.append((offset * 4, len(indices), material))
+            buffers.append(indices)
+            offset += len(indices)
+        data = np.concatenate(buffers) if buffers else np.zeros(3, dtype=np.uint32)
+
+        ## the element buffer binding is vao state
+        self._vao.bind()
+        self._ibo.bind()
+        self._ibo.allocate(data, data.nbytes)
+        self._vao.release()
+        ResourceManager().resize(self._ibo, data.nbytes)
+        self._num_indices = len(data)
+
+        ## bounds used for depth sorting and culling
+        live = np.concatenate([self._positions[m.base:m.base + m.count] for m in self._members.values()]) \
+            if self._members else np.zeros((1, 3), dtype=np.float32)
+        self.setPointMin(QVector3D(*live.min(axis=0).tolist()))
+        self.setPointMax(QVector3D(*live.max(axis=0).tolist()))
+        self.setCenter()
+        self.setSize()
+        self.setMeshBounds(live)
+        self._dirtyIndices = False
+
+
+    def beginRendering(self, draw_style, lighting, shading, passNumber):
+        """Sets up rendering and binds the merged material table"""
+        super(StaticBatch, self).beginRendering(draw_style, lighting, shading, passNumber)
+        if self._material_buffer is not None:
+            self._material_buffer.bindBase(Shaders.MaterialTableBinding)
+
+
+    def render(self):
+        """Draws every member, one call per merged material"""
+        for offset, count, material in self._ranges:
+            if self._tabled:
+                self.setUniform("materialIndex", material)
+            GL.glDrawElements(self._render_mode, count, GL.GL_UNSIGNED_INT, ctypes.c_void_p(offset) if offset else None)
+
+
+    def destroy(self):
+        """Hands the GPU objects of the batch to the ResourceManager"""
+        if self._material_buffer is not None:
+            ResourceManager().release(self._material_buffer)
+            self._material_buffer = None
+        super(StaticBatch, self).destroy()
@@ -0,0 +1,108 @@
+from Source.Graphics.Actor import Actor
+from Source.Graphics.Obj import Obj
+from Source.Graphics.StaticBatch import StaticBatch
+
+##  Static batching stage of a scene.
+##
+##  Before every frame the Obj actors of the scene that can be drawn from
+##  merged buffers are grouped by shaders and emission, and each group of at
+##  least MinimumMembers actors is drawn by one StaticBatch. An actor leaves
+##  its batch while it is selected, highlighted or hidden, so that it is drawn
+##  on its own with its own state, and rejoins it afterwards. The actors stay
+##  in the scene, so picking still finds them. A batch always draws the full
+##  detail meshes of its members and is culled as a whole, so actors choosing
+##  among several levels of detail, see Obj.selectLevelOfDetail, are not
+##  batched while the selection is enabled.
+class StaticBatcher:
+
+    ## smallest group worth a batch
+    MinimumMembers = 2
+
+    ## initialization
+    def __init__(self, scene, **kwargs):
+        """Initialize stage without batches"""
+        self._scene = scene
+        self._enabled = kwargs.get("enabled", True)
+        self._batches = {}
+        self._batched = {}
+
+
+    def isEnabled(self):
+        """Returns whether static actors are batched"""
+        return self._enabled
+
+
+    def setEnabled(self, value):
+        """Turns batching on or off, off draws every actor on its own"""
+        self._enabled = value
+        if not value:
+            self.clear()
+
+
+    def clear(self):
+        """Destroys every batch"""
+        for batch in self._batches.values():
+            batch.destroy()
+        self._batches = {}
+        self._batched = {}
+
+
+    def batches(self):
+        """Returns the batches drawn this frame"""
+        return [batch for batch in self._batches.values() if batch.numberOfMembers() > 0]
+
+
+    def isBatched(self, actor):
+        """Returns true if actor is drawn by a batch this frame"""
+        return id(actor) in self._batched
+
+
+    @staticmethod
+    def isBatchable(actor):
+        """Returns true if actor can be drawn from a batch in its current state"""
+        return (isinstance(actor, Obj) and actor.isVisible() and actor.texture() is None
+            and actor.renderType == Actor.RenderType.Solid and actor.renderMode == Actor.RenderMode.Triangles
+            and actor._stream is None and actor._vertices is not None
+            and not (actor._lod and len(actor._levels) > 1)
+            and not (actor.isSelected() or actor.isHighlighted() or actor.isEnabled()
+                or actor._errorHighlight or actor._warningHighlight))
+
+
+    @staticmethod
+    def key(actor):
+        """Returns the key of the group actor is batched with"""
+        emission = actor.material.emissionColor
+        return (id(actor.solidShader), id(actor.solidFlatShader), id(actor.noLightSolidShader), id(actor.wireframeShader),
+            actor._colors is not None, actor._materialTable is not None, (emission.x(), emission.y(), emission.z()))
+
+
+    def update(self):
+        """Regroups the actors of the scene and brings the batches up to date, needs a current context"""
+        if not self._enabled:
+            return
+        groups = {}
+        for actor in self._scene.actors():
+            if self.isBatchable(actor):
+                groups.setdefault(self.key(actor), []).append(actor)
+
+        ## batches of groups that became too small are emptied, not destroyed
+        self._batched = {}
+        for key in set(groups) | set(self._batches):
+            actors = groups.get(key, [])
+            if len(actors) < StaticBatcher.MinimumMembers:
+                actors = []
+            batch = self._batches.get(key)
+            if batch is None:
+                if not actors:
+                    continue
+                batch = self._batches[key] = StaticBatch(self._scene, actors[0])
+            batch.sync(actors)
+            for actor in batch.members():
+                self._batched[id(actor)] = batch
+
+
+    def statistics(self):
+        """Returns a dictionary with the number of batches, batched actors and draw calls per pass"""
+        batches = self.batches()
+        return {"batches": len(batches), "actors": len(self._batched),
+            "draws": sum(batch.numberOfDraws() for batch in batches)}
@@ -0,0 +1,188 @@
+import time
+import ctypes
+import numpy as np
+
+from PyQt5.QtGui import QOpenGLBuffer
+
+from OpenGL import GL
+
+##  Vertex buffer for geometry rewritten every frame.
+##
+##  A plain QOpenGLBuffer.write into a buffer the GPU is still reading from
+##  makes the driver wait for the previous draws. A streaming buffer avoids
+##  this in one of three ways:
+##
+##  Orphan      the storage is reallocated before each update, the driver
+##              hands out fresh memory while the old one is still in use.
+##  Ring        the buffer holds several copies of the vertex data; each
+##              update maps the next region unsynchronized, after waiting on
+##              the fence placed when that region was last drawn.
+##  Persistent  like Ring, but the whole buffer stays mapped with
+##              GL_MAP_PERSISTENT_BIT (GL 4.4 / ARB_buffer_storage) so updates
+##              are plain memory copies. Falls back to Ring when unavailable.
+##
+##  The actor draws from offset() after each update and calls fence() once
+##  it is done drawing.
+class StreamingBuffer:
+
+    class Mode:
+        Orphan = 0
+        Ring = 1
+        Persistent = 2
+        Modes = [Orphan, Ring, Persistent]
+
+
+    ## copies of the vertex data in the ring modes, one frame written while two are drawn
+    Regions = 3
+
+    ## nanoseconds to wait on a fence before trying again
+    FenceTimeout = 1000000
+
+    def __init__(self, buffer, size, **kwargs):
+        """Initialize streaming of size bytes per update through buffer, a created and bound QOpenGLBuffer"""
+        self._buffer = buffer
+        self._size = size
+        self._mode = kwargs.get("mode", StreamingBuffer.Mode.Ring)
+        self._regions = kwargs.get("regions", StreamingBuffer.Regions) if self._mode != StreamingBuffer.Mode.Orphan else 1
+        self._region = 0
+        self._fences = [None] * self._regions
+        self._mapped = None
+        self._persistent = None
+        self._staging = None
+
+        ## statistics
+        self._updates = 0
+        self._bytes = 0
+        self._stalls = 0
+        self._stallTime = 0.0
+
+
+    @staticmethod
+    def hasPersistentMapping():
+        """Returns true if the current context can map buffers persistently"""
+        return bool(GL.glBufferStorage)
+
+
+    def mode(self):
+        """Returns the streaming mode in use, after any fallback"""
+        return self._mode
+
+
+    def size(self):
+        """Returns the bytes written by each update"""
+        return self._size
+
+
+    def capacity(self):
+        """Returns the size in bytes of the whole buffer"""
+        return self._size * self._regions
+
+
+    def offset(self):
+        """Returns the byte offset of the data written by the last update"""
+        return self._region * self._size
+
+
+    def allocate(self):
+        """Allocates the buffer storage, the buffer must be bound"""
+        if self._mode == StreamingBuffer.Mode.Persistent and not self.hasPersistentMapping():
+            self._mode = StreamingBuffer.Mode.Ring
+
+        if self._mode == StreamingBuffer.Mode.Persistent:
+            flags = GL.GL_MAP_WRITE_BIT | GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT
+            GL.glBufferStorage(GL.GL_ARRAY_BUFFER, self.capacity(), None, flags)
+            pointer = GL.glMapBufferRange(GL.GL_ARRAY_BUFFER, 0, self.capacity(), flags)
+            address = ctypes.cast(pointer, ctypes.c_void_p).value
+            self._persistent = np.frombuffer((ctypes.c_ubyte * self.capacity()).from_address(address), np.uint8)
+        else:
+            self._buffer.setUsagePattern(QOpenGLBuffer.StreamDraw)
+            self._buffer.allocate(self.capacity())
+        self._region = self._regions - 1
+
+
+    def begin(self):
+        """Moves to the next region and returns it as a writable uint8 array, the buffer must be bound"""
+        self._region = (self._region + 1) % self._regions
+        self.wait(self._region)
+
+        if self._mode == StreamingBuffer.Mode.Orphan:
+            ## let the driver detach the storage still in use
+            self._buffer.allocate(self._size)
+            if self._staging is None:
+                self._staging = np.zeros(self._size, dtype=np.uint8)
+            self._mapped = self._staging
+            return self._mapped
+        if self._mode == StreamingBuffer.Mode.Persistent:
+            return self._persistent[self.offset():self.offset() + self._size]
+
+        access = QOpenGLBuffer.RangeWrite | QOpenGLBuffer.RangeInvalidate | QOpenGLBuffer.RangeUnsynchronized
+        pointer = self._buffer.mapRange(self.offset(), self._size, access)
+        self._mapped = np.frombuffer((ctypes.c_ubyte * self._size).from_address(int(pointer)), np.uint8)
+        return self._mapped
+
+
+    def end(self):
+        """Finishes the update started by begin()"""
+        if self._mode == StreamingBuffer.Mode.Orphan:
+            self._buffer.write(0, self._mapped, self._size)
+        elif self._mode == StreamingBuffer.Mode.Ring:
+            self._buffer.unmap()
+        self._mapped = None
+        self._updates += 1
+        self._bytes += self._size
+
+
+    def write(self, layout, arrays):
+        """Writes a dictionary of attribute arrays at their layout positions in the next region"""
+        target = self.begin()
+        for name, data in arrays.items():
+            layout.write(target, name, data)
+        self.end()
+
+
+    def fence(self):
+        """Marks the end of the draws reading the current region"""
+        if self._mode == StreamingBuffer.Mode.Orphan:
+            return
+        if self._fences[self._region] is not None:
+            GL.glDeleteSync(self._fences[self._region])
+        self._fences[self._region] = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+
+    def wait(self, region):
+        """Blocks until the GPU is done with the draws fenced on region"""
+        sync = self._fences[region]
+        if sync is None:
+            return
+        status = GL.glClientWaitSync(sync, 0, 0)
+        if status in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED):
+            GL.glDeleteSync(sync)
+            self._fences[region] = None
+            return
+
+        ## the region is still being read, this is a stall
+        self._stalls += 1
+        start = time.perf_counter()
+        while status == GL.GL_TIMEOUT_EXPIRED:
+            status = GL.glClientWaitSync(sync, GL.GL_SYNC_FLUSH_COMMANDS_BIT, StreamingBuffer.FenceTimeout)
+        self._stallTime += time.perf_counter() - start
+        GL.glDeleteSync(sync)
+        self._fences[region] = None
+
+
+    def statistics(self):
+        """Returns a dictionary with the number of updates, bytes uploaded, stalls and seconds stalled"""
+        return {"updates": self._updates, "bytes": self._bytes, "stalls": self._stalls, "stallTime": self._stallTime}
+
+
+    def destroy(self):
+        """Releases the fences and the persistent mapping, the buffer itself belongs to its actor"""
+        for sync in self._fences:
+            if sync is not None:
+                GL.glDeleteSync(sync)
+        self._fences = [None] * self._regions
+        if self._persistent is not None:
+            self._buffer.bind()
+            GL.glUnmapBuffer(GL.GL_ARRAY_BUFFER)
+            self._buffer.release()
+            self._persistent = None
@@ -0,0 +1,73 @@
+import numpy as np
+
+from OpenGL import GL
+
+##  OpenGL uniform buffer object.
+##
+##  QOpenGLBuffer has no uniform buffer type, so this wraps the raw GL calls
+##  with the same create / allocate / write / destroy interface. The data is
+##  expected to follow the std140 layout of the uniform block it feeds.
+class UniformBuffer:
+
+    def __init__(self, **kwargs):
+        """Initialize buffer, no GL object exists until create() is called"""
+        self._usage = kwargs.get("usage", GL.GL_STATIC_DRAW)
+        self._buffer = 0
+        self._size = 0
+
+
+    def create(self):
+        """Creates the GL buffer object, needs a current context"""
+        if self._buffer == 0:
+            self._buffer = int(GL.glGenBuffers(1))
+        return self._buffer != 0
+
+
+    def isCreated(self):
+        """Returns true if the GL buffer object exists"""
+        return self._buffer != 0
+
+
+    def bufferId(self):
+        """Returns the GL name of the buffer"""
+        return self._buffer
+
+
+    def size(self):
+        """Returns the allocated size in bytes"""
+        return self._size
+
+
+    def allocate(self, data):
+        """Allocates the buffer and fills it with data, a numpy array"""
+        data = np.ascontiguousarray(data)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self._buffer)
+        GL.glBufferData(GL.GL_UNIFORM_BUFFER, data.nbytes, data, self._usage)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
+        self._size = data.nbytes
+
+
+    def write(self, offset, data):
+        """Replaces part of the buffer contents starting at byte offset"""
+        data = np.ascontiguousarray(data)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self._buffer)
+        GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, offset, data.nbytes, data)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
+
+
+    def bindBase(self, index):
+        """Binds the whole buffer to uniform block binding point index"""
+        GL.glBindBufferBase(GL.GL_UNIFORM_BUFFER, index, self._buffer)
+
+
+    def bindRange(self, index, offset, size):
+        """Binds size bytes starting at byte offset to uniform block binding point index"""
+        GL.glBindBufferRange(GL.GL_UNIFORM_BUFFER, index, self._buffer, offset, size)
+
+
+    def destroy(self):
+        """Deletes the GL buffer object"""
+        if self._buffer != 0:
+            GL.glDeleteBuffers(1, [self._buffer])
+        self._buffer = 0
+        self._size = 0
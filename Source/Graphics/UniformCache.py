@@ -0,0 +1,105 @@
+##  Last uniform values uploaded to each shader program.
+##
+##  Uniform values are program state in OpenGL: they stay set across binds
+##  until they are set again. Actors share a handful of programs and mostly
+##  upload the same camera, light and material values, so each value is
+##  compared with the last one uploaded to the program at that location and
+##  the upload is skipped when they are equal. Locations are resolved once per
+##  program and name. Values are copied when stored, since matrices and
+##  vectors are often modified in place by their owners.
+class UniformCache:
+
+    __instance = None
+
+    def __new__(cls):
+        if UniformCache.__instance is None:
+            UniformCache.__instance = object.__new__(cls)
+            UniformCache.__instance.initialize()
+        return UniformCache.__instance
+
+
+    def initialize(self):
+        """Create empty cache"""
+        self._programs = {}
+        self._enabled = True
+        self._requested = 0
+        self._issued = 0
+        self._frameRequested = 0
+        self._frameIssued = 0
+        self._lastFrame = (0, 0)
+
+
+    def isEnabled(self):
+        """Returns whether unchanged uploads are skipped"""
+        return self._enabled
+
+
+    def setEnabled(self, value):
+        """Turns skipping of unchanged uploads on or off, off uploads every value by name"""
+        self._enabled = value
+        self.invalidate()
+
+
+    def invalidate(self, program=None):
+        """Forgets the values uploaded to program, or to every program, e.g. after the context is recreated"""
+        if program is None:
+            self._programs.clear()
+        else:
+            self._programs.pop(id(program), None)
+
+
+    def entry(self, program):
+        """Returns the (program, locations, values) entry of a program"""
+        entry = self._programs.get(id(program))
+        if entry is None:
+            entry = self._programs[id(program)] = (program, {}, {})
+        return entry
+
+
+    def location(self, program, name):
+        """Returns the location of uniform name in program, -1 if the program does not use it"""
+        locations = self.entry(program)[1]
+        location = locations.get(name)
+        if location is None:
+            location = locations[name] = program.uniformLocation(name)
+        return location
+
+
+    def set(self, program, name, value):
+        """Uploads value to uniform name of program, the bound program, unless it already holds it; returns true if uploaded"""
+        self._requested += 1
+        self._frameRequested += 1
+        if not self._enabled:
+            program.setUniformValue(name, value)
+            self._issued += 1
+            self._frameIssued += 1
+            return True
+
+        program, locations, values = self.entry(program)
+        location = locations.get(name)
+        if location is None:
+            location = locations[name] = program.uniformLocation(name)
+        if location < 0:
+            return False
+        last = values.get(location)
+        if last is not None and type(last) is type(value) and last == value:
+            return False
+        values[location] = value if isinstance(value, (int, float)) else type(value)(value)
+        program.setUniformValue(location, value)
+        self._issued += 1
+        self._frameIssued += 1
+        return True
+
+
+    def beginFrame(self):
+        """Starts counting the uploads of a new frame"""
+        self._lastFrame = (self._frameRequested, self._frameIssued)
+        self._frameRequested = 0
+        self._frameIssued = 0
+
+
+    def statistics(self):
+        """Returns a dictionary with the uniforms requested and uploaded in the last frame and overall"""
+        return {"frameRequested": self._lastFrame[0], "frameIssued": self._lastFrame[1],
+            "frameSkipped": self._lastFrame[0] - self._lastFrame[1],
+            "requested": self._requested, "issued": self._issued, "programs": len(self._programs)}
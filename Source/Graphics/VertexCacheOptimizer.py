@@ -0,0 +1,149 @@
+import numpy as np
+
+## size of the modelled post-transform vertex cache
+CacheSize = 32
+
+## Forsyth scoring parameters
+CacheDecayPower = 1.5
+LastTriangleScore = 0.75
+ValenceBoostScale = 2.0
+ValenceBoostPower = 0.5
+
+
+def acmr(indices, cacheSize=CacheSize):
+    """Returns the average cache miss ratio (vertex transforms per triangle) of a FIFO cache"""
+    indices = np.asarray(indices).reshape(-1)
+    if len(indices) < 3:
+        return 0.0
+    cache = set()
+    fifo = [None] * cacheSize
+    position = 0
+    misses = 0
+    for index in indices.tolist():
+        if index in cache:
+            continue
+        misses += 1
+        if fifo[position] is not None:
+            cache.discard(fifo[position])
+        fifo[position] = index
+        cache.add(index)
+        position = (position + 1) % cacheSize
+    return misses / float(len(indices) // 3)
+
+
+##  Reorders triangles for post-transform vertex cache locality.
+##
+##  This is Tom Forsyth's linear-speed greedy algorithm: every vertex gets a
+##  score from its position in a modelled LRU cache and from the number of
+##  triangles still using it, and the triangle with the highest summed score
+##  among those touching the cache is emitted next.
+def optimizeTriangles(indices, vertexCount=None, cacheSize=CacheSize):
+    """Returns the triangle list indices reordered for vertex cache locality"""
+    indices = np.asarray(indices)
+    triangles = indices.reshape(-1, 3).tolist()
+    if len(triangles) < 2:
+        return indices.copy()
+    if vertexCount is None:
+        vertexCount = int(indices.max()) + 1
+
+    ## triangles using each vertex
+    adjacency = [[] for _ in range(vertexCount)]
+    for t, (a, b, c) in enumerate(triangles):
+        adjacency[a].append(t)
+        adjacency[b].append(t)
+        adjacency[c].append(t)
+    remaining = [len(each) for each in adjacency]
+
+    ## score tables
+    positionScore = [LastTriangleScore] * 3 + [(1.0 - (p - 3) / float(cacheSize - 3)) ** CacheDecayPower
+        for p in range(3, cacheSize)]
+    valenceScore = [0.0] + [ValenceBoostScale * r ** -ValenceBoostPower for r in range(1, max(remaining) + 1)]
+
+    vertexScore = [valenceScore[r] if r > 0 else -1.0 for r in remaining]
+    triangleScore = [vertexScore[a] + vertexScore[b] + vertexScore[c] for a, b, c in triangles]
+    added = [False] * len(triangles)
+
+    order = []
+    cache = []
+    best = int(np.argmax(triangleScore))
+    cursor = 0
+    while best >= 0:
+        added[best] = True
+        order.append(best)
+        tri = triangles[best]
+
+        ## retire the triangle and move its corners to the front of the cache
+        for v in tri:
+            remaining[v] -= 1
+            adjacency[v].remove(best)
+        front = [v for i, v in enumerate(tri) if v not in tri[:i]]
+        cache = front + [v for v in cache if v not in front]
+        evicted = cache[cacheSize:]
+        cache = cache[:cacheSize]
+
+        ## refresh scores of vertices whose cache position changed
+        for v in evicted:
+            vertexScore[v] = valenceScore[remaining[v]] if remaining[v] > 0 else -1.0
+        for p, v in enumerate(cache):
+            vertexScore[v] = positionScore[p] + valenceScore[remaining[v]] if remaining[v] > 0 else -1.0
+
+        ## pick the best candidate among triangles touching the cache
+        best = -1
+        bestScore = -1.0
+        for v in evicted + cache:
+            for t in adjacency[v]:
+                a, b, c = triangles[t]
+                score = vertexScore[a] + vertexScore[b] + vertexScore[c]
+                triangleScore[t] = score
+                if score > bestScore:
+                    best = t
+                    bestScore = score
+
+        ## cache starved, continue with the next unused triangle
+        if best < 0:
+            while cursor < len(triangles) and added[cursor]:
+                cursor += 1
+            if cursor < len(triangles):
+                best = cursor
+
+    return indices.reshape(-1, 3)[order].reshape(indices.shape)
+
+
+def optimizeVertexFetch(indices, *attributes):
+    """Returns attributes renumbered in order of first use, followed by the remapped indices"""
+    indices = np.asarray(indices)
+    count = len(attributes[0]) if attributes else int(indices.max()) + 1
+    flat = indices.reshape(-1)
+    used, first = np.unique(flat, return_index=True)
+
+    ## vertices in order of first reference, unreferenced ones last
+    unused = np.setdiff1d(np.arange(count), used)
+    order = np.concatenate([used[np.argsort(first, kind="stable")], unused])
+    remap = np.empty(count, dtype=np.int64)
+    remap[order] = np.arange(count)
+
+    reordered = tuple(None if each is None else np.ascontiguousarray(each[order]) for each in attributes)
+    return reordered + (remap[flat].astype(indices.dtype).reshape(indices.shape),)
+
+
+def optimizeRanges(indices, ranges=None, vertexCount=None, cacheSize=CacheSize):
+    """Reorders triangles inside each (first index, count) range, keeping the input order of a range when it measures better"""
+    indices = np.asarray(indices)
+    if ranges is None:
+        ranges = [(0, len(indices.reshape(-1)))]
+    result = indices.reshape(-1).copy()
+    for first, count in ranges:
+        original = result[first:first + count]
+        reordered = optimizeTriangles(original, vertexCount, cacheSize)
+
+        ## the greedy order targets an LRU cache
+        if acmr(reordered, cacheSize) < acmr(original, cacheSize):
+            result[first:first + count] = reordered
+    return result.reshape(indices.shape)
+
+
+def optimize(indices, *attributes, **kwargs):
+    """Reorders triangles for the vertex cache, then vertices for fetch locality"""
+    count = len(attributes[0]) if attributes else None
+    indices = optimizeRanges(indices, kwargs.get("ranges", None), count, kwargs.get("cacheSize", CacheSize))
+    return optimizeVertexFetch(indices, *attributes)
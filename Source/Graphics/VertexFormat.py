@@ -0,0 +1,141 @@
+import numpy as np
+
+from OpenGL import GL
+
+##  Encodings of the vertex attributes uploaded by Actor.create.
+##
+##  The default format uploads float32 data, as always. Compact encodings
+##  trade precision for bandwidth: positions are stored relative to the mesh
+##  bounds and expanded in the vertex shader by a per-mesh dequantization
+##  transform (positionScale, positionOffset), normals are packed in four
+##  bytes, colors in unsigned bytes. OpenGL normalizes the integer encodings
+##  when the attributes are fetched. Every encoded attribute keeps a 4-byte
+##  aligned stride.
+class VertexFormat:
+
+    class Encoding:
+        Float = 0       ## float32 components
+        Half = 1        ## float16 components, positions relative to the bounds
+        Snorm16 = 2     ## normalized int16 components, positions relative to the bounds
+        Octahedral = 3  ## normals only, octahedral projection in two normalized int16
+        Int2101010 = 4  ## normals only, GL_INT_2_10_10_10_REV
+        Unorm8 = 5      ## colors only, normalized uint8
+        Encodings = [Float, Half, Snorm16, Octahedral, Int2101010, Unorm8]
+
+
+    ## normal decoding selected by the normalEncoding uniform of the shaders
+    class NormalDecoding:
+        Vector = 0
+        Octahedral = 1
+
+
+    def __init__(self, **kwargs):
+        """Initialize format, every attribute defaults to float32"""
+        self.position = kwargs.get("position", VertexFormat.Encoding.Float)
+        self.normal = kwargs.get("normal", VertexFormat.Encoding.Float)
+        self.color = kwargs.get("color", VertexFormat.Encoding.Float)
+        self.texcoord = kwargs.get("texcoord", VertexFormat.Encoding.Float)
+        self.compactIndices = kwargs.get("compactIndices", False)
+
+
+    @staticmethod
+    def compact():
+        """Returns the smallest format: int16 positions, octahedral normals, byte colors, uint16 indices"""
+        return VertexFormat(position=VertexFormat.Encoding.Snorm16, normal=VertexFormat.Encoding.Octahedral,
+            color=VertexFormat.Encoding.Unorm8, texcoord=VertexFormat.Encoding.Half, compactIndices=True)
+
+
+    def key(self):
+        """Returns a string identifying this format"""
+        return "{}{}{}{}{}".format(self.position, self.normal, self.color, self.texcoord, int(self.compactIndices))
+
+
+    @staticmethod
+    def snorm16(values):
+        """Returns values in [-1, 1] as normalized int16"""
+        return np.round(np.clip(values, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+    @staticmethod
+    def pad(values, components, fill=0):
+        """Returns values with extra columns up to components"""
+        if values.shape[1] >= components:
+            return values
+        extra = np.full((len(values), components - values.shape[1]), fill, dtype=values.dtype)
+        return np.concatenate([values, extra], axis=1)
+
+
+    def encodePositions(self, vertices):
+        """Returns (data, GL type, tuple size, scale, offset) of the positions"""
+        if self.position == VertexFormat.Encoding.Float or len(vertices) == 0:
+            return vertices, GL.GL_FLOAT, 3, (1.0, 1.0, 1.0), (0.0, 0.0, 0.0)
+        vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+
+        ## map the bounds onto [-1, 1]
+        low = vertices.min(axis=0).astype(np.float64)
+        high = vertices.max(axis=0).astype(np.float64)
+        offset = (low + high) / 2.0
+        scale = np.maximum((high - low) / 2.0, 1e-30)
+        normalized = (vertices - offset) / scale
+
+        if self.position == VertexFormat.Encoding.Half:
+            data, glType = self.pad(normalized.astype(np.float16), 4), GL.GL_HALF_FLOAT
+        elif self.position == VertexFormat.Encoding.Snorm16:
+            data, glType = self.pad(self.snorm16(normalized), 4), GL.GL_SHORT
+        else:
+            raise ValueError("unsupported position encoding {}".format(self.position))
+        return data, glType, 4, tuple(float(x) for x in scale), tuple(float(x) for x in offset)
+
+
+    def encodeNormals(self, normals):
+        """Returns (data, GL type, tuple size, decoding) of the normals"""
+        if self.normal == VertexFormat.Encoding.Float:
+            return normals, GL.GL_FLOAT, 3, VertexFormat.NormalDecoding.Vector
+        normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        unit = normals / np.where(length > 0.0, length, 1.0)
+
+        if self.normal == VertexFormat.Encoding.Octahedral:
+            projected = unit[:, :2] / np.maximum(np.abs(unit).sum(axis=1, keepdims=True), 1e-30)
+            lower = unit[:, 2:] < 0.0
+            folded = (1.0 - np.abs(projected[:, ::-1])) * np.where(projected >= 0.0, 1.0, -1.0)
+            projected = np.where(lower, folded, projected)
+            return self.snorm16(projected), GL.GL_SHORT, 2, VertexFormat.NormalDecoding.Octahedral
+        if self.normal == VertexFormat.Encoding.Int2101010:
+            q = np.round(np.clip(unit, -1.0, 1.0) * 511.0).astype(np.int32) & 0x3FF
+            packed = (q[:, 0] | (q[:, 1] << 10) | (q[:, 2] << 20)).astype(np.uint32)
+            return packed, GL.GL_INT_2_10_10_10_REV, 4, VertexFormat.NormalDecoding.Vector
+        if self.normal == VertexFormat.Encoding.Half:
+            return self.pad(normals.astype(np.float16), 4), GL.GL_HALF_FLOAT, 4, VertexFormat.NormalDecoding.Vector
+        raise ValueError("unsupported normal encoding {}".format(self.normal))
+
+
+    def encodeColors(self, colors):
+        """Returns (data, GL type, tuple size) of the colors"""
+        if self.color == VertexFormat.Encoding.Float:
+            return colors, GL.GL_FLOAT, 3
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+        if self.color == VertexFormat.Encoding.Unorm8:
+            data = np.round(np.clip(colors, 0.0, 1.0) * 255.0).astype(np.uint8)
+            return self.pad(data, 4, 255), GL.GL_UNSIGNED_BYTE, 4
+        if self.color == VertexFormat.Encoding.Half:
+            return self.pad(colors.astype(np.float16), 4, 1.0), GL.GL_HALF_FLOAT, 4
+        raise ValueError("unsupported color encoding {}".format(self.color))
+
+
+    def encodeTexcoords(self, texcoords):
+        """Returns (data, GL type, tuple size) of the texture coordinates"""
+        if self.texcoord == VertexFormat.Encoding.Float:
+            return texcoords, GL.GL_FLOAT, 2
+        if self.texcoord == VertexFormat.Encoding.Half:
+            return np.asarray(texcoords, dtype=np.float16).reshape(-1, 2), GL.GL_HALF_FLOAT, 2
+        raise ValueError("unsupported texture coordinate encoding {}".format(self.texcoord))
+
+
+    def encodeIndices(self, indices):
+        """Returns the indices, as uint16 when compact indices are requested and they fit"""
+        indices = np.asarray(indices)
+        if self.compactIndices and indices.dtype != np.uint16 and (len(indices) == 0 or indices.max() <= np.iinfo(np.uint16).max):
+            return indices.astype(np.uint16)
+        return indices
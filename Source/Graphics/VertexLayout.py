@@ -0,0 +1,184 @@
+import ctypes
+import numpy as np
+
+from OpenGL import GL
+
+##  Declarative layout of the attributes in a vertex buffer.
+##
+##  Each attribute is described by its shader name, GL component type,
+##  component count and whether integer components are normalized. The
+##  layout places them either planar, one block per attribute back to back,
+##  or interleaved, one record per vertex holding every attribute. Offsets
+##  and strides follow from the vertex count, the data is packed to match and
+##  the vertex array state of every shader is configured from the same
+##  description. Every attribute starts on a 4-byte boundary.
+class VertexLayout:
+
+    class Mode:
+        Planar = 0       ## all positions, then all normals, ...
+        Interleaved = 1  ## position, normal, ... of vertex 0, then of vertex 1, ...
+        Modes = [Planar, Interleaved]
+
+
+    ## bytes per component of the GL types, packed types count as a single component
+    ComponentBytes = {
+        GL.GL_BYTE: 1, GL.GL_UNSIGNED_BYTE: 1,
+        GL.GL_SHORT: 2, GL.GL_UNSIGNED_SHORT: 2, GL.GL_HALF_FLOAT: 2,
+        GL.GL_INT: 4, GL.GL_UNSIGNED_INT: 4, GL.GL_FLOAT: 4,
+        GL.GL_INT_2_10_10_10_REV: 4, GL.GL_UNSIGNED_INT_2_10_10_10_REV: 4,
+    }
+    PackedTypes = [GL.GL_INT_2_10_10_10_REV, GL.GL_UNSIGNED_INT_2_10_10_10_REV]
+
+    ## numpy type of the components of the GL types, packed types are one uint32
+    NumpyTypes = {
+        GL.GL_BYTE: np.int8, GL.GL_UNSIGNED_BYTE: np.uint8,
+        GL.GL_SHORT: np.int16, GL.GL_UNSIGNED_SHORT: np.uint16, GL.GL_HALF_FLOAT: np.float16,
+        GL.GL_INT: np.int32, GL.GL_UNSIGNED_INT: np.uint32, GL.GL_FLOAT: np.float32,
+        GL.GL_INT_2_10_10_10_REV: np.uint32, GL.GL_UNSIGNED_INT_2_10_10_10_REV: np.uint32,
+    }
+    FloatTypes = [GL.GL_FLOAT, GL.GL_HALF_FLOAT]
+
+
+    ##  One vertex attribute of the layout.
+    class Attribute:
+
+        def __init__(self, name, type, size, normalized=False):
+            """Initialize attribute name with size components of GL type"""
+            self.name = name
+            self.type = type
+            self.size = size
+            self.normalized = normalized
+            self.offset = 0
+            self.stride = 0
+
+
+        def bytes(self):
+            """Returns the size in bytes of the attribute of one vertex"""
+            if self.type in VertexLayout.PackedTypes:
+                return 4
+            return self.size * VertexLayout.ComponentBytes[self.type]
+
+
+        def rows(self, data):
+            """Returns data converted to the component type of the attribute, as the bytes of one vertex per row"""
+            components = 1 if self.type in VertexLayout.PackedTypes else self.size
+            data = np.ascontiguousarray(data, dtype=VertexLayout.NumpyTypes[self.type]).reshape(-1, components)
+            return data.view(np.uint8).reshape(len(data), self.bytes())
+
+
+    def __init__(self, attributes=(), **kwargs):
+        """Initialize layout with a list of attributes"""
+        self._mode = kwargs.get("mode", VertexLayout.Mode.Planar)
+        self._attributes = list(attributes)
+        self._count = 0
+        self._size = 0
+
+
+    @staticmethod
+    def align(value):
+        """Returns value rounded up to a multiple of 4"""
+        return (value + 3) & ~3
+
+
+    def mode(self):
+        """Returns the layout mode"""
+        return self._mode
+
+
+    def isInterleaved(self):
+        """Returns true if the attributes are interleaved per vertex"""
+        return self._mode == VertexLayout.Mode.Interleaved
+
+
+    def add(self, name, type, size, normalized=False):
+        """Appends an attribute to the layout"""
+        self._attributes.append(VertexLayout.Attribute(name, type, size, normalized))
+        self.setVertexCount(self._count)
+
+
+    def attributes(self):
+        """Returns the attributes of this layout, in buffer order"""
+        return self._attributes
+
+
+    def attribute(self, name):
+        """Returns the attribute called name, None if the layout has none"""
+        for each in self._attributes:
+            if each.name == name:
+                return each
+        return None
+
+
+    def vertexCount(self):
+        """Returns the number of vertices the offsets are computed for"""
+        return self._count
+
+
+    def vertexSize(self):
+        """Returns the bytes taken by one vertex, with the alignment padding"""
+        return sum(self.align(each.bytes()) for each in self._attributes)
+
+
+    def bufferSize(self):
+        """Returns the size in bytes of a buffer holding every vertex"""
+        return self._size
+
+
+    def setVertexCount(self, count):
+        """Computes the offset and stride of every attribute for count vertices"""
+        self._count = count
+        offset = 0
+        for each in self._attributes:
+            each.offset = offset
+            if self.isInterleaved():
+                each.stride = self.vertexSize()
+                offset += self.align(each.bytes())
+            else:
+                each.stride = each.bytes()
+                offset += self.align(each.bytes() * count)
+        self._size = self.vertexSize() * count if self.isInterleaved() else offset
+
+
+    def columns(self, target, name):
+        """Returns the bytes of attribute name inside target, a uint8 array of the whole buffer, one row per vertex"""
+        each = self.attribute(name)
+        if self.isInterleaved():
+            records = target[:self._size].reshape(self._count, each.stride)
+            return records[:, each.offset:each.offset + each.bytes()]
+        return target[each.offset:each.offset + each.bytes() * self._count].reshape(self._count, each.bytes())
+
+
+    def write(self, target, name, data):
+        """Writes the vertices of data, converted to attribute name, at the start of its columns in target; returns the vertex count"""
+        rows = self.attribute(name).rows(data)
+        self.columns(target, name)[:len(rows)] = rows
+        return len(rows)
+
+
+    def pack(self, arrays):
+        """Returns the (byte offset, data) writes filling a buffer from a dictionary of attribute arrays"""
+        if not self.isInterleaved():
+            ## planar blocks are uploaded in place when already of the attribute's type
+            return [(each.offset, each.rows(arrays[each.name])) for each in self._attributes]
+
+        buffer = np.zeros(self._size, dtype=np.uint8)
+        for each in self._attributes:
+            self.write(buffer, each.name, arrays[each.name])
+        return [(0, buffer)]
+
+
+    def configure(self, shaders, base=0):
+        """Sets up and enables the attribute arrays of every shader for a layout starting at byte base, the vertex buffer must be bound"""
+        for each in self._attributes:
+            offset = base + each.offset
+            for shader in shaders:
+                if each.normalized or each.type in VertexLayout.FloatTypes:
+                    ## Qt always asks GL to normalize integer components
+                    shader.setAttributeBuffer(each.name, each.type, offset, each.size, each.stride)
+                else:
+                    location = shader.attributeLocation(each.name)
+                    if location < 0:
+                        continue
+                    GL.glVertexAttribPointer(location, each.size, each.type, GL.GL_FALSE, each.stride,
+                        ctypes.c_void_p(offset) if offset else None)
+                shader.enableAttributeArray(each.name)
@@ -0,0 +1,34 @@
+import numpy as np
+
+def indexType(count):
+    """Returns the smallest index dtype able to address count vertices"""
+    return np.uint16 if count <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+##  Merges vertices whose attributes are all bitwise identical.
+##
+##  Takes per-vertex arrays of equal length (None entries are passed through)
+##  and returns the unique vertex arrays, in order of first appearance, plus
+##  an index array rebuilding the original sequence. Indices are uint16 when
+##  the unique vertices fit, uint32 otherwise.
+def weld(*attributes):
+    """Returns welded attributes followed by the index array"""
+    present = [np.ascontiguousarray(each, dtype=np.float32).reshape(len(each), -1) for each in attributes if each is not None]
+    count = len(present[0]) if present else 0
+    if count == 0:
+        return tuple(attributes) + (np.zeros(0, dtype=np.uint16),)
+
+    ## one opaque key per vertex holding all of its attribute bits
+    keys = np.ascontiguousarray(np.concatenate(present, axis=1))
+    keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).reshape(-1)
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    ## keep the unique vertices in order of first appearance
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    unique = first[order]
+
+    indices = rank[inverse.reshape(-1)].astype(indexType(len(unique)))
+    welded = tuple(None if each is None else np.ascontiguousarray(each[unique]) for each in attributes)
+    return welded + (indices,)
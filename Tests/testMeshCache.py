@@ -0,0 +1,32 @@
+import unittest
+
+from Source.Graphics.MeshCache import MeshCache
+from Source.Graphics.MeshSimplifier import LevelRatios
+
+
+##  Cache keys of equivalent parse options.
+class TestMeshCache(unittest.TestCase):
+
+    Filename = "obj-models/buildings/1.obj"
+
+    def key(self, **options):
+        return MeshCache().key(TestMeshCache.Filename, **options)
+
+
+    def testDefaultsShareKey(self):
+        self.assertEqual(self.key(), self.key(optimize=False, lods=()))
+        self.assertEqual(self.key(), self.key(weld=True, materials=True, lods=[]))
+
+
+    def testRatiosShareKey(self):
+        self.assertEqual(self.key(lods=LevelRatios), self.key(lods=[0.5, 0.25, 0.125]))
+
+
+    def testOptionsChangeKey(self):
+        self.assertNotEqual(self.key(), self.key(optimize=True))
+        self.assertNotEqual(self.key(), self.key(lods=LevelRatios))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
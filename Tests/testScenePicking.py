@@ -0,0 +1,93 @@
+import unittest
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QMatrix4x4, QVector3D
+
+from Source.Graphics.Actor import Actor
+from Source.Graphics.Camera import Camera
+from Source.Graphics.Group import Group
+from Source.Graphics.Scene import Scene
+
+
+##  Unit box with the picking methods of Actor, which needs no GL context.
+class Box:
+
+    pickBounds = Actor.pickBounds
+    intersect = Actor.intersect
+
+    def __init__(self, name, x, z=0.0):
+        self.name = name
+        self._transform = QMatrix4x4()
+        self._transform.translate(x, 0.0, z)
+        self._center = QVector3D(0.0, 0.0, 0.0)
+        self._size = QVector3D(1.0, 1.0, 1.0)
+        self._pickFactor = 1.0
+        self._pickable = True
+        self._pick_bounds = None
+        self._pick_bounds_transform = None
+
+    def transform(self):
+        return self._transform
+
+    def isPickable(self):
+        return self._pickable
+
+
+##  Scene.pick through the picking hierarchy, with actors and groups.
+class TestScenePicking(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = Scene(None, camera=Camera(position=QVector3D(0.0, 0.0, 10.0)))
+
+
+    def point(self, x, z=0.0):
+        """Returns the normalized device coordinates of the world point (x, 0, z)"""
+        projected = self.scene.camera.viewProjectionMatrix.map(QVector3D(x, 0.0, z))
+        return QPointF(projected.x(), projected.y())
+
+
+    def group(self, name, *parts):
+        """Returns a group of parts added to the scene"""
+        group = Group(self.scene, name=name)
+        for part in parts:
+            group.addPart(part)
+        self.scene.addActor(group)
+        return group
+
+
+    def testGroupWithoutPickBounds(self):
+        group = self.group("g")
+        self.scene.buildPicking()
+        self.assertEqual(self.scene.pick(self.point(0.0)), (None, None))
+        self.assertEqual(self.scene.pickingStatistics()["items"], 0)
+        self.assertIs(self.scene.actor("g"), group)
+
+
+    def testGroupParts(self):
+        body, handle = Box("body", 0.0), Box("handle", 3.0)
+        group = self.group("g", body, handle)
+        self.assertEqual(self.scene.pick(self.point(0.0)), (group, None))
+        self.assertEqual(self.scene.pick(self.point(3.0)), (group, handle))
+        self.assertEqual(self.scene.pick(self.point(-3.0)), (None, None))
+
+
+    def testUnpickableGroup(self):
+        actor = Box("behind", 0.0, -5.0)
+        self.scene.addActor(actor)
+        self.group("gizmos", Box("arrow", 0.0)).setPickable(False)
+        self.assertEqual(self.scene.pick(self.point(0.0, -5.0)), (actor, None))
+
+
+    def testMovedPart(self):
+        part = Box("part", 6.0)
+        group = self.group("g", Box("body", 0.0), part)
+        self.assertEqual(self.scene.pick(self.point(6.0)), (group, part))
+        part._transform.translate(-12.0, 0.0, 0.0)
+        self.scene.actorMoved(part)
+        self.assertEqual(self.scene.pick(self.point(6.0)), (None, None))
+        self.assertEqual(self.scene.pick(self.point(-6.0)), (group, part))
+
+
+if __name__ == '__main__':
+
+    unittest.main()
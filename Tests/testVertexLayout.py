@@ -0,0 +1,106 @@
+import unittest
+import numpy as np
+
+from Source.Graphics.VertexFormat import VertexFormat
+from Source.Graphics.VertexLayout import VertexLayout
+
+
+def arrays(count, seed):
+    """Returns random float32 positions, normals and colors of count vertices"""
+    generator = np.random.default_rng(seed)
+    return {'position': generator.uniform(-1.0, 1.0, (count, 3)).astype(np.float32),
+        'normal': generator.normal(size=(count, 3)).astype(np.float32),
+        'color': generator.uniform(0.0, 1.0, (count, 3)).astype(np.float32)}
+
+
+def encode(format, data):
+    """Returns the arrays encoded by format and the layout describing them, like Actor.create"""
+    positions, position_type, position_size = format.encodePositions(data['position'])[:3]
+    normals, normal_type, normal_size = format.encodeNormals(data['normal'])[:3]
+    colors, color_type, color_size = format.encodeColors(data['color'])
+    return {'position': positions, 'normal': normals, 'color': colors}, [('position', position_type, position_size),
+        ('normal', normal_type, normal_size), ('color', color_type, color_size)]
+
+
+def layout(mode, attributes, count):
+    """Returns a layout of mode holding the attributes for count vertices"""
+    result = VertexLayout(mode=mode)
+    for name, type, size in attributes:
+        result.add(name, type, size, type not in VertexLayout.FloatTypes)
+    result.setVertexCount(count)
+    return result
+
+
+def image(layout, data):
+    """Returns the bytes of a vertex buffer created from data"""
+    buffer = np.zeros(layout.bufferSize(), dtype=np.uint8)
+    for offset, block in layout.pack(data):
+        block = block.view(np.uint8).reshape(-1)
+        buffer[offset:offset + len(block)] = block
+    return buffer
+
+
+##  Updates of single attributes, as written by Actor.updateBuffer, give the
+##  same buffer as packing the updated arrays from scratch.
+class TestVertexLayout(unittest.TestCase):
+
+    Count = 17
+
+    def update(self, mode, format):
+        """Updates the normals and colors of a buffer and compares it with a freshly packed one"""
+        first, attributes = encode(format, arrays(TestVertexLayout.Count, 1))
+        second = encode(format, dict(arrays(TestVertexLayout.Count, 2), position=arrays(TestVertexLayout.Count, 1)['position']))[0]
+        target = layout(mode, attributes, TestVertexLayout.Count)
+        buffer = image(target, first)
+        for name in ('normal', 'color'):
+            if target.isInterleaved():
+                target.write(buffer, name, second[name])
+            else:
+                rows = target.attribute(name).rows(second[name]).reshape(-1)
+                buffer[target.attribute(name).offset:target.attribute(name).offset + len(rows)] = rows
+        np.testing.assert_array_equal(buffer, image(target, second))
+
+
+    def testPlanarFloatUpdate(self):
+        self.update(VertexLayout.Mode.Planar, VertexFormat())
+
+
+    def testInterleavedFloatUpdate(self):
+        self.update(VertexLayout.Mode.Interleaved, VertexFormat())
+
+
+    def testPlanarCompactUpdate(self):
+        self.update(VertexLayout.Mode.Planar, VertexFormat.compact())
+
+
+    def testInterleavedCompactUpdate(self):
+        self.update(VertexLayout.Mode.Interleaved, VertexFormat.compact())
+
+
+    def testPackedNormalUpdate(self):
+        self.update(VertexLayout.Mode.Interleaved, VertexFormat(normal=VertexFormat.Encoding.Int2101010))
+
+
+    def testRowsConvertToAttributeType(self):
+        data = arrays(TestVertexLayout.Count, 3)['position']
+        attribute = layout(VertexLayout.Mode.Interleaved, [('position', VertexFormat().encodePositions(data)[1], 3)],
+            TestVertexLayout.Count).attribute('position')
+        rows = attribute.rows(data.astype(np.float64).tolist())
+        self.assertEqual(rows.shape, (TestVertexLayout.Count, 12))
+        np.testing.assert_array_equal(rows, data.view(np.uint8).reshape(TestVertexLayout.Count, 12))
+
+
+    def testPartialUpdate(self):
+        data, attributes = encode(VertexFormat(), arrays(TestVertexLayout.Count, 4))
+        target = layout(VertexLayout.Mode.Interleaved, attributes, TestVertexLayout.Count)
+        buffer = image(target, data)
+        colors = np.ones((5, 3), dtype=np.float32)
+        self.assertEqual(target.write(buffer, 'color', colors), 5)
+        expected = np.array(data['color'])
+        expected[:5] = colors
+        np.testing.assert_array_equal(buffer, image(target, dict(data, color=expected)))
+
+
+if __name__ == '__main__':
+
+    unittest.main()